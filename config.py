@@ -16,10 +16,83 @@ OBS_PASSWORD = os.getenv("OBS_PASSWORD", "")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = "gemini-2.5-flash"  # 해커톤 크레딧 키 사용 시 유료 할당량 적용
 
+# ── 비전 백엔드 (gemini / record / replay) ──
+VISION_BACKEND = os.getenv("VISION_BACKEND", "gemini")
+VISION_ARCHIVE_PATH = os.getenv(
+    "VISION_ARCHIVE_PATH",
+    os.path.join(os.path.dirname(__file__), "vision_archive", "records.jsonl.gz"),
+)
+# replay 모드 합성 지연 시간(초). 비워두면 기록된 실제 지연 시간을 사용
+_replay_latency = os.getenv("VISION_REPLAY_LATENCY", "")
+VISION_REPLAY_LATENCY = float(_replay_latency) if _replay_latency else None
+
+# ── 비전 결과 캐시 (지각 해시) ──
+VISION_CACHE_SIZE = 32       # 최대 보관 결과 수 (LRU)
+VISION_CACHE_THRESHOLD = 4   # 같은 장면으로 볼 최대 해밍 거리 (64비트 중)
+
+# Gemini bbox를 물체 경계에 맞게 로컬 보정 (GrabCut → 윤곽선, 예산 초과 시 원본 사용)
+BBOX_REFINE_ENABLED = True
+BBOX_REFINE_BUDGET_MS = 40
+
+# 호출어 감지 즉시 추측성 감지 시작 (set_target이 아니면 결과 폐기)
+VISION_PREFETCH_ENABLED = True
+
+# ── 로컬 손가락 포인팅 추정 (OpenCV, CPU) ──
+POINTER_ENABLED = True
+POINTER_ROI_CONFIDENCE = 0.5      # 이 이상이면 Gemini 요청을 포인팅 방향 영역으로 크롭
+POINTER_RESOLVE_CONFIDENCE = 0.8  # 이 이상이고 손가락 끝이 등록 타겟 안이나 바로 앞이면 Gemini 없이 판정
+POINTER_RESOLVE_DISTANCE = 0.05   # 손가락 끝 ~ 타겟 거리 허용치 (프레임 짧은 변 대비, 멀면 사이에 새 물체가 있을 수 있음)
+
 # ── STT (Faster-Whisper) ──
 STT_MODEL_SIZE = "small"
 STT_DEVICE = "cpu"
 STT_COMPUTE_TYPE = "int8"
+# 호출어 확인용 소형 모델 (None이면 STT_MODEL_SIZE 하나로 호출어/명령 모두 처리)
+STT_WAKE_MODEL_SIZE = "tiny"
+STT_WAKE_COMPUTE_TYPE = "int8"
+STT_WAKE_MAX_TOKENS = 24       # 호출어 확인 시 최대 디코딩 토큰 수
+
+# ── 연속 오디오 캡처 + VAD 분할 ──
+STT_SAMPLE_RATE = 16000
+STT_RING_SECONDS = 30.0        # 링 버퍼 길이 (변환이 이보다 오래 밀리면 오래된 음성부터 버려짐)
+VAD_FRAME_MS = 30              # 에너지 계산 프레임
+VAD_ENERGY_THRESHOLD = 0.009   # 최소 발화 RMS (float32 기준, int16 약 300)
+VAD_PAUSE_SEC = 0.6            # 이만큼 조용하면 발화 종료
+VAD_PRE_ROLL_SEC = 0.4         # 발화 앞 여백
+VAD_MIN_SPEECH_SEC = 0.15      # 이보다 짧은 소리는 무시
+MIC_REOPEN_BACKOFF = (0.5, 30.0)  # 마이크 재연결 대기 (최소, 최대 초) — 연속 실패마다 2배
+WAKE_PHRASE_LIMIT = 3.0        # 호출어 대기 중 발화 최대 길이 (초)
+COMMAND_PHRASE_LIMIT = 10.0    # 명령 발화 최대 길이 (초)
+COMMAND_TIMEOUT = 7.0          # 호출어 후 명령 발화가 시작되지 않으면 대기 종료 (초)
+
+# 부분 인식 (명령 발화 중 중간 결과를 미리 보내 UI가 먼저 동작)
+STT_PARTIAL_ENABLED = True
+STT_PARTIAL_INTERVAL = 0.5     # 새 음성이 이만큼 쌓일 때마다 다시 변환 (초)
+STT_PARTIAL_MIN_SEC = 0.6      # 발화가 이보다 짧으면 부분 인식 생략 (초)
+PARTIAL_DISPATCH_ENABLED = True  # UI: 안정된 부분 결과로 줌/감지를 미리 시작
+INTENT_EARLY_MIN_CONFIDENCE = 0.55  # 명령 해석 신뢰도가 이보다 낮으면(두 액션 동점 등) 선행 실행하지 않음
+
+# 자체 재생음(TTS/효과음) 억제 — UI가 재생 시작/종료를 STT 프로세스에 알림
+STT_PLAYBACK_MODE = "gate"     # "off" | "gate"(재생 구간 음성 제거) | "nlms"(참조 신호 차감 후 판정)
+STT_PLAYBACK_LATENCY = 0.05    # play() 호출 → 스피커 출력까지 지연 (초)
+STT_PLAYBACK_TAIL = 0.3        # 재생 종료 후 잔향으로 보고 함께 제거할 시간 (초)
+NLMS_TAPS = 512                # 반향 경로 길이 (16kHz 기준 32ms)
+NLMS_STEP = 0.1
+
+# STT 프로세스 감독 (하트비트 / 자동 재시작 / 모델 교체)
+STT_HEARTBEAT_INTERVAL = 1.0   # 워커 하트비트 주기 (초)
+STT_HEARTBEAT_TIMEOUT = 10.0   # 하트비트가 이만큼 끊기면 재시작 (초)
+STT_LOOP_STALL_TIMEOUT = 60.0  # 준비 후 메인 루프가 이만큼 멈춰 있으면 재시작 (초, 디코딩 최대 시간보다 길게)
+STT_STARTUP_TIMEOUT = 300.0    # 첫 하트비트/준비까지 허용 시간 (초, 첫 실행 시 모델 다운로드 포함)
+STT_RESTART_BACKOFF = (1.0, 30.0)  # 재시작 대기 (최소, 최대 초) — 연속 실패마다 2배
+STT_STABLE_SEC = 60.0          # 준비 후 이만큼 살아 있으면 재시작 대기를 초기화 (초)
+STT_MODEL_CHOICES = ["small", "medium"]  # Ctrl+M으로 순환 교체할 명령 모델 크기
+LATENCY_TRACE_SIZE = 200       # UI: 호출어 → 명령 → 동작 지연을 기록해 둘 최근 발화 수 (종료 시 보고)
+
+# ── 경량 호출어 검출 (MFCC + DTW, Whisper 앞단) ──
+KWS_ENABLED = True
+KWS_TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "kws_templates.npz")  # pre_test/10_kws_enroll.py로 생성
+KWS_THRESHOLD = None           # None이면 등록 시 계산된 임계값 사용
 
 # ── 호출어 / 종료어 ──
 WAKE_WORDS = [
@@ -46,6 +119,22 @@ OBS_MIRROR_HEIGHT = 720
 OBS_MIRROR_QUALITY = 70
 OBS_MIRROR_FPS = 10  # 초당 프레임 수
 
+# ── 프레임 파이프라인 ──
+PIPELINE_CAPTURE_EXECUTOR = "thread"  # OBS 캡처/디코딩 실행기 ("inline"이면 GUI 스레드에서 실행)
+PIPELINE_ANALYZE_BUDGET_MS = 5.0      # 분석 단계 예산 (초과 시 다음 프레임들 건너뜀)
+
+# ── 장면 변화 감지 (블록 평균 비교, 프레임당 1ms 미만) ──
+SCENE_CHANGE_ENABLED = True
+SCENE_BLOCK_DELTA = 20.0       # 블록 평균 차이가 이 이상이면 바뀐 블록
+SCENE_CUT_FRACTION = 0.5       # 바뀐 블록 비율이 이 이상이면 장면 전환 (타겟 숨김)
+SCENE_PARTIAL_FRACTION = 0.08  # 안정화 후 이 비율 이상 바뀌었으면 타겟 재검증
+SCENE_SETTLE_FRAMES = 3        # 움직임 없는 연속 프레임 수 (안정화 판단)
+
+# ── 발화 시점 프레임 기록 ──
+FRAME_HISTORY_SIZE = 50      # 보관할 최근 프레임 수 (10fps 기준 5초)
+SPEECH_FRAME_POSITION = 0.5  # 발화 구간 중 감지에 사용할 위치 (0.0=시작, 1.0=끝)
+SHARPNESS_CANDIDATES = 5     # 기준 시점 주변에서 선명도를 비교할 프레임 수 (1이면 비활성)
+
 # ── UI 테마 색상 (네온 다크 모드) ──
 THEME = {
     "bg_primary": "#0f0f1a",
@@ -60,6 +149,16 @@ THEME = {
     "border_glow": "#00f5ff",
 }
 
+# ── 타겟 중복 방지 (로컬 IoU 판정) ──
+TARGET_DEDUP_IOU = 0.5         # 기존 타겟과 IoU가 이 이상이면 같은 물체로 간주
+TARGET_DEDUP_POLICY = "reject"  # "reject": 등록 거부 / "merge": 기존 타겟 bbox 갱신
+TARGET_HISTORY_SIZE = 512       # 타겟별 bbox 기록 링 버퍼 크기 (타겟당 약 14KB 고정)
+
+# ── 타겟 영구 저장소 (SQLite WAL, 씬별) ──
+TARGET_STORE_ENABLED = True
+TARGET_STORE_PATH = os.path.join(os.path.dirname(__file__), "targets.sqlite3")
+TARGET_REVALIDATE_THRESHOLD = 0.5  # 재시작 시 첫 프레임과의 외형 유사도 최소값 (0~1)
+
 # 타겟별 색상 팔레트 (순환 사용)
 TARGET_COLORS = [
     "#00f5ff",  # 시안
@@ -25,29 +25,22 @@ def main():
     print("  JJABS Camera Director -- AI 가상 카메라 감독")
     print("=" * 60)
 
-    # ── 1. Pipe 생성 (양방향 통신) ──
-    parent_conn, child_conn = multiprocessing.Pipe()
-
-    # ── 2. STT 워커 프로세스 시작 (PyQt5를 import하기 전에!) ──
+    # ── 1~2. STT 워커 감독자 시작 (PyQt5를 import하기 전에!) ──
+    # 워커가 죽거나 멈추면 감독자가 다시 띄우며, UI에는 Pipe와 같은 인터페이스를 제공합니다.
     from modules.stt_worker import stt_process
-    stt_proc = multiprocessing.Process(
-        target=stt_process,
-        args=(child_conn,),
-        daemon=True,
-    )
-    stt_proc.start()
-    print(f"[Main] STT 프로세스 시작됨 (PID: {stt_proc.pid})")
+    from modules.stt_supervisor import SttSupervisor
+    supervisor = SttSupervisor(stt_process)
+    supervisor.start()
 
     # ── 3. PyQt5 UI 시작 (이 시점 이후 PyQt5 import 안전) ──
     print("[Main] UI 시작...")
     from modules.ui_main import run_ui
-    run_ui(parent_conn)
-
-    # ── 4. UI 종료 후 정리 ──
-    if stt_proc.is_alive():
-        stt_proc.terminate()
-        stt_proc.join(timeout=3)
-    print("[Main] 프로그램 종료")
+    try:
+        run_ui(supervisor)
+    finally:
+        # ── 4. UI 종료 후 정리 ──
+        supervisor.close()
+        print("[Main] 프로그램 종료")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,206 @@
+"""
+appearance.py — 타겟 외형 정보 (썸네일 + 외형 기술자)
+재시작 후 저장된 타겟이 아직 같은 위치에 있는지 첫 프레임으로 재검증하고,
+카메라/물체가 움직인 뒤 ORB 특징점 매칭으로 타겟 위치를 다시 찾을 때 사용합니다.
+"""
+import io
+
+import cv2
+import numpy as np
+
+THUMB_SIZE = 64
+HIST_BINS = (16, 8)  # H, S
+
+ORB_TARGET_FEATURES = 200   # 타겟당 저장할 최대 특징점 수
+ORB_FRAME_FEATURES = 3000   # 재탐색 시 프레임 전체에서 뽑을 특징점 수
+
+_orb_cache = {}
+
+
+def _orb(nfeatures):
+    orb = _orb_cache.get(nfeatures)
+    if orb is None:
+        orb = cv2.ORB_create(nfeatures=nfeatures)
+        _orb_cache[nfeatures] = orb
+    return orb
+
+
+def _gray(frame):
+    return frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def crop(frame, bbox):
+    """bbox 영역을 프레임 범위 안에서 잘라냅니다 (빈 영역이면 None)."""
+    h, w = frame.shape[:2]
+    x1, y1 = max(0, int(bbox[0])), max(0, int(bbox[1]))
+    x2, y2 = min(w, int(bbox[2])), min(h, int(bbox[3]))
+    if x2 - x1 < 2 or y2 - y1 < 2:
+        return None
+    return frame[y1:y2, x1:x2]
+
+
+def color_histogram(image):
+    """정규화된 H-S 색상 히스토그램 (조명 밝기 변화에 비교적 강인)."""
+    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0, 1], None, HIST_BINS, [0, 180, 0, 256])
+    cv2.normalize(hist, hist, alpha=1.0, norm_type=cv2.NORM_L1)
+    return hist.astype(np.float32)
+
+
+def make_thumbnail(frame, bbox):
+    """bbox 영역의 JPEG 썸네일 (bytes)."""
+    region = crop(frame, bbox)
+    if region is None:
+        return None
+    thumb = cv2.resize(region, (THUMB_SIZE, THUMB_SIZE), interpolation=cv2.INTER_AREA)
+    ok, encoded = cv2.imencode(".jpg", thumb, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return encoded.tobytes() if ok else None
+
+
+def orb_features(frame, bbox, nfeatures=ORB_TARGET_FEATURES):
+    """
+    bbox 영역의 ORB 특징점을 추출합니다.
+    영역 경계에서도 특징점이 잡히도록 잘라내지 않고 프레임 전체에 마스크를 씌워 계산합니다.
+
+    Returns:
+        (offsets, descriptors) — offsets는 bbox 좌상단 기준 (N, 2) float32,
+        descriptors는 (N, 32) uint8. 특징점이 없으면 (None, None)
+    """
+    gray = _gray(frame)
+    h, w = gray.shape[:2]
+    x1, y1 = max(0, int(bbox[0])), max(0, int(bbox[1]))
+    x2, y2 = min(w, int(bbox[2])), min(h, int(bbox[3]))
+    if x2 - x1 < 2 or y2 - y1 < 2:
+        return None, None
+    mask = np.zeros((h, w), np.uint8)
+    mask[y1:y2, x1:x2] = 255
+    keypoints, descriptors = _orb(nfeatures).detectAndCompute(gray, mask)
+    if descriptors is None or len(keypoints) == 0:
+        return None, None
+    pts = np.array([kp.pt for kp in keypoints], np.float32)
+    return pts - np.array([bbox[0], bbox[1]], np.float32), descriptors
+
+
+def compute_descriptor(frame, bbox):
+    """bbox 영역의 외형 기술자 (dict of numpy arrays)."""
+    region = crop(frame, bbox)
+    if region is None:
+        return None
+    descriptor = {
+        "hist": color_histogram(region),
+        "size": np.array([bbox[2] - bbox[0], bbox[3] - bbox[1]], np.float32),
+    }
+    offsets, orb = orb_features(frame, bbox)
+    if orb is not None:
+        descriptor["kp"] = offsets
+        descriptor["orb"] = orb
+    return descriptor
+
+
+def pack_descriptor(descriptor):
+    """기술자를 저장용 bytes로 직렬화합니다."""
+    if descriptor is None:
+        return None
+    buf = io.BytesIO()
+    np.savez_compressed(buf, **descriptor)
+    return buf.getvalue()
+
+
+def unpack_descriptor(blob):
+    if not blob:
+        return None
+    with np.load(io.BytesIO(blob)) as data:
+        return {key: data[key] for key in data.files}
+
+
+def similarity(frame, bbox, descriptor):
+    """
+    현재 프레임의 bbox 영역이 저장된 외형과 얼마나 비슷한지 (0.0 ~ 1.0).
+    히스토그램 교집합(intersection)을 사용합니다.
+    """
+    if descriptor is None or "hist" not in descriptor:
+        return 0.0
+    region = crop(frame, bbox)
+    if region is None:
+        return 0.0
+    return float(cv2.compareHist(color_histogram(region), descriptor["hist"], cv2.HISTCMP_INTERSECT))
+
+
+def reidentify(frame, items, ratio=0.75, min_matches=8, min_similarity=0.4, gray=None):
+    """
+    여러 타겟을 한 번에 현재 프레임에서 다시 찾습니다.
+    프레임 특징점은 한 번만 추출하고, 모든 타겟의 ORB 기술자를 하나로 쌓아
+    한 번의 knn 매칭으로 처리한 뒤 타겟별로 RANSAC 유사 변환을 추정합니다.
+
+    Args:
+        frame: 현재 프레임 (BGR)
+        items: [(id, descriptor), ...]
+        ratio: Lowe 비율 검사 기준
+        min_matches: 변환 추정에 필요한 최소 inlier 수
+        min_similarity: 새 위치의 색상 히스토그램 유사도 최소값
+        gray: 미리 변환된 그레이스케일 프레임 (TimedFrame.gray(), 선택)
+
+    Returns:
+        {id: (bbox, inliers, similarity)} — 다시 찾은 타겟만 포함
+    """
+    owners, offsets, stacked, sizes = [], [], [], {}
+    for item_id, desc in items:
+        if not desc or "orb" not in desc or len(desc["orb"]) < min_matches:
+            continue
+        owners.append(np.full(len(desc["orb"]), item_id, np.int64))
+        offsets.append(desc["kp"])
+        stacked.append(desc["orb"])
+        sizes[item_id] = desc["size"]
+    if not stacked:
+        return {}
+
+    if gray is None:
+        gray = _gray(frame)
+    keypoints, frame_des = _orb(ORB_FRAME_FEATURES).detectAndCompute(gray, None)
+    if frame_des is None or len(keypoints) < 2:
+        return {}
+    frame_pts = np.array([kp.pt for kp in keypoints], np.float32)
+
+    owners = np.concatenate(owners)
+    offsets = np.concatenate(offsets)
+    matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+    pairs = matcher.knnMatch(np.concatenate(stacked), frame_des, k=2)
+
+    # 비율 검사를 배열 연산으로 처리
+    table = np.array(
+        [(p[0].queryIdx, p[0].trainIdx, p[0].distance, p[1].distance) for p in pairs if len(p) == 2],
+        np.float32,
+    ).reshape(-1, 4)
+    good = table[:, 2] < ratio * table[:, 3]
+    q_idx = table[good, 0].astype(np.intp)
+    t_idx = table[good, 1].astype(np.intp)
+    match_owner = owners[q_idx]
+
+    descriptors = dict(items)
+    found = {}
+    fh, fw = frame.shape[:2]
+    for item_id in np.unique(match_owner):
+        sel = match_owner == item_id
+        if sel.sum() < min_matches:
+            continue
+        src = offsets[q_idx[sel]]
+        dst = frame_pts[t_idx[sel]]
+        matrix, inliers = cv2.estimateAffinePartial2D(src, dst, method=cv2.RANSAC,
+                                                      ransacReprojThreshold=5.0)
+        if matrix is None or int(inliers.sum()) < min_matches:
+            continue
+
+        w, h = sizes[int(item_id)]
+        corners = np.array([[0, 0, 1], [w, 0, 1], [0, h, 1], [w, h, 1]], np.float32)
+        mapped = corners @ matrix.T
+        x1, y1 = mapped.min(axis=0)
+        x2, y2 = mapped.max(axis=0)
+        bbox = [int(max(0, x1)), int(max(0, y1)), int(min(fw, x2)), int(min(fh, y2))]
+        if bbox[2] - bbox[0] < 2 or bbox[3] - bbox[1] < 2:
+            continue
+
+        score = similarity(frame, bbox, descriptors[int(item_id)])
+        if score < min_similarity:
+            continue
+        found[int(item_id)] = (bbox, int(inliers.sum()), score)
+    return found
@@ -0,0 +1,620 @@
+"""
+audio_stream.py — 연속 오디오 캡처 + 링 버퍼 + 에너지 VAD 분할
+마이크 스트림을 한 번만 열고 캡처 스레드가 16kHz float32 링 버퍼를 계속 채웁니다.
+STT 루프는 버퍼에서 발화 구간(Segment)만 꺼내 변환하므로,
+Whisper가 디코딩하는 동안에도 마이크 입력이 끊기지 않습니다.
+
+⚠️ PyQt5를 import하지 않습니다 (STT 프로세스에서 사용).
+"""
+import time
+import threading
+from collections import deque
+
+import numpy as np
+
+_PCM16_SCALE = np.float32(1.0 / 32768.0)
+
+
+class AudioRingBuffer:
+    """
+    고정 크기 float32 링 버퍼.
+    샘플은 누적 인덱스(처음부터 쓴 샘플 수)로 지정하며, 인덱스 ↔ time.monotonic() 변환을 지원합니다.
+    쓰기 스레드 1개 + 읽기 스레드 1개를 가정합니다.
+    """
+
+    def __init__(self, seconds=30.0, rate=16000):
+        self.rate = rate
+        self._buf = np.zeros(int(seconds * rate), np.float32)
+        self._total = 0          # 지금까지 쓴 샘플 수
+        self._last_time = None   # 마지막 쓰기 시각 (마지막 샘플의 시각)
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return len(self._buf)
+
+    @property
+    def total(self):
+        return self._total
+
+    def _spans(self, written):
+        """
+        written개 쓰기에서 실제로 남길 샘플 수 n과 링 버퍼 구간 두 개 (잠금 안에서 호출).
+        용량보다 길면 앞부분을 버리므로 남긴 샘플은 누적 인덱스 total + written - n부터 놓입니다.
+
+        Returns:
+            (n, (pos, pos + first), (0, n - first))
+        """
+        cap = len(self._buf)
+        n = min(written, cap)
+        pos = (self._total + written - n) % cap
+        first = min(n, cap - pos)
+        return n, (pos, pos + first), (0, n - first)
+
+    def write(self, samples, timestamp=None):
+        """샘플을 기록합니다 (가득 차면 가장 오래된 샘플을 덮어씀)."""
+        written = len(samples)
+        with self._lock:
+            n, (a, b), (_, rest) = self._spans(written)
+            samples = samples[written - n:]
+            self._buf[a:b] = samples[:b - a]
+            if rest:
+                self._buf[:rest] = samples[b - a:]
+            self._total += written
+            self._last_time = time.monotonic() if timestamp is None else timestamp
+
+    def write_pcm16(self, data, timestamp=None):
+        """
+        int16 PCM 바이트를 float32로 바꾸면서 버퍼에 바로 기록합니다.
+        중간 배열 없이 링 버퍼 구간에 곧바로 스케일링해 씁니다 (변환 + 복사 1회).
+        """
+        pcm = np.frombuffer(data, np.int16)
+        written = len(pcm)
+        with self._lock:
+            n, (a, b), (_, rest) = self._spans(written)
+            pcm = pcm[written - n:]
+            np.multiply(pcm[:b - a], _PCM16_SCALE, out=self._buf[a:b], casting="unsafe")
+            if rest:
+                np.multiply(pcm[b - a:], _PCM16_SCALE, out=self._buf[:rest], casting="unsafe")
+            self._total += written
+            self._last_time = time.monotonic() if timestamp is None else timestamp
+
+    def oldest(self):
+        """아직 버퍼에 남아 있는 가장 오래된 샘플 인덱스."""
+        return max(0, self._total - len(self._buf))
+
+    def read(self, start, end):
+        """
+        [start, end) 구간 샘플의 복사본을 반환합니다.
+        이미 덮어쓴 구간은 잘려 나갑니다.
+        """
+        with self._lock:
+            start = max(start, self.oldest())
+            end = min(end, self._total)
+            if end <= start:
+                return np.zeros(0, np.float32)
+            cap = len(self._buf)
+            s, e = start % cap, end % cap
+            if s < e:
+                return self._buf[s:e].copy()
+            return np.concatenate([self._buf[s:], self._buf[:e]])
+
+    def time_of(self, index):
+        """샘플 인덱스의 time.monotonic() 시각."""
+        if self._last_time is None:
+            return time.monotonic()
+        return self._last_time - (self._total - index) / self.rate
+
+
+class Segment:
+    """VAD가 잘라낸 발화 구간."""
+
+    __slots__ = ("audio", "start", "end", "start_time", "end_time", "truncated")
+
+    def __init__(self, audio, start, end, start_time, end_time, truncated):
+        self.audio = audio            # float32 (-1.0 ~ 1.0), 앞뒤 여백 포함
+        self.start = start            # 발화 시작 샘플 인덱스
+        self.end = end                # 발화 종료 샘플 인덱스
+        self.start_time = start_time  # time.monotonic()
+        self.end_time = end_time
+        self.truncated = truncated    # 최대 길이에 걸려 잘린 경우 True
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+
+class VadSegmenter:
+    """
+    RMS 에너지 기반 발화 구간 분할기 (히스테리시스 + 여백).
+    링 버퍼를 순서대로 읽으며 발화가 끝나면(pause) Segment를 돌려줍니다.
+    """
+
+    def __init__(self, ring, frame_ms=30, energy_threshold=0.009, pause_sec=0.6,
+                 pre_roll_sec=0.4, min_speech_sec=0.15, max_speech_sec=10.0,
+                 noise_factor=1.5, dynamic=True):
+        """
+        Args:
+            ring: AudioRingBuffer
+            frame_ms: 에너지 계산 프레임 길이
+            energy_threshold: 발화로 볼 RMS (float32 기준, 최소값)
+            pause_sec: 이 시간 이상 조용하면 발화 종료
+            pre_roll_sec: 발화 앞에 붙일 여백 (첫 음절 잘림 방지)
+            min_speech_sec: 이보다 짧은 발화는 잡음으로 버림
+            max_speech_sec: 발화 최대 길이 (넘으면 잘라서 반환)
+            noise_factor: 잡음 RMS 대비 임계값 배수
+            dynamic: 발화가 아닌 구간의 잡음 수준으로 임계값을 계속 보정
+        """
+        self.ring = ring
+        self.frame = int(ring.rate * frame_ms / 1000)
+        self.min_threshold = energy_threshold
+        self.threshold = energy_threshold
+        self.pause_frames = max(1, int(pause_sec * 1000 / frame_ms))
+        self.pre_roll = int(pre_roll_sec * ring.rate)
+        self.min_speech = int(min_speech_sec * ring.rate)
+        self.max_speech_sec = max_speech_sec
+        self.noise_factor = noise_factor
+        self.dynamic = dynamic
+
+        self._pos = ring.total   # 다음에 검사할 샘플 인덱스
+        self._speech_start = None
+        self._last_voiced = None
+        self._silent = 0
+        self._noise = None
+
+    @property
+    def in_speech(self):
+        return self._speech_start is not None
+
+    def pending(self):
+        """
+        진행 중인 발화의 (시작 샘플 인덱스, 앞 여백 포함 오디오)를 반환합니다 (발화 중이 아니면 None).
+        부분 인식용으로 아직 끝나지 않은 구간을 미리 읽을 때 사용합니다.
+        """
+        start = self._speech_start
+        if start is None:
+            return None
+        return start, self.ring.read(start - self.pre_roll, self._pos)
+
+    def calibrate(self, seconds=2.0):
+        """
+        주변 소음을 측정해 임계값을 정합니다 (캡처가 이미 돌고 있어야 함).
+        """
+        start = self.ring.total
+        target = start + int(seconds * self.ring.rate)
+        while self.ring.total < target:
+            time.sleep(0.05)
+        audio = self.ring.read(start, target)
+        rms = self._frame_rms(audio)
+        self._noise = float(np.median(rms)) if len(rms) else 0.0
+        self.threshold = max(self.min_threshold, self._noise * self.noise_factor)
+        self._pos = self.ring.total
+        print(f"[VAD] 잡음 RMS {self._noise:.4f} → 임계값 {self.threshold:.4f}")
+
+    def reset(self, max_speech_sec=None):
+        """진행 중인 발화를 버리고 현재 시점부터 다시 검사합니다."""
+        if max_speech_sec is not None:
+            self.max_speech_sec = max_speech_sec
+        self._pos = self.ring.total
+        self._speech_start = None
+        self._silent = 0
+
+    def voiced_samples(self, audio):
+        """오디오에서 현재 임계값 이상인 프레임의 샘플 수."""
+        return int(np.count_nonzero(self._frame_rms(audio) >= self.threshold)) * self.frame
+
+    def _frame_rms(self, audio):
+        n = len(audio) // self.frame
+        if n == 0:
+            return np.zeros(0, np.float32)
+        frames = audio[:n * self.frame].reshape(n, self.frame)
+        return np.sqrt(np.mean(frames * frames, axis=1))
+
+    def poll(self):
+        """
+        새로 들어온 샘플을 검사합니다.
+
+        Returns:
+            완료된 Segment 또는 None
+        """
+        # 버퍼가 한 바퀴 이상 앞서 나갔으면 (처리 지연) 남아 있는 구간부터 검사
+        oldest = self.ring.oldest()
+        if self._pos < oldest:
+            print(f"[VAD] 처리 지연으로 {(oldest - self._pos) / self.ring.rate:.1f}s 건너뜀")
+            self._pos = oldest
+            if self._speech_start is not None and self._speech_start < oldest:
+                self._speech_start = oldest
+
+        base = self._pos
+        n = (self.ring.total - base) // self.frame
+        if n == 0:
+            return None
+        audio = self.ring.read(base, base + n * self.frame)
+        rms = self._frame_rms(audio)
+        max_len = int(self.max_speech_sec * self.ring.rate)
+
+        for i, level in enumerate(rms):
+            frame_start = base + i * self.frame
+            frame_end = frame_start + self.frame
+            voiced = level >= self.threshold
+
+            if self._speech_start is None:
+                if voiced:
+                    self._speech_start = frame_start
+                    self._last_voiced = frame_end
+                    self._silent = 0
+                elif self.dynamic:
+                    # 조용한 구간의 잡음 수준을 천천히 따라감
+                    self._noise = level if self._noise is None else 0.98 * self._noise + 0.02 * level
+                    self.threshold = max(self.min_threshold, self._noise * self.noise_factor)
+                continue
+
+            if voiced:
+                self._last_voiced = frame_end
+                self._silent = 0
+            else:
+                self._silent += 1
+
+            truncated = frame_end - self._speech_start >= max_len
+            if self._silent >= self.pause_frames or truncated:
+                segment = self._finish(truncated)
+                if segment is not None:
+                    self._pos = frame_end
+                    return segment
+
+        self._pos = base + n * self.frame
+        return None
+
+    def _finish(self, truncated):
+        start, end = self._speech_start, self._last_voiced
+        self._speech_start = None
+        self._silent = 0
+        if end - start < self.min_speech:
+            return None
+        audio = self.ring.read(start - self.pre_roll, end)
+        return Segment(audio, start, end, self.ring.time_of(start), self.ring.time_of(end), truncated)
+
+
+class PlaybackGate:
+    """
+    앱 자신의 재생(TTS/효과음) 구간을 기록하고, 그 구간에 녹음된 샘플을 찾습니다.
+    UI 프로세스가 보낸 재생 시작/종료 시각(time.monotonic)을 사용합니다.
+    재생 구간은 [시작 + latency, 종료 + latency + tail]이며, 종료 알림이 없으면 max_sec 뒤에 닫힌 것으로 봅니다.
+    """
+
+    def __init__(self, latency_sec=0.05, tail_sec=0.3, max_sec=30.0, keep=16):
+        self.latency = latency_sec
+        self.tail = tail_sec
+        self.max_sec = max_sec
+        self._intervals = deque(maxlen=keep)   # [id, start, end|None, reference|None]
+
+    def start(self, playback_id, t, reference=None):
+        """재생 시작 (reference: 재생 신호 16kHz float32, 참조 신호 차감용 — 선택)."""
+        self._intervals.append([playback_id, t + self.latency, None, reference])
+
+    def end(self, playback_id, t):
+        for interval in reversed(self._intervals):
+            if interval[0] == playback_id:
+                interval[2] = t + self.latency
+                return
+
+    def _bounds(self, interval):
+        _, start, end, _ = interval
+        end = start + self.max_sec if end is None else end
+        return start, end + self.tail
+
+    def active(self, t=None):
+        """지금(또는 t 시각) 재생 중(잔향 포함)인지 여부."""
+        t = time.monotonic() if t is None else t
+        return any(start <= t <= end for start, end in map(self._bounds, self._intervals))
+
+    def mask(self, start_time, n, rate):
+        """
+        start_time에 시작하는 n개 샘플 중 재생 구간에 녹음된 샘플 표시 (bool 배열).
+        재생 구간과 겹치지 않으면 None.
+        """
+        result = None
+        for interval in self._intervals:
+            start, end = self._bounds(interval)
+            i0 = max(0, int((start - start_time) * rate))
+            i1 = min(n, int(np.ceil((end - start_time) * rate)))
+            if i1 <= i0:
+                continue
+            if result is None:
+                result = np.zeros(n, bool)
+            result[i0:i1] = True
+        return result
+
+    def reference(self, start_time, n, rate):
+        """
+        start_time에 시작하는 n개 샘플에 맞춰 정렬한 재생 참조 신호 (없으면 None).
+        참조 신호는 rate와 같은 샘플레이트여야 합니다.
+        """
+        result = None
+        for _, start, _, ref in self._intervals:
+            if ref is None:
+                continue
+            offset = int(round((start - start_time) * rate))   # 참조 신호 시작 위치 (오디오 기준)
+            a0, a1 = max(0, offset), min(n, offset + len(ref))
+            if a1 <= a0:
+                continue
+            if result is None:
+                result = np.zeros(n, np.float32)
+            result[a0:a1] += ref[a0 - offset:a1 - offset]
+        return result
+
+
+class NlmsCanceller:
+    """
+    블록 NLMS 적응 필터로 마이크 신호에서 재생 참조 신호(스피커 → 마이크 경로)를 빼냅니다.
+    블록마다 한 번 가중치를 갱신하므로 numpy 행렬 연산만으로 처리됩니다.
+    필터 가중치는 호출 사이에 유지됩니다 (같은 방이면 반향 경로가 크게 변하지 않음).
+    """
+
+    def __init__(self, taps=512, step=0.1, block=64):
+        self.taps = taps
+        self.step = step
+        self.block = block
+        self.weights = np.zeros(taps, np.float32)
+
+    def cancel(self, mic, ref):
+        """
+        Args:
+            mic: 마이크 신호 (float32)
+            ref: mic과 같은 길이로 정렬한 참조 신호
+        Returns:
+            반향을 뺀 잔차 신호
+        """
+        mic = np.asarray(mic, np.float32)
+        ref = np.concatenate([np.zeros(self.taps - 1, np.float32), np.asarray(ref, np.float32)])
+        out = mic.copy()
+        w = self.weights
+        view = np.lib.stride_tricks.sliding_window_view(ref, self.taps)[:, ::-1]   # (n, taps), 최신 샘플이 앞
+        for b0 in range(0, len(mic), self.block):
+            x = view[b0:b0 + self.block]
+            power = float(np.einsum("ij,ij->", x, x))
+            if power < 1e-8:
+                continue
+            e = mic[b0:b0 + self.block] - x @ w
+            out[b0:b0 + self.block] = e
+            # 샘플 단위 NLMS(step / |x|²)를 블록 평균 입력 에너지로 근사
+            w += (self.step * len(x) / (power + 1e-6)) * (x.T @ e)
+        return out
+
+
+class StreamResampler:
+    """
+    청크 단위 스트리밍 선형 보간 리샘플러 (마이크가 16kHz를 지원하지 않을 때만 사용).
+    청크 경계의 위상과 마지막 샘플을 이어 받으므로 이어 붙인 결과가 한 번에 변환한 것과 같고,
+    작업 배열을 미리 잡아 두어 청크마다 새 배열을 만들지 않습니다.
+    """
+
+    def __init__(self, src_rate, dst_rate, chunk=512):
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.step = src_rate / dst_rate
+        self._phase = 1.0           # 다음 출력 샘플 위치 (_ext 좌표, _ext[0]은 직전 청크의 마지막 샘플)
+        self._alloc(chunk)
+
+    def _alloc(self, chunk):
+        self.chunk = chunk
+        size = int(chunk / self.step) + 2
+        self._ext = np.zeros(chunk + 1, np.float32)
+        self._base = np.arange(size, dtype=np.float64) * self.step
+        self._pos = np.empty(size, np.float64)
+        self._idx = np.empty(size, np.intp)
+        self._a = np.empty(size, np.float32)
+        self._b = np.empty(size, np.float32)
+        self._out = np.empty(size, np.float32)
+
+    def process(self, data):
+        """
+        int16 PCM 바이트 한 청크를 변환합니다.
+
+        Returns:
+            dst_rate float32 샘플 (내부 버퍼의 view — 다음 호출 전에 소비해야 함)
+        """
+        pcm = np.frombuffer(data, np.int16)
+        n = len(pcm)
+        if n > self.chunk:
+            last = self._ext[0]
+            self._alloc(n)
+            self._ext[0] = last
+        ext = self._ext
+        np.multiply(pcm, _PCM16_SCALE, out=ext[1:n + 1], casting="unsafe")
+
+        m = max(0, int(np.ceil((n - self._phase) / self.step)))
+        pos, idx, a, b, out = self._pos[:m], self._idx[:m], self._a[:m], self._b[:m], self._out[:m]
+        np.add(self._base[:m], self._phase, out=pos)
+        idx[:] = pos                 # 양수이므로 버림 = floor
+        pos -= idx                   # 소수부 (보간 가중치)
+        np.take(ext, idx, out=a)
+        idx += 1
+        np.take(ext, idx, out=b)
+        b -= a
+        np.multiply(b, pos, out=b, casting="unsafe")
+        np.add(a, b, out=out)
+
+        self._phase += m * self.step - n
+        ext[0] = ext[n]
+        return out
+
+
+class MicCapture:
+    """
+    마이크 스트림을 한 번만 열고 별도 스레드에서 링 버퍼를 계속 채웁니다.
+    speech_recognition.Microphone(PyAudio)을 사용합니다.
+
+    장치가 지원하면 링 버퍼와 같은 rate(16kHz) mono int16으로 열어 리샘플링 없이
+    int16 → float32 변환을 링 버퍼에 바로 씁니다. 지원하지 않으면 장치 기본 rate로 열고
+    StreamResampler로 변환합니다.
+    """
+
+    def __init__(self, ring, chunk=512, device_index=None):
+        self.ring = ring
+        self.chunk = chunk
+        self.device_index = device_index
+        self.rate = None     # 실제로 연 마이크 rate
+        self._thread = None
+        self._running = False
+        self.error = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="MicCapture", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def _device_rate(self):
+        """링 버퍼 rate를 장치가 지원하면 그 rate, 아니면 장치 기본 rate."""
+        try:
+            import pyaudio
+            pa = pyaudio.PyAudio()
+        except Exception:
+            return self.ring.rate
+        try:
+            if self.device_index is None:
+                info = pa.get_default_input_device_info()
+            else:
+                info = pa.get_device_info_by_index(self.device_index)
+            try:
+                pa.is_format_supported(self.ring.rate, input_device=info["index"],
+                                       input_channels=1, input_format=pyaudio.paInt16)
+                return self.ring.rate
+            except ValueError:
+                return int(info["defaultSampleRate"])
+        except Exception:
+            return self.ring.rate
+        finally:
+            pa.terminate()
+
+    def _run(self):
+        import speech_recognition as sr
+        self.rate = self._device_rate()
+        resampler = None
+        if self.rate != self.ring.rate:
+            # 장치 rate 청크 → 16kHz
+            resampler = StreamResampler(self.rate, self.ring.rate, self.chunk)
+            print(f"[Audio] 마이크가 {self.ring.rate}Hz를 지원하지 않아 {self.rate}Hz로 열고 변환합니다.")
+        mic = sr.Microphone(device_index=self.device_index, sample_rate=self.rate,
+                            chunk_size=self.chunk)
+        try:
+            with mic as source:
+                while self._running:
+                    data = source.stream.read(self.chunk)
+                    if resampler is None:
+                        self.ring.write_pcm16(data)
+                    else:
+                        self.ring.write(resampler.process(data))
+        except Exception as e:
+            self.error = e
+            print(f"[Audio] 마이크 캡처 오류: {e}")
+
+
+class WavFileSource:
+    """
+    MicCapture 대신 쓰는 파일 기반 오디오 입력 (마이크 없는 오프라인 벤치마크용).
+    play() 전까지는 약한 잡음(VAD 보정용)을, play() 뒤에는 오디오를 실제 시간 속도로 링 버퍼에 씁니다.
+    샘플 시각은 play_time + 샘플 위치 / rate로 정확히 기록되므로 발화 시각과 지연을 계산할 수 있습니다.
+    오디오와 tail_sec 무음까지 모두 쓰면 finished가 True가 됩니다.
+    """
+
+    def __init__(self, ring, audio, chunk=512, tail_sec=2.0, noise_level=1e-4, autoplay=False):
+        """
+        Args:
+            ring: AudioRingBuffer
+            audio: 16kHz float32 배열 또는 WAV 파일 경로
+            tail_sec: 오디오 뒤에 붙일 무음 (마지막 발화의 pause 판정용)
+            noise_level: 무음 구간에 넣을 잡음 RMS
+            autoplay: True면 start() 즉시 재생
+        """
+        if isinstance(audio, str):
+            audio = read_wav(audio, ring.rate)
+        self.ring = ring
+        self.chunk = chunk
+        self.noise_level = noise_level
+        tail = np.zeros(int(tail_sec * ring.rate), np.float32)
+        self.audio = np.concatenate([np.asarray(audio, np.float32), tail])
+        self.play_time = None
+        self.finished = False
+        self.error = None
+        self._play = threading.Event()
+        if autoplay:
+            self._play.set()
+        self._thread = None
+        self._running = False
+
+    @property
+    def duration(self):
+        return len(self.audio) / self.ring.rate
+
+    def play(self):
+        """준비 구간(잡음)을 끝내고 오디오 재생을 시작합니다."""
+        self._play.set()
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="WavFileSource", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def _run(self):
+        rate = self.ring.rate
+        rng = np.random.default_rng(0)
+        chunk_sec = self.chunk / rate
+        # 재생 전: 실제 시간 속도로 약한 잡음
+        next_time = time.monotonic()
+        while self._running and not self._play.is_set():
+            next_time += chunk_sec
+            time.sleep(max(0.0, next_time - time.monotonic()))
+            noise = rng.normal(0.0, self.noise_level, self.chunk).astype(np.float32)
+            self.ring.write(noise, next_time)
+
+        self.play_time = next_time
+        for offset in range(0, len(self.audio), self.chunk):
+            if not self._running:
+                return
+            samples = self.audio[offset:offset + self.chunk]
+            end_time = self.play_time + (offset + len(samples)) / rate
+            time.sleep(max(0.0, end_time - time.monotonic()))
+            self.ring.write(samples, end_time)
+        self.finished = True
+
+    def time_of(self, offset_sec):
+        """재생 오디오의 offset_sec 위치의 time.monotonic() 시각."""
+        return self.play_time + offset_sec
+
+
+def read_wav(path, rate=16000):
+    """
+    WAV 파일을 mono float32(-1.0 ~ 1.0)로 읽고 rate로 리샘플링합니다 (선형 보간).
+    """
+    import wave
+    with wave.open(path, "rb") as wf:
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        src_rate = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+
+    if width == 1:
+        audio = (np.frombuffer(raw, np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        audio = np.frombuffer(raw, np.int16).astype(np.float32) / 32768.0
+    elif width == 4:
+        audio = np.frombuffer(raw, np.int32).astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"지원하지 않는 샘플 폭: {width} bytes")
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if src_rate != rate and len(audio) > 1:
+        n = int(round(len(audio) * rate / src_rate))
+        audio = np.interp(np.arange(n) * (src_rate / rate), np.arange(len(audio)), audio).astype(np.float32)
+    return audio.astype(np.float32, copy=False)
@@ -0,0 +1,161 @@
+"""
+bbox_refiner.py — Gemini bbox를 물체의 실제 경계에 맞게 로컬 보정
+Gemini의 0~1000 좌표는 느슨하거나 어긋나는 경우가 많아,
+bbox 주변 크롭에 GrabCut(실패 시 윤곽선 분석)을 적용해 박스를 조입니다.
+
+시간 예산은 실행 전에 최근 비용으로 판단해 크롭을 줄이거나 GrabCut을 건너뛰고,
+결과가 비정상이면 원래 박스를 그대로 사용합니다.
+"""
+import time
+
+import cv2
+import numpy as np
+
+
+def _iou(a, b):
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _largest_component_box(mask):
+    """이진 마스크에서 가장 큰 연결 요소의 [x1, y1, x2, y2]."""
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    if count <= 1:
+        return None
+    idx = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    x, y, w, h = stats[idx, :4]
+    return [int(x), int(y), int(x + w), int(y + h)]
+
+
+def _grabcut_box(crop, rect):
+    mask = np.zeros(crop.shape[:2], np.uint8)
+    bgd = np.zeros((1, 65), np.float64)
+    fgd = np.zeros((1, 65), np.float64)
+    cv2.grabCut(crop, mask, rect, bgd, fgd, 1, cv2.GC_INIT_WITH_RECT)
+    fg = np.where((mask == cv2.GC_FGD) | (mask == cv2.GC_PR_FGD), 255, 0).astype(np.uint8)
+    return _largest_component_box(fg)
+
+
+def _contour_box(crop, rect):
+    """원래 박스 안쪽의 에지들을 감싸는 박스 (GrabCut 실패 시 대안)."""
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(gray, 50, 150)
+    x, y, w, h = rect
+    inner = np.zeros_like(edges)
+    inner[y:y + h, x:x + w] = edges[y:y + h, x:x + w]
+    inner = cv2.dilate(inner, None)
+    return _largest_component_box(inner)
+
+
+# 방법별 최근 처리 비용 (ms / 처리 픽셀, 지수 이동 평균) — 실행 전 예산 판단용
+_cost_per_px = {"grabcut": None, "contour": None}
+_COST_SMOOTHING = 0.3
+MIN_GRABCUT_SIDE = 48   # 예산에 맞추려고 이보다 작게 줄여야 하면 GrabCut을 건너뜀
+
+
+def _estimate_ms(method, pixels):
+    cost = _cost_per_px[method]
+    return None if cost is None else cost * pixels
+
+
+def _record_cost(method, elapsed_ms, pixels):
+    cost = elapsed_ms / max(1, pixels)
+    prev = _cost_per_px[method]
+    _cost_per_px[method] = cost if prev is None else prev + _COST_SMOOTHING * (cost - prev)
+
+
+def refine_bbox(frame, bbox, budget_ms=40.0, max_side=120, margin=0.3, slack=0.1,
+                min_iou=0.3, min_area_ratio=0.2):
+    """
+    bbox를 물체의 실제 경계로 조입니다.
+
+    예산은 실행 전에 적용합니다: 최근 측정한 픽셀당 비용으로 남은 예산 안에 끝날지 추정해
+    GrabCut 크롭을 더 줄이거나(최소 MIN_GRABCUT_SIDE) 윤곽선 분석만 합니다.
+    이미 계산한 결과는 추정이 빗나가 예산을 넘었더라도 버리지 않습니다.
+
+    Args:
+        frame: 원본 BGR 프레임
+        bbox: [x1, y1, x2, y2] 픽셀 좌표 (Gemini 원본)
+        budget_ms: 시간 예산 (남은 예산에 맞지 않는 단계는 건너뜀)
+        max_side: 처리용 크롭 최대 변 길이 (축소 후 처리)
+        margin: 크롭 시 bbox 주변 여백 비율 (배경 색 모델링용)
+        slack: 전경 탐색 영역을 bbox보다 넓히는 비율 (어긋난 박스 보정용)
+        min_iou: 보정 박스와 원본 박스의 최소 IoU (과도한 이동 방지)
+        min_area_ratio: 원본 대비 최소 면적 비율
+
+    Returns:
+        (bbox, method, elapsed_ms) — method는 "grabcut" / "contour" / "raw"
+    """
+    start = time.perf_counter()
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = bbox
+    bw, bh = x2 - x1, y2 - y1
+    if bw < 8 or bh < 8:
+        return bbox, "raw", 0.0
+
+    # bbox 주변 여백 포함 크롭
+    cx1, cy1 = max(0, int(x1 - bw * margin)), max(0, int(y1 - bh * margin))
+    cx2, cy2 = min(w, int(x2 + bw * margin)), min(h, int(y2 + bh * margin))
+    full_crop = frame[cy1:cy2, cx1:cx2]
+    full_side = max(full_crop.shape[:2])
+    # 전경 탐색 영역: 어긋난 박스도 보정할 수 있게 bbox보다 조금 넓게
+    sx1, sy1 = max(cx1, x1 - bw * slack), max(cy1, y1 - bh * slack)
+    sx2, sy2 = min(cx2, x2 + bw * slack), min(cy2, y2 + bh * slack)
+    search_area = (sx2 - sx1) * (sy2 - sy1)
+
+    def prepare(side):
+        """처리용으로 축소한 크롭, 탐색 rect, 축소 비율."""
+        scale = min(1.0, side / full_side)
+        crop = full_crop
+        if scale < 1.0:
+            crop = cv2.resize(full_crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        rect = (
+            int((sx1 - cx1) * scale), int((sy1 - cy1) * scale),
+            max(1, int((sx2 - sx1) * scale)), max(1, int((sy2 - sy1) * scale)),
+        )
+        return crop, rect, scale
+
+    def acceptable(box):
+        if box is None:
+            return False
+        area = (box[2] - box[0]) * (box[3] - box[1])
+        if area > search_area * 0.95:
+            return False  # 탐색 영역 전체 = 경계를 찾지 못함
+        return area >= bw * bh * min_area_ratio and _iou(box, bbox) >= min_iou
+
+    side = min(max_side, full_side)
+    for method, fn in (("grabcut", _grabcut_box), ("contour", _contour_box)):
+        remaining = budget_ms - (time.perf_counter() - start) * 1000
+        pixels = side * side * full_crop.shape[0] * full_crop.shape[1] / (full_side * full_side)
+        estimate = _estimate_ms(method, pixels)
+        method_side = side
+        if estimate is not None and estimate > remaining:
+            # 비용은 픽셀 수에 비례 → 예산에 맞는 변 길이로 줄임
+            method_side = int(side * (max(remaining, 0.0) / estimate) ** 0.5)
+            if method == "grabcut" and method_side < MIN_GRABCUT_SIDE:
+                # 건너뛸 때마다 추정을 조금 낮춰 일시적으로 느렸던 측정에 계속 묶이지 않게 함
+                _cost_per_px[method] *= 0.9
+                continue
+            if method_side < 8:
+                break
+
+        crop, rect, scale = prepare(method_side)
+        method_start = time.perf_counter()
+        try:
+            local = fn(crop, rect)
+        except cv2.error:
+            local = None
+        _record_cost(method, (time.perf_counter() - method_start) * 1000, crop.shape[0] * crop.shape[1])
+        elapsed = (time.perf_counter() - start) * 1000
+        if local is not None:
+            refined = [
+                int(cx1 + local[0] / scale), int(cy1 + local[1] / scale),
+                int(cx1 + local[2] / scale), int(cy1 + local[3] / scale),
+            ]
+            if acceptable(refined):
+                return refined, method, elapsed
+
+    return bbox, "raw", (time.perf_counter() - start) * 1000
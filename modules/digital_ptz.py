@@ -119,6 +119,14 @@ class DigitalPTZ:
         """풀샷(전체 뷰)으로 스무스하게 복원합니다."""
         self._start_animation(list(self.full_view), duration)
 
+    def target_view(self):
+        """애니메이션이 끝났을 때의 뷰포트 (진행 중이 아니면 현재 뷰포트) 복사본."""
+        return list(self._anim_end_view if self._animating else self.current_view)
+
+    def restore_view(self, view, duration=0.4):
+        """target_view()로 저장해 둔 뷰포트로 되돌립니다."""
+        self._start_animation(list(view), duration)
+
     def _start_animation(self, target_view, duration):
         """애니메이션을 시작합니다."""
         self._anim_start_view = list(self.current_view)
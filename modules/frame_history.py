@@ -0,0 +1,156 @@
+"""
+frame_history.py — 타임스탬프가 붙은 최근 프레임 기록 (복사 없음)
+음성 명령이 변환되는 동안 손이 움직여도, 사용자가 말하던 시점의
+프레임을 골라 감지에 사용할 수 있게 합니다.
+
+프레임은 복사하지 않고 읽기 전용으로 잠가 참조만 보관합니다.
+감지 등에 사용 중인 프레임은 acquire()/release()로 고정(pin)하여
+기록에서 밀려나지 않게 합니다.
+
+그레이스케일/축소 이미지 등 파생 이미지는 TimedFrame.level()로 처음 요청될 때
+한 번만 만들어 프레임에 붙여 두고, 선명도·장면 변화·포인팅·캐시 해시 등
+모든 분석 단계가 공유합니다. 프레임이 기록에서 밀려나면 함께 해제됩니다.
+"""
+import time
+import threading
+from collections import deque
+
+import cv2
+
+
+class TimedFrame:
+    """캡처 시각과 참조 카운트를 가진 읽기 전용 프레임."""
+
+    __slots__ = ("image", "timestamp", "sharpness", "_refs", "_derived")
+
+    def __init__(self, image, timestamp):
+        # 복사 없이 보관하므로 이후 누구도 수정하지 못하게 잠급니다.
+        image.flags.writeable = False
+        self.image = image
+        self.timestamp = timestamp
+        self.sharpness = None  # frame_quality.frame_sharpness()가 채우는 캐시
+        self._refs = 0
+        self._derived = {}     # (너비, 그레이 여부) → 파생 이미지
+
+    def level(self, width, gray=False):
+        """
+        너비 width로 축소한 파생 이미지 (프레임당 한 번만 계산, 읽기 전용).
+        이미 만들어 둔 더 큰 단계가 있으면 원본 대신 그 단계에서 축소합니다 (피라미드).
+        여러 스레드에서 동시에 요청하면 중복 계산될 수는 있지만 결과는 같습니다.
+
+        Args:
+            width: 목표 너비 (원본보다 크면 원본 크기)
+            gray: True면 그레이스케일
+        """
+        full_w = self.image.shape[1]
+        width = min(width, full_w)
+        key = (width, gray)
+        cached = self._derived.get(key)
+        if cached is not None:
+            return cached
+
+        if gray:
+            src = self.level(width)
+            out = src if src.ndim == 2 else cv2.cvtColor(src, cv2.COLOR_BGR2GRAY)
+        elif width == full_w:
+            out = self.image
+        else:
+            src = self.image
+            for (w, g), img in list(self._derived.items()):
+                if not g and width < w < src.shape[1]:
+                    src = img
+            height = max(1, round(self.image.shape[0] * width / full_w))
+            out = cv2.resize(src, (width, height), interpolation=cv2.INTER_AREA)
+
+        out.flags.writeable = False
+        self._derived[key] = out
+        return out
+
+    def gray(self):
+        """원본 크기 그레이스케일 이미지."""
+        return self.level(self.image.shape[1], gray=True)
+
+    @property
+    def pinned(self):
+        return self._refs > 0
+
+    def acquire(self):
+        self._refs += 1
+        return self
+
+    def release(self):
+        if self._refs > 0:
+            self._refs -= 1
+
+
+class FrameHistory:
+    """용량 제한이 있는 타임스탬프 프레임 링 (고정 프레임 우선 보존)."""
+
+    def __init__(self, capacity=50, max_pinned=8):
+        """
+        Args:
+            capacity: 보관할 최근 프레임 수
+            max_pinned: 용량 초과 시에도 보존할 고정 프레임 최대 수 (하드 상한)
+        """
+        self.capacity = capacity
+        self.max_pinned = max_pinned
+        self._frames = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def push(self, image, timestamp=None):
+        """새 프레임을 기록합니다 (복사 없음)."""
+        frame = TimedFrame(image, time.monotonic() if timestamp is None else timestamp)
+        with self._lock:
+            self._frames.append(frame)
+            self._evict()
+        return frame
+
+    def _evict(self):
+        """용량을 넘으면 가장 오래된 비고정 프레임부터 제거합니다."""
+        while len(self._frames) > self.capacity:
+            for i, frame in enumerate(self._frames):
+                if not frame.pinned:
+                    del self._frames[i]
+                    break
+            else:
+                break
+        # 고정 프레임이 너무 많으면 오래된 순으로 하드 상한까지 제거
+        while len(self._frames) > self.capacity + self.max_pinned:
+            self._frames.popleft()
+
+    def latest(self):
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+    def nearest(self, timestamp):
+        """주어진 시각에 가장 가까운 프레임을 반환합니다."""
+        with self._lock:
+            if not self._frames:
+                return None
+            return min(self._frames, key=lambda f: abs(f.timestamp - timestamp))
+
+    def window(self, start, end):
+        """[start, end] 구간에 캡처된 프레임 목록 (오래된 순)."""
+        with self._lock:
+            return [f for f in self._frames if start <= f.timestamp <= end]
+
+    def around(self, timestamp, count):
+        """주어진 시각에 가까운 프레임 count개 (시간 순)."""
+        with self._lock:
+            frames = sorted(self._frames, key=lambda f: abs(f.timestamp - timestamp))[:count]
+        return sorted(frames, key=lambda f: f.timestamp)
+
+    def for_utterance(self, start, end, position=0.5):
+        """
+        발화 구간에서 사용자가 가리키던 순간에 해당하는 프레임을 고릅니다.
+
+        Args:
+            start, end: 발화 시작/종료 시각 (time.monotonic 기준)
+            position: 발화 구간 내 기준 위치 (0.0=시작, 1.0=끝)
+        """
+        if start is None or end is None:
+            return self.latest()
+        return self.nearest(start + (end - start) * position)
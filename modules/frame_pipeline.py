@@ -0,0 +1,251 @@
+"""
+frame_pipeline.py — 프레임 처리 파이프라인 (단계별 입력/출력, 실행기, 시간 예산)
+프레임 타이머 한 번(tick)마다 등록된 단계(Stage)를 순서대로 실행합니다.
+
+    pipeline = FramePipeline()
+    pipeline.add(Stage("capture", capture_fn, outputs=("frame",), executor="thread"))
+    pipeline.add(Stage("ptz", ptz_fn, inputs=("frame",), outputs=("view",), budget_ms=5))
+    pipeline.tick()
+
+- 단계는 필요한 입력 키와 만들어 내는 출력 키를 선언합니다.
+  등록 시 앞 단계가 입력을 만들어 주는지 검사하고, 실행 시 입력이 없으면 건너뜁니다(starved).
+- executor="inline"은 호출 스레드(GUI)에서, "thread"/"process"는 전용 작업자에서 실행합니다.
+  비동기 단계는 tick을 막지 않으며, 완료된 결과는 다음 tick에 한 번 전달됩니다.
+  ("process" 단계의 함수와 입력은 pickle 가능해야 합니다.)
+- budget_ms를 넘기면 policy에 따라
+  "skip": 초과한 만큼 다음 프레임들을 건너뛰고,
+  "degrade": 다음 실행부터 degrade 함수(저비용 대체)를 사용합니다.
+- stats()/summary()로 단계별 소요 시간(평균/p95/최대)과 건너뜀 횟수를 볼 수 있습니다.
+"""
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+EXECUTORS = ("inline", "thread", "process")
+POLICIES = ("skip", "degrade")
+
+
+def _timed_call(fn, inputs):
+    """작업자에서 실행: (출력 dict, 소요 ms)."""
+    start = time.perf_counter()
+    outputs = fn(inputs)
+    return outputs, (time.perf_counter() - start) * 1000
+
+
+class Stage:
+    """파이프라인 단계 (플러그인)."""
+
+    def __init__(self, name, fn, inputs=(), outputs=(), executor="inline",
+                 budget_ms=None, policy="skip", degrade=None, recover_after=30):
+        """
+        Args:
+            name: 단계 이름
+            fn: fn(inputs: dict) → dict (outputs 키의 값) 또는 None
+            inputs: 필요한 입력 키 목록
+            outputs: 만들어 내는 출력 키 목록
+            executor: "inline" | "thread" | "process"
+            budget_ms: 1회 실행 시간 예산 (None이면 제한 없음)
+            policy: 예산 초과 시 "skip" 또는 "degrade"
+            degrade: policy="degrade"일 때 사용할 저비용 함수 (fn과 같은 형식)
+            recover_after: degrade 상태에서 예산 안에 이만큼 연속 성공하면 원래 함수로 복귀
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"알 수 없는 실행기: {executor}")
+        if policy not in POLICIES:
+            raise ValueError(f"알 수 없는 예산 정책: {policy}")
+        if policy == "degrade" and degrade is None:
+            raise ValueError(f"'{name}': degrade 정책에는 degrade 함수가 필요합니다")
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.executor = executor
+        self.budget_ms = budget_ms
+        self.policy = policy
+        self.degrade = degrade
+        self.recover_after = recover_after
+
+        self.degraded = False
+        self._skip = 0         # 남은 건너뛸 프레임 수
+        self._within = 0       # degrade 상태에서 연속으로 예산을 지킨 횟수
+        self._pool = None
+        self._future = None
+        self._future_degraded = False
+        self._times = deque(maxlen=240)
+        self.runs = 0
+        self.skipped = 0
+        self.starved = 0
+        self.overruns = 0
+        self.degraded_runs = 0
+
+    # ── 예산 관리 ──
+    def _record(self, elapsed_ms, degraded):
+        self._times.append(elapsed_ms)
+        self.runs += 1
+        if degraded:
+            self.degraded_runs += 1
+        if self.budget_ms is None:
+            return
+        if elapsed_ms <= self.budget_ms:
+            if self.degraded:
+                self._within += 1
+                if self._within >= self.recover_after:
+                    self.degraded = False
+                    self._within = 0
+            return
+
+        self.overruns += 1
+        if self.policy == "skip":
+            # 예산의 n배를 썼으면 다음 n-1 프레임을 건너뛰어 평균 비용을 예산에 맞춤
+            self._skip = min(30, math.ceil(elapsed_ms / self.budget_ms) - 1)
+        else:
+            self.degraded = True
+            self._within = 0
+
+    def _should_skip(self):
+        if self._skip > 0:
+            self._skip -= 1
+            self.skipped += 1
+            return True
+        return False
+
+    def _current_fn(self):
+        return self.degrade if self.degraded else self.fn
+
+    # ── 실행 ──
+    def run(self, context):
+        """
+        단계를 실행하고 이번 tick에 전달할 출력 dict를 반환합니다 (없으면 None).
+        """
+        inputs = {}
+        for key in self.inputs:
+            if key not in context:
+                self.starved += 1
+                return self._collect() if self.executor != "inline" else None
+            inputs[key] = context[key]
+
+        if self.executor == "inline":
+            if self._should_skip():
+                return None
+            degraded = self.degraded
+            start = time.perf_counter()
+            outputs = self._current_fn()(inputs)
+            self._record((time.perf_counter() - start) * 1000, degraded)
+            return outputs
+
+        outputs = self._collect()
+        if self._future is None and not self._should_skip():
+            self._submit(inputs)
+        return outputs
+
+    def _submit(self, inputs):
+        if self._pool is None:
+            pool_cls = ThreadPoolExecutor if self.executor == "thread" else ProcessPoolExecutor
+            self._pool = pool_cls(max_workers=1)
+        self._future = self._pool.submit(_timed_call, self._current_fn(), inputs)
+        self._future_degraded = self.degraded
+
+    def _collect(self):
+        """완료된 비동기 결과를 한 번 꺼냅니다."""
+        future = self._future
+        if future is None or not future.done():
+            return None
+        self._future = None
+        try:
+            outputs, elapsed_ms = future.result()
+        except Exception as e:
+            print(f"[Pipeline] '{self.name}' 단계 오류: {e}")
+            return None
+        self._record(elapsed_ms, self._future_degraded)
+        return outputs
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def stats(self):
+        times = sorted(self._times)
+        n = len(times)
+        return {
+            "executor": self.executor,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "starved": self.starved,
+            "overruns": self.overruns,
+            "degraded_runs": self.degraded_runs,
+            "degraded": self.degraded,
+            "budget_ms": self.budget_ms,
+            "avg_ms": sum(times) / n if n else 0.0,
+            "p95_ms": times[min(n - 1, int(n * 0.95))] if n else 0.0,
+            "max_ms": times[-1] if n else 0.0,
+        }
+
+
+class FramePipeline:
+    """단계 목록을 tick마다 순서대로 실행합니다."""
+
+    def __init__(self, source_keys=()):
+        """
+        Args:
+            source_keys: tick(context)으로 외부에서 넣어 주는 키 (첫 단계의 입력이 될 수 있음)
+        """
+        self.source_keys = tuple(source_keys)
+        self.stages = []
+        self.ticks = 0
+        self._tick_times = deque(maxlen=240)
+
+    def add(self, stage):
+        """단계를 등록합니다. 입력이 앞 단계(또는 source_keys)에서 만들어지는지 검사합니다."""
+        available = set(self.source_keys)
+        for existing in self.stages:
+            if existing.name == stage.name:
+                raise ValueError(f"이미 등록된 단계: {stage.name}")
+            available.update(existing.outputs)
+        missing = [key for key in stage.inputs if key not in available]
+        if missing:
+            raise ValueError(f"'{stage.name}' 단계의 입력을 만드는 앞 단계가 없습니다: {missing}")
+        self.stages.append(stage)
+        return stage
+
+    def tick(self, context=None):
+        """
+        모든 단계를 한 번 실행합니다.
+
+        Returns:
+            이번 tick의 context dict (각 단계의 출력이 누적됨)
+        """
+        context = dict(context or {})
+        start = time.perf_counter()
+        for stage in self.stages:
+            try:
+                outputs = stage.run(context)
+            except Exception as e:
+                print(f"[Pipeline] '{stage.name}' 단계 오류: {e}")
+                continue
+            if outputs:
+                context.update(outputs)
+        self.ticks += 1
+        self._tick_times.append((time.perf_counter() - start) * 1000)
+        return context
+
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def summary(self):
+        """단계별 시간 요약 문자열."""
+        parts = []
+        for name, s in self.stats().items():
+            text = f"{name}[{s['executor']}] {s['avg_ms']:.1f}/{s['p95_ms']:.1f}/{s['max_ms']:.1f}ms"
+            if s["skipped"] or s["overruns"]:
+                text += f" 초과 {s['overruns']} 건너뜀 {s['skipped']}"
+            if s["degraded_runs"]:
+                text += f" 저하 {s['degraded_runs']}"
+            parts.append(text)
+        tick_avg = sum(self._tick_times) / len(self._tick_times) if self._tick_times else 0.0
+        return f"tick {tick_avg:.1f}ms ({self.ticks}회) | " + ", ".join(parts)
+
+    def shutdown(self):
+        for stage in self.stages:
+            stage.shutdown(wait=False)
@@ -0,0 +1,45 @@
+"""
+frame_quality.py — 감지 입력용 프레임 품질 평가
+손이 움직이는 중의 흐린 프레임 대신 가장 선명한 프레임을 골라 Gemini에 보냅니다.
+"""
+import time
+
+import cv2
+
+SHARPNESS_WIDTH = 320  # 선명도 계산용 축소 너비 (720p 기준 수 ms 이내)
+
+
+def sharpness(image, width=SHARPNESS_WIDTH):
+    """
+    축소한 그레이스케일 이미지의 라플라시안 분산(선명도 점수)을 계산합니다.
+    값이 클수록 경계가 뚜렷한(덜 흐린) 프레임입니다.
+    """
+    h, w = image.shape[:2]
+    if w > width:
+        image = cv2.resize(image, (width, int(h * width / w)), interpolation=cv2.INTER_AREA)
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    _, std = cv2.meanStdDev(cv2.Laplacian(image, cv2.CV_32F))
+    return float(std[0, 0] ** 2)
+
+
+def frame_sharpness(timed_frame):
+    """TimedFrame의 선명도 점수 (프레임당 한 번만 계산하여 캐시)."""
+    if timed_frame.sharpness is None:
+        timed_frame.sharpness = sharpness(timed_frame.level(SHARPNESS_WIDTH, gray=True))
+    return timed_frame.sharpness
+
+
+def select_sharpest(timed_frames):
+    """
+    후보 프레임 중 선명도 점수가 가장 높은 프레임을 고릅니다.
+
+    Returns:
+        (TimedFrame, score, elapsed_ms) 또는 후보가 없으면 (None, 0.0, 0.0)
+    """
+    if not timed_frames:
+        return None, 0.0, 0.0
+    start = time.perf_counter()
+    scored = [(frame_sharpness(f), f) for f in timed_frames]
+    score, best = max(scored, key=lambda item: item[0])
+    return best, score, (time.perf_counter() - start) * 1000
@@ -0,0 +1,208 @@
+"""
+hand_pointer.py — CPU 전용 손가락 끝 / 포인팅 방향 추정
+클래식 OpenCV(피부색 분할 + 윤곽선 + 볼록 결함)로 손을 찾아
+손가락 끝 위치와 가리키는 방향(ray)을 추정합니다.
+
+추정 결과는
+  1) Gemini 요청 이미지를 ray 주변 영역으로 잘라내고 (ray_roi)
+  2) ray가 이미 등록된 타겟을 관통하면 Gemini 없이 바로 판정 (first_hit)
+하는 데 사용됩니다.
+"""
+import cv2
+import numpy as np
+
+WORK_WIDTH = 320  # 추정용 축소 너비
+
+# YCrCb 피부색 범위 (조명 변화에 비교적 강인한 Cr/Cb 채널 사용)
+SKIN_LOWER = np.array([0, 133, 77], np.uint8)
+SKIN_UPPER = np.array([255, 173, 127], np.uint8)
+
+_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+
+class PointingEstimate:
+    """손가락 끝 위치와 포인팅 방향 (원본 프레임 픽셀 좌표)."""
+
+    __slots__ = ("fingertip", "direction", "confidence", "hand_bbox")
+
+    def __init__(self, fingertip, direction, confidence, hand_bbox):
+        self.fingertip = fingertip    # (x, y)
+        self.direction = direction    # (dx, dy) 단위 벡터
+        self.confidence = confidence  # 0.0 ~ 1.0
+        self.hand_bbox = hand_bbox    # [x1, y1, x2, y2]
+
+    def __repr__(self):
+        return (
+            f"PointingEstimate(tip=({self.fingertip[0]:.0f}, {self.fingertip[1]:.0f}), "
+            f"dir=({self.direction[0]:+.2f}, {self.direction[1]:+.2f}), conf={self.confidence:.2f})"
+        )
+
+
+def estimate_pointing(frame, work_width=WORK_WIDTH, min_area_ratio=0.005, small=None):
+    """
+    프레임에서 가장 큰 피부색 영역을 손으로 보고 포인팅 방향을 추정합니다.
+    small로 미리 축소된 프레임(TimedFrame.level(work_width))을 주면 축소를 생략합니다.
+
+    Returns:
+        PointingEstimate 또는 None (손을 찾지 못한 경우)
+    """
+    h, w = frame.shape[:2]
+    if small is None:
+        scale = w / work_width if w > work_width else 1.0
+        small = cv2.resize(frame, (int(w / scale), int(h / scale)), interpolation=cv2.INTER_AREA) if scale > 1.0 else frame
+    else:
+        scale = w / small.shape[1]
+
+    ycrcb = cv2.cvtColor(small, cv2.COLOR_BGR2YCrCb)
+    mask = cv2.inRange(ycrcb, SKIN_LOWER, SKIN_UPPER)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, _KERNEL)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, _KERNEL)
+
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    if not contours:
+        return None
+    hand = max(contours, key=cv2.contourArea)
+    area = cv2.contourArea(hand)
+    if area < min_area_ratio * mask.shape[0] * mask.shape[1]:
+        return None
+
+    # 손바닥 중심 = 손 영역 내부에서 경계까지 가장 먼 점 (거리 변환 최대값)
+    hand_mask = np.zeros_like(mask)
+    cv2.drawContours(hand_mask, [hand], -1, 255, cv2.FILLED)
+    dist = cv2.distanceTransform(hand_mask, cv2.DIST_L2, 3)
+    _, palm_radius, _, palm_center = cv2.minMaxLoc(dist)
+    if palm_radius < 2:
+        return None
+    palm = np.array(palm_center, np.float32)
+
+    # 손가락 끝 후보 = 볼록 껍질 꼭짓점 중 손바닥에서 가장 먼 점
+    points = hand.reshape(-1, 2).astype(np.float32)
+    hull_idx = cv2.convexHull(hand, returnPoints=False).flatten()
+    hull_pts = points[hull_idx]
+    tip_dists = np.linalg.norm(hull_pts - palm, axis=1)
+    tip = hull_pts[int(np.argmax(tip_dists))]
+    extension = float(tip_dists.max()) / palm_radius
+
+    # 볼록 결함(손가락 사이 골) 수 — 펼친 손가락이 많으면 포인팅이 아닐 가능성
+    deep_defects = 0
+    if len(hull_idx) > 3:
+        try:
+            defects = cv2.convexityDefects(hand, np.sort(hull_idx))
+        except cv2.error:
+            defects = None
+        if defects is not None:
+            depths = defects.reshape(-1, 4)[:, 3] / 256.0
+            deep_defects = int(np.count_nonzero(depths > palm_radius * 0.8))
+
+    # 손가락 축 = 손가락 끝 주변 윤곽점들의 직선 근사
+    near = points[np.linalg.norm(points - tip, axis=1) < palm_radius * 1.5]
+    direction = tip - palm
+    if len(near) >= 5:
+        vx, vy, _, _ = cv2.fitLine(near, cv2.DIST_L2, 0, 0.01, 0.01).flatten()
+        axis = np.array([vx, vy], np.float32)
+        if np.dot(axis, direction) < 0:
+            axis = -axis
+        direction = axis
+    norm = float(np.linalg.norm(direction))
+    if norm < 1e-6:
+        return None
+    direction = direction / norm
+
+    # 손가락이 손바닥보다 충분히 뻗어 있고, 골이 적을수록 신뢰도 높음
+    confidence = float(np.clip((extension - 1.3) / 1.5, 0.0, 1.0))
+    if deep_defects > 2:
+        confidence *= 0.5
+
+    x, y, bw, bh = cv2.boundingRect(hand)
+    return PointingEstimate(
+        fingertip=(float(tip[0] * scale), float(tip[1] * scale)),
+        direction=(float(direction[0]), float(direction[1])),
+        confidence=confidence,
+        hand_bbox=[int(x * scale), int(y * scale), int((x + bw) * scale), int((y + bh) * scale)],
+    )
+
+
+def _ray_exit_distance(tip, direction, frame_w, frame_h):
+    """손가락 끝에서 ray 방향으로 프레임 경계까지의 거리."""
+    limits = []
+    for p, d, size in ((tip[0], direction[0], frame_w), (tip[1], direction[1], frame_h)):
+        if d > 1e-6:
+            limits.append((size - p) / d)
+        elif d < -1e-6:
+            limits.append(-p / d)
+    return max(0.0, min(limits)) if limits else 0.0
+
+
+def ray_roi(estimate, frame_w, frame_h, cone=0.35, min_size=0.35):
+    """
+    손가락 끝에서 ray 방향으로 뻗은 원뿔 영역을 덮는 크롭 영역을 계산합니다.
+    Gemini가 손가락 방향을 볼 수 있도록 손가락 끝을 항상 포함합니다.
+
+    Args:
+        cone: ray 길이 대비 원뿔 반폭 비율
+        min_size: 프레임 대비 최소 크롭 크기 비율
+
+    Returns:
+        [x1, y1, x2, y2] 픽셀 좌표
+    """
+    tip = estimate.fingertip
+    d = estimate.direction
+    length = _ray_exit_distance(tip, d, frame_w, frame_h)
+    end = (tip[0] + d[0] * length, tip[1] + d[1] * length)
+    half = max(length * cone, min(frame_w, frame_h) * 0.05)
+
+    # 손가락 끝 주변 + ray 끝점 양옆(원뿔)을 모두 포함
+    nx, ny = -d[1], d[0]
+    xs = [tip[0], end[0] + nx * half, end[0] - nx * half]
+    ys = [tip[1], end[1] + ny * half, end[1] - ny * half]
+    margin = min(frame_w, frame_h) * 0.05
+    x1, x2 = min(xs) - margin, max(xs) + margin
+    y1, y2 = min(ys) - margin, max(ys) + margin
+
+    # 최소 크기 보장
+    min_w, min_h = frame_w * min_size, frame_h * min_size
+    if x2 - x1 < min_w:
+        cx = (x1 + x2) / 2
+        x1, x2 = cx - min_w / 2, cx + min_w / 2
+    if y2 - y1 < min_h:
+        cy = (y1 + y2) / 2
+        y1, y2 = cy - min_h / 2, cy + min_h / 2
+
+    return [
+        int(max(0, x1)), int(max(0, y1)),
+        int(min(frame_w, x2)), int(min(frame_h, y2)),
+    ]
+
+
+def first_hit(estimate, bboxes, max_distance=None):
+    """
+    ray가 가장 먼저 관통하는 bbox의 인덱스를 반환합니다 (slab 교차 판정).
+
+    Args:
+        max_distance: 손가락 끝에서 bbox까지 ray 거리(픽셀)가 이보다 멀면 None (손가락 끝이 안에 있으면 0)
+
+    Returns:
+        int 인덱스 또는 None
+    """
+    if not bboxes:
+        return None
+    boxes = np.asarray(bboxes, np.float64)
+    tip = np.array(estimate.fingertip)
+    d = np.array(estimate.direction)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv = np.where(np.abs(d) > 1e-9, 1.0 / d, np.inf)
+        t1 = (boxes[:, 0:2] - tip) * inv
+        t2 = (boxes[:, 2:4] - tip) * inv
+    # 방향 성분이 0인 축은 손가락 끝이 그 축 범위 안에 있어야 통과
+    flat = ~np.isfinite(inv)
+    inside = (boxes[:, 0:2] <= tip) & (tip <= boxes[:, 2:4])
+    t_near = np.where(flat, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2)).max(axis=1)
+    t_far = np.where(flat, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2)).min(axis=1)
+    hit = (t_far >= np.maximum(t_near, 0.0)) & np.isfinite(t_far)
+    if not hit.any():
+        return None
+    entry = np.where(hit, np.maximum(t_near, 0.0), np.inf)
+    best = int(np.argmin(entry))
+    if max_distance is not None and entry[best] > max_distance:
+        return None
+    return best
@@ -0,0 +1,88 @@
+"""
+hangul.py — 한글 자모 분해 및 편집 거리 유틸리티
+STT 오인식("종위컵", "종이 컵")에 강인한 문자열 비교를 위해
+음절을 초성/중성/종성 자모로 분해한 뒤 비교합니다.
+"""
+
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+         "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+# 복합 모음/받침은 구성 자모로 풀어 한 글자 오인식의 거리를 줄입니다 (예: ㅟ → ㅜㅣ)
+_SPLIT = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ",
+    "ㄽ": "ㄹㅅ", "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+_SYLLABLE_BASE = 0xAC00
+_SYLLABLE_LAST = 0xD7A3
+
+
+def _decompose_char(ch):
+    code = ord(ch)
+    if _SYLLABLE_BASE <= code <= _SYLLABLE_LAST:
+        offset = code - _SYLLABLE_BASE
+        cho, rest = divmod(offset, 21 * 28)
+        jung, jong = divmod(rest, 28)
+        parts = _CHO[cho] + _JUNG[jung] + _JONG[jong]
+    else:
+        parts = ch
+    return "".join(_SPLIT.get(p, p) for p in parts)
+
+
+def decompose(text):
+    """공백을 제거하고 소문자화한 뒤 한글 음절을 자모 문자열로 분해합니다."""
+    return "".join(_decompose_char(ch) for ch in text.replace(" ", "").lower())
+
+
+def bounded_edit_distance(a, b, max_dist):
+    """
+    Levenshtein 거리를 max_dist까지만 계산합니다 (띠 DP + 조기 종료).
+
+    Returns:
+        거리 (max_dist 초과 시 max_dist + 1)
+    """
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+    if len(a) > len(b):
+        a, b = b, a
+    over = max_dist + 1
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        lo = max(1, i - max_dist)
+        hi = min(len(b), i + max_dist)
+        cur = [over] * (len(b) + 1)
+        cur[0] = i if i <= max_dist else over
+        ca = a[i - 1]
+        row_min = cur[0]
+        for j in range(lo, hi + 1):
+            cost = 0 if ca == b[j - 1] else 1
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            cur[j] = v if v < over else over
+            if cur[j] < row_min:
+                row_min = cur[j]
+        if row_min > max_dist:
+            return over
+        prev = cur
+    return prev[len(b)] if prev[len(b)] <= max_dist else over
+
+
+def decompose_with_map(text):
+    """
+    decompose()처럼 자모로 분해하되 공백과 문장부호("헤이, 짭스.")도 건너뛰고,
+    각 자모가 원문의 몇 번째 글자에서 왔는지를 함께 반환합니다 (매칭 위치 → 원문 구간 변환용).
+
+    Returns:
+        (자모 문자열, 원문 글자 인덱스 목록)
+    """
+    jamo, index = [], []
+    for i, ch in enumerate(text):
+        if not ch.isalnum():
+            continue
+        for c in ch.lower():
+            parts = _decompose_char(c)
+            jamo.append(parts)
+            index.extend([i] * len(parts))
+    return "".join(jamo), index
@@ -0,0 +1,154 @@
+"""
+intent_grammar.py — 음성 명령 문법 컴파일 (Aho–Corasick 한 번 훑기 + 슬롯 추출 + 신뢰도)
+
+VoiceController.ACTION_PATTERNS의 패턴("타겟.*설정", "확대")을 불러올 때 한 번만 리터럴 조각으로 나누고,
+모든 조각을 하나의 Aho–Corasick 오토마톤(PhraseMatcher, 발음 묶기 없이 글자 그대로)으로 컴파일합니다.
+파싱은 텍스트를 한 번 훑은 뒤 걸린 조각이 들어 있는 규칙만 순서를 확인하므로,
+문법이 수백 개 문구로 늘어도 파싱 시간은 거의 그대로입니다.
+
+- 패턴: 리터럴을 ".*"로 이은 것만 허용합니다 (조각이 순서대로 나오면 일치). 다른 정규식 문법은 ValueError.
+- 규칙 점수는 일치한 글자 수에서 조각 사이에 낀 글자 수의 절반을 뺀 값입니다.
+  여러 액션이 일치하면 점수가 큰 쪽이, 같으면 먼저 선언된 액션이 이깁니다
+  ("타겟 1 확대해 줘"는 느슨한 "타겟.*해"보다 "확대"가 이김).
+- confidence: 이긴 액션 점수 / (이긴 점수 + 2등 액션 점수) — 다른 액션이 없으면 1.0, 동점이면 0.5.
+- 슬롯: target(동사 조각 앞 구간, "타겟 N"이 있으면 그것만), label/number("종이컵 1", "두 번째 타겟", "물병 하나"),
+  duration(초 — "3초 동안", "2초간"; "1 초록색"처럼 단위 뒤에 한글이 이어지면 제외).
+"""
+import re
+
+from modules.phrase_matcher import PhraseMatcher
+from modules.label_index import parse_ordinal
+
+_REGEX_CHARS = re.compile(r"[.*+?()\[\]{}|\\^$]")
+# 단위 뒤에 한글이 이어지면 단위가 아님 ("1 초록색", "2 분홍색")
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(초|분)(?:\s*동안|간|만)?(?![가-힣])")
+
+GAP_PENALTY = 0.5     # 조각 사이 글자 1개당 감점
+MIN_SCORE = 0.5
+
+# 대상 구간의 경계(동사)로 보지 않는 조각 — "타겟 2 삭제"의 대상은 "삭제" 앞 "타겟 2"
+SLOT_WORDS = ("타겟",)
+
+
+def _split(pattern):
+    """'위치.*다시' → ('위치', '다시')."""
+    literals = tuple(part.strip() for part in pattern.split(".*"))
+    if not all(literals) or any(_REGEX_CHARS.search(lit) for lit in literals):
+        raise ValueError(f"지원하지 않는 명령 패턴: '{pattern}' (리터럴을 '.*'로 이은 형태만 가능)")
+    return literals
+
+
+class IntentGrammar:
+    """
+    {액션: [패턴, ...]} 문법을 컴파일한 파서.
+
+        grammar = IntentGrammar(VoiceController.ACTION_PATTERNS)
+        grammar.parse("두 번째 종이컵 3초 동안 확대해 줘")
+        # → {"action": "zoom_in", "target": "두 번째 종이컵", "confidence": 1.0,
+        #    "slots": {"target": ..., "label": "종이컵", "number": 2, "duration": 3.0}, ...}
+    """
+
+    def __init__(self, patterns, target_actions=("zoom_in", "remove_target"), slot_words=SLOT_WORDS):
+        """
+        Args:
+            patterns: {액션: [패턴, ...]} (선언 순서가 동점일 때의 우선순위)
+            target_actions: target 슬롯을 추출할 액션
+            slot_words: 대상 구간의 경계로 쓰지 않는 조각
+        """
+        self.target_actions = set(target_actions)
+        self.slot_words = set(slot_words)
+        # "타겟 1 초록색 컵" → 번호 참조 "타겟 1"만 대상으로 (예전 파서와 같음)
+        self._slot_ref = re.compile(
+            r"(%s)\s*(\d+)" % "|".join(map(re.escape, slot_words))) if slot_words else None
+        self.rules = []               # [(액션, 패턴, 조각 튜플, 우선순위, 일치 글자 수), ...]
+        self._rules_by_literal = {}   # 조각 → [규칙 인덱스, ...]
+        for priority, (action, action_patterns) in enumerate(patterns.items()):
+            for pattern in action_patterns:
+                literals = _split(pattern)
+                matched = sum(len(lit.replace(" ", "")) for lit in literals)
+                for literal in set(literals):
+                    self._rules_by_literal.setdefault(literal, []).append(len(self.rules))
+                self.rules.append((action, pattern, literals, priority, matched))
+        self._matcher = PhraseMatcher({lit: [lit] for lit in self._rules_by_literal}, phonetic=False)
+
+    def parse(self, text):
+        """
+        Returns:
+            dict: {"action", "target", "raw_text", "slots", "confidence",
+                   "alternatives": [(다른 액션, 점수), ...]} — 일치가 없으면 action "unknown"
+        """
+        cleaned = (text or "").strip()
+        result = {"action": "unknown", "target": None, "raw_text": cleaned,
+                  "slots": {}, "confidence": 0.0, "alternatives": []}
+        if not cleaned:
+            return result
+
+        spans = {}   # 조각 → 원문 위치 순 [(start, end), ...]
+        for match in self._matcher.find_all(cleaned, overlap=True):
+            spans.setdefault(match.group, []).append((match.start, match.end))
+
+        best = {}    # 액션 → (점수, 우선순위, 조각, 위치)
+        candidates = {i for literal in spans for i in self._rules_by_literal[literal]}
+        for i in candidates:
+            action, _, literals, priority, matched = self.rules[i]
+            placement = self._place(literals, spans)
+            if placement is None:
+                continue
+            gap = sum(len(cleaned[prev_end:start].replace(" ", ""))
+                      for (_, prev_end), (start, _) in zip(placement, placement[1:]))
+            score = max(MIN_SCORE, matched - GAP_PENALTY * gap)
+            if action not in best or score > best[action][0]:
+                best[action] = (score, priority, literals, placement)
+        if not best:
+            return result
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[1][1]))
+        action, (score, _, literals, placement) = ranked[0]
+        runner_up = ranked[1][1][0] if len(ranked) > 1 else 0
+        result["action"] = action
+        result["confidence"] = score / (score + runner_up)
+        result["alternatives"] = [(other, s[0]) for other, s in ranked[1:]]
+        result["slots"] = self._slots(cleaned, action, literals, placement)
+        result["target"] = result["slots"].get("target")
+        return result
+
+    @staticmethod
+    def _place(literals, spans):
+        """조각들이 순서대로 (겹치지 않고) 나오는 가장 이른 위치 목록 (없으면 None)."""
+        pos = 0
+        placement = []
+        for literal in literals:
+            for start, end in spans.get(literal, ()):
+                if start >= pos:
+                    placement.append((start, end))
+                    pos = end
+                    break
+            else:
+                return None
+        return placement
+
+    def _slots(self, text, action, literals, placement):
+        slots = {}
+        duration = _DURATION_RE.search(text)
+        if duration:
+            value = float(duration.group(1))
+            slots["duration"] = value * 60 if duration.group(2) == "분" else value
+
+        if action in self.target_actions:
+            anchor = next((start for literal, (start, _) in zip(literals, placement)
+                           if literal not in self.slot_words), None)
+            if anchor is not None:
+                before = text[:anchor]
+                if duration and duration.end() <= anchor:
+                    before = before[:duration.start()] + before[duration.end():]
+                target = " ".join(before.split()).strip(" ,.")
+                ref = self._slot_ref.search(target) if self._slot_ref and target else None
+                if ref:
+                    target = f"{ref.group(1)} {ref.group(2)}"
+                if target:
+                    label, number = parse_ordinal(target)
+                    slots["target"] = target
+                    slots["label"] = label
+                    if number is not None:
+                        slots["number"] = number
+        return slots
@@ -0,0 +1,162 @@
+"""
+keyword_spotter.py — 경량 호출어 검출기 (MFCC + 부분열 DTW)
+몇 개의 녹음으로 등록한 호출어 템플릿과 VAD 발화 구간을 비교해
+호출어가 있을 때만 Whisper를 실행하도록 앞단에서 거릅니다.
+
+- 특징: MFCC c1~c12 (25ms 창, 10ms 간격) + 음성 프레임 기준 평균 정규화(CMN)
+- 비교: 부분열 DTW — 발화 안 어디에서든 템플릿과 가장 잘 맞는 구간의 정규화 거리
+  기울기 제한 (1,1)/(1,2)/(2,1) 스텝만 사용하므로 템플릿 프레임 단위로 벡터화됩니다.
+
+템플릿 등록/평가는 pre_test/10_kws_enroll.py, pre_test/11_kws_eval.py를 사용합니다.
+
+⚠️ PyQt5를 import하지 않습니다 (STT 프로세스에서 사용).
+"""
+import numpy as np
+
+RATE = 16000
+N_FFT = 512
+WIN = 400    # 25ms
+HOP = 160    # 10ms
+N_MELS = 26
+N_MFCC = 13
+
+_mel_cache = {}
+
+
+def _hz_to_mel(f):
+    return 2595.0 * np.log10(1.0 + f / 700.0)
+
+
+def _mel_to_hz(m):
+    return 700.0 * (10 ** (m / 2595.0) - 1.0)
+
+
+def _mel_filterbank(n_mels=N_MELS, n_fft=N_FFT, rate=RATE, fmin=20.0, fmax=7600.0):
+    key = (n_mels, n_fft, rate)
+    bank = _mel_cache.get(key)
+    if bank is not None:
+        return bank
+    points = _mel_to_hz(np.linspace(_hz_to_mel(fmin), _hz_to_mel(fmax), n_mels + 2))
+    bins = np.floor((n_fft + 1) * points / rate).astype(int)
+    bank = np.zeros((n_mels, n_fft // 2 + 1), np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    dct = np.cos(np.pi / n_mels * (np.arange(n_mels) + 0.5)[None, :] * np.arange(N_MFCC)[:, None])
+    bank = (bank, dct.astype(np.float32))
+    _mel_cache[key] = bank
+    return bank
+
+
+def mfcc(audio):
+    """
+    16kHz float32 오디오의 MFCC (프레임 수, 12 — c0 제외), 발화 단위 평균 정규화 적용.
+    """
+    audio = np.asarray(audio, np.float32)
+    if len(audio) < WIN:
+        return np.zeros((0, N_MFCC - 1), np.float32)
+    emphasized = np.append(audio[0], audio[1:] - 0.97 * audio[:-1])
+    n_frames = 1 + (len(emphasized) - WIN) // HOP
+    idx = np.arange(WIN)[None, :] + HOP * np.arange(n_frames)[:, None]
+    frames = emphasized[idx] * np.hamming(WIN).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, N_FFT)) ** 2 / N_FFT
+    bank, dct = _mel_filterbank()
+    log_mel = np.log(power @ bank.T + 1e-10)
+    feats = log_mel @ dct.T
+    # 평균은 음성 프레임(에너지 상위)으로만 계산 — 앞뒤 무음/여백 길이에 덜 민감
+    energy = feats[:, 0]
+    voiced = energy >= np.percentile(energy, 50)
+    feats = feats - feats[voiced].mean(axis=0)
+    return feats[:, 1:].astype(np.float32)  # c0(전체 에너지)는 음량 차이만 반영하므로 제외
+
+
+def _pairwise(a, b):
+    """(T, D) × (Q, D) 유클리드 거리 행렬."""
+    sq = (a * a).sum(1)[:, None] + (b * b).sum(1)[None, :] - 2.0 * a @ b.T
+    return np.sqrt(np.maximum(sq, 0.0))
+
+
+def subsequence_dtw(template, query):
+    """
+    query 안에서 template과 가장 잘 맞는 구간의 DTW 거리 (템플릿 프레임당 평균).
+    query가 템플릿 길이의 절반보다 짧으면 inf.
+    """
+    T, Q = len(template), len(query)
+    if T == 0 or Q < max(2, T // 2):
+        return float("inf")
+    C = _pairwise(template, query)
+    inf = np.float32(np.inf)
+
+    prev2 = np.full(Q, inf, np.float32)
+    prev = C[0].copy()  # 시작 위치 자유 (부분열)
+    for i in range(1, T):
+        best = np.full(Q, inf, np.float32)
+        best[1:] = prev[:-1]                                              # (i-1, j-1)
+        best[2:] = np.minimum(best[2:], prev[:-2] + C[i, 1:-1])           # (i-1, j-2) → (i, j-1)
+        if i >= 2:
+            best[1:] = np.minimum(best[1:], prev2[:-1] + C[i - 1, 1:])   # (i-2, j-1) → (i-1, j)
+        prev2, prev = prev, C[i] + best
+    return float(prev.min() / T)
+
+
+class KeywordSpotter:
+    """등록된 호출어 템플릿으로 발화를 판정합니다."""
+
+    def __init__(self, templates, threshold):
+        """
+        Args:
+            templates: MFCC 배열 목록 [(T, 12), ...]
+            threshold: 이 거리 이하이면 호출어로 판정
+        """
+        self.templates = [np.asarray(t, np.float32) for t in templates]
+        self.threshold = float(threshold)
+
+    @classmethod
+    def enroll(cls, recordings, margin=1.15):
+        """
+        호출어 녹음(16kHz float32) 목록으로 템플릿을 만들고,
+        템플릿끼리의 leave-one-out 거리 최대값 × margin을 임계값으로 정합니다.
+        """
+        templates = [mfcc(r) for r in recordings]
+        templates = [t for t in templates if len(t) > 0]
+        if len(templates) < 2:
+            raise ValueError("템플릿은 최소 2개 이상 필요합니다")
+        worst = 0.0
+        for i, query in enumerate(templates):
+            others = templates[:i] + templates[i + 1:]
+            worst = max(worst, min(subsequence_dtw(t, query) for t in others))
+        return cls(templates, worst * margin)
+
+    def score(self, audio):
+        """발화와 가장 가까운 템플릿의 거리 (작을수록 호출어에 가까움)."""
+        query = mfcc(audio)
+        return min(subsequence_dtw(t, query) for t in self.templates)
+
+    def detect(self, audio):
+        """
+        Returns:
+            (호출어 여부, 거리)
+        """
+        distance = self.score(audio)
+        return distance <= self.threshold, distance
+
+    def save(self, path):
+        lengths = np.array([len(t) for t in self.templates], np.int32)
+        np.savez_compressed(
+            path,
+            features=np.concatenate(self.templates),
+            lengths=lengths,
+            threshold=np.float32(self.threshold),
+        )
+
+    @classmethod
+    def load(cls, path, threshold=None):
+        """템플릿 파일을 불러옵니다 (threshold를 주면 저장된 임계값 대신 사용)."""
+        with np.load(path) as data:
+            splits = np.cumsum(data["lengths"])[:-1]
+            templates = np.split(data["features"], splits)
+            stored = float(data["threshold"])
+        return cls(templates, stored if threshold is None else threshold)
@@ -0,0 +1,142 @@
+"""
+label_index.py — STT 오인식에 강인한 타겟 라벨 검색 인덱스
+타겟 등록 시 라벨을 자모로 분해해 문자 n-gram 역색인을 만들어 두고,
+검색 시 n-gram 후보만 골라 제한된 편집 거리로 순위를 매깁니다.
+
+"종이 컵", "종위컵" → "종이컵"
+"두 번째 종이컵", "종이컵 2", "종이컵 둘" → 종이컵 중 2번째 등록 타겟
+"""
+import re
+
+from modules.hangul import decompose, bounded_edit_distance
+
+NGRAM = 2
+
+# 고유어 수사/관형사 → 숫자 ("두 번째", "둘째", "세번째" 등)
+_NATIVE_NUMBERS = {
+    "첫": 1, "한": 1, "하나": 1, "두": 2, "둘": 2, "세": 3, "셋": 3, "네": 4, "넷": 4,
+    "다섯": 5, "여섯": 6, "일곱": 7, "여덟": 8, "아홉": 9, "열": 10,
+}
+_NATIVE = "|".join(sorted(_NATIVE_NUMBERS, key=len, reverse=True))
+_ORDINAL_RE = re.compile(rf"(?:(\d+)|({_NATIVE}))\s*(?:번\s*째|번째|째)")
+_TRAILING_NUMBER_RE = re.compile(r"^(.+?)\s*(\d+)\s*(?:번)?\s*$")
+# 단독으로 쓰이는 고유어 수사만 ("종이컵 하나", "물병 둘") — 관형사(한/두/세/네/첫)는 제외
+_CARDINAL = "|".join(sorted((w for w in _NATIVE_NUMBERS if w not in ("첫", "한", "두", "세", "네")),
+                            key=len, reverse=True))
+_TRAILING_NATIVE_RE = re.compile(rf"^(.+?)\s+({_CARDINAL})\s*(?:번)?\s*$")
+
+
+def parse_ordinal(query):
+    """
+    검색어에서 서수/번호를 분리합니다.
+
+    Returns:
+        (라벨 부분, 번호) — 번호가 없으면 (query, None)
+    """
+    match = _ORDINAL_RE.search(query)
+    if match:
+        number = int(match.group(1)) if match.group(1) else _NATIVE_NUMBERS[match.group(2)]
+        rest = (query[:match.start()] + " " + query[match.end():]).strip()
+        return rest, number
+
+    match = _TRAILING_NUMBER_RE.match(query)
+    if match:
+        return match.group(1).strip(), int(match.group(2))
+
+    match = _TRAILING_NATIVE_RE.match(query)
+    if match:
+        return match.group(1).strip(), _NATIVE_NUMBERS[match.group(2)]
+    return query.strip(), None
+
+
+def _ngrams(jamo):
+    padded = f"^{jamo}$"
+    return {padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)}
+
+
+class LabelIndex:
+    """
+    타겟 id → 라벨의 자모 n-gram 역색인.
+    같은 라벨의 타겟이 여러 개여도 거리 계산은 고유 라벨당 한 번만 수행합니다.
+    """
+
+    def __init__(self, max_dist_ratio=0.34):
+        """
+        Args:
+            max_dist_ratio: 라벨 자모 길이 대비 허용 편집 거리 비율
+        """
+        self.max_dist_ratio = max_dist_ratio
+        self._jamo_of = {}   # id → 자모 문자열
+        self._ids_of = {}    # 자모 문자열 → {id, ...}
+        self._grams = {}     # 자모 문자열 → n-gram 집합
+        self._postings = {}  # n-gram → {자모 문자열, ...}
+
+    def add(self, item_id, label):
+        jamo = decompose(label)
+        self._jamo_of[item_id] = jamo
+        ids = self._ids_of.setdefault(jamo, set())
+        ids.add(item_id)
+        if len(ids) == 1:
+            grams = _ngrams(jamo)
+            self._grams[jamo] = grams
+            for g in grams:
+                self._postings.setdefault(g, set()).add(jamo)
+
+    def remove(self, item_id):
+        jamo = self._jamo_of.pop(item_id, None)
+        if jamo is None:
+            return
+        ids = self._ids_of[jamo]
+        ids.discard(item_id)
+        if ids:
+            return
+        del self._ids_of[jamo]
+        for g in self._grams.pop(jamo):
+            labels = self._postings[g]
+            labels.discard(jamo)
+            if not labels:
+                del self._postings[g]
+
+    def _score(self, q, q_grams, jamo, shared):
+        if q == jamo:
+            return 1.0
+        short, long_ = (q, jamo) if len(q) < len(jamo) else (jamo, q)
+        if short in long_:
+            # 조사가 붙은 경우("종이컵을") 등 — 덮는 비율이 클수록 높은 점수
+            return 0.5 + 0.45 * len(short) / len(long_)
+        # Dice 계수로 먼저 거르고, 통과한 후보만 편집 거리 계산
+        dice = 2 * shared / (len(q_grams) + len(self._grams[jamo]))
+        if dice < 0.3:
+            return 0.0
+        max_dist = max(1, int(len(jamo) * self.max_dist_ratio))
+        dist = bounded_edit_distance(q, jamo, max_dist)
+        if dist > max_dist:
+            return 0.0
+        return 0.9 * (1.0 - dist / len(long_))
+
+    def search(self, query, min_score=0.0):
+        """
+        라벨이 검색어와 비슷한 id를 점수 내림차순으로 반환합니다.
+
+        Returns:
+            [(id, score), ...] — score는 0.0 ~ 1.0 (1.0 = 정확히 일치)
+        """
+        q = decompose(query)
+        if not q:
+            return []
+
+        # n-gram이 하나라도 겹치는 고유 라벨만 후보로 계산
+        q_grams = _ngrams(q)
+        overlap = {}
+        for g in q_grams:
+            for jamo in self._postings.get(g, ()):
+                overlap[jamo] = overlap.get(jamo, 0) + 1
+
+        results = []
+        for jamo, shared in overlap.items():
+            score = self._score(q, q_grams, jamo, shared)
+            if score > 0.0 and score >= min_score:
+                results.extend((item_id, score) for item_id in self._ids_of[jamo])
+
+        results.sort(key=lambda r: (-r[1], r[0]))
+        return results
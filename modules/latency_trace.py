@@ -0,0 +1,96 @@
+"""
+latency_trace.py — 음성 명령 지연 기록 (호출어 → 명령 → 동작)
+STT 메시지의 corr_id별로 단계 시각(time.monotonic)을 모아 구간별 p50/p95를 보고합니다.
+
+단계:
+    wake_end, wake_decoded, wake_received          호출어 발화 끝 / 변환 끝 / UI 처리
+    command_end, command_decode_start,
+    command_decoded, command_received              명령 발화 끝 / 변환 시작 / 변환 끝 / UI 처리
+    vision_start, vision_done                      Gemini 감지 (추측성 감지 포함)
+    ptz_start                                      화면 이동 시작 (부분 인식 선행 실행 포함)
+    tts_start                                      음성 안내 재생 시작
+
+STT 프로세스와 UI 프로세스가 모두 time.monotonic()(시스템 전역 시계)을 쓰므로 그대로 뺄 수 있습니다.
+"""
+import threading
+from collections import OrderedDict
+
+# (보고 이름, 시작 단계, 끝 단계) — 끝 단계가 "action"이면 ptz_start / tts_start 중 빠른 쪽
+SPANS = (
+    ("호출어 발화 끝 → 변환 완료", "wake_end", "wake_decoded"),
+    ("호출어 변환 완료 → UI 처리", "wake_decoded", "wake_received"),
+    ("명령 발화 끝 → 변환 시작", "command_end", "command_decode_start"),
+    ("명령 변환", "command_decode_start", "command_decoded"),
+    ("명령 변환 완료 → UI 처리", "command_decoded", "command_received"),
+    ("UI 처리 → 화면 이동", "command_received", "ptz_start"),
+    ("Vision 감지", "vision_start", "vision_done"),
+    ("UI 처리 → 음성 안내", "command_received", "tts_start"),
+    ("명령 발화 끝 → 첫 동작", "command_end", "action"),
+)
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class LatencyTrace:
+    """corr_id별 단계 시각 기록 (여러 스레드에서 mark() 가능, 최근 max_traces건만 유지)."""
+
+    def __init__(self, max_traces=200):
+        self.max_traces = max_traces
+        self._traces = OrderedDict()   # corr_id → {단계: 시각}
+        self._lock = threading.Lock()
+
+    def mark(self, corr_id, stage, t):
+        """단계 시각을 기록합니다 (같은 단계는 처음 시각만 유지, corr_id가 없으면 무시)."""
+        if corr_id is None or t is None:
+            return
+        with self._lock:
+            trace = self._traces.get(corr_id)
+            if trace is None:
+                trace = self._traces[corr_id] = {}
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            trace.setdefault(stage, t)
+
+    def on_wake(self, msg, received):
+        corr_id = msg.get("corr_id")
+        self.mark(corr_id, "wake_end", msg.get("utterance_end"))
+        self.mark(corr_id, "wake_decoded", msg.get("decode_end"))
+        self.mark(corr_id, "wake_received", received)
+
+    def on_command(self, msg, received):
+        corr_id = msg.get("corr_id")
+        self.mark(corr_id, "command_end", msg.get("utterance_end"))
+        self.mark(corr_id, "command_decode_start", msg.get("decode_start"))
+        self.mark(corr_id, "command_decoded", msg.get("decode_end"))
+        self.mark(corr_id, "command_received", received)
+
+    def spans(self):
+        """{보고 이름: [초, ...]} — 두 단계가 모두 기록된 발화만."""
+        with self._lock:
+            traces = [dict(t) for t in self._traces.values()]
+        result = {name: [] for name, _, _ in SPANS}
+        for trace in traces:
+            for name, start, end in SPANS:
+                if end == "action":
+                    actions = [trace[s] for s in ("ptz_start", "tts_start") if s in trace]
+                    end_t = min(actions) if actions else None
+                else:
+                    end_t = trace.get(end)
+                if start in trace and end_t is not None:
+                    result[name].append(end_t - trace[start])
+        return result
+
+    def report(self):
+        """구간별 지연 요약 줄 목록."""
+        lines = []
+        for name, values in self.spans().items():
+            if not values:
+                continue
+            lines.append(
+                f"{name}: {len(values)}건, p50 {_percentile(values, 0.5) * 1000:.0f}ms, "
+                f"p95 {_percentile(values, 0.95) * 1000:.0f}ms"
+            )
+        return lines
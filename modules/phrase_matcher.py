@@ -0,0 +1,287 @@
+"""
+phrase_matcher.py — 호출어/종료어 고속 매칭 (자모 정규화 + Aho–Corasick)
+키워드 목록을 한 번만 자모로 분해·정규화해 Aho–Corasick 오토마톤으로 컴파일하고,
+인식 텍스트를 한 번 훑어 모든 키워드의 위치(원문 구간)를 찾습니다.
+
+- 정규화: 공백/문장부호 제거, 소문자화, 자모 분해 후 발음이 비슷한 자모를 한 글자로 묶음
+  (ㅉ/ㅊ → ㅈ, ㅃ/ㅍ → ㅂ, ㅆ → ㅅ, ㅐ → ㅔ 등) — "짭스", "잡스", "찹쓰"는 같은 패턴이 됩니다.
+- 그룹을 지정하면 충분히 긴 키워드(자모 8개 이상)만 제한된 편집 거리로 부분 문자열도 찾습니다
+  (목록에 없는 새 오인식 "헤이 잡츠" 등). 겹치는 정확 일치보다 길면 편집 거리 일치가 이깁니다.
+  q-gram 개수로 먼저 거르므로 대부분의 발화는 편집 거리를 계산하지 않습니다.
+- 일치는 음절 경계에서 시작하고, word_boundary 그룹은 단어 경계(공백·문장부호·끝)에서 끝나야 합니다
+  ("헤이 짭"이 "헤이 잡츠", "헤이 잡아줘"의 앞부분에 걸리지 않도록).
+  부르는 말 뒤 한 글자 조사("짭스야", "짭스님")는 구간에 포함해 인정합니다.
+  종료어("그만해")나 명령 문법("확대해"의 "확대")처럼 단어 중간에서 끝나도 되는 그룹은 빼면 됩니다.
+- 결과는 원문 기준 [start, end) 구간이므로 호출어를 한 번에 잘라낼 수 있습니다.
+
+⚠️ PyQt5를 import하지 않습니다 (STT 프로세스에서 사용).
+"""
+from collections import deque
+
+from modules.hangul import decompose_with_map
+
+# 단어 경계 검사에서 키워드 뒤에 붙어도 되는 한 글자 (호격 조사 등)
+WORD_SUFFIXES = "야아님요"
+
+# 발음이 비슷해 STT가 자주 바꿔 적는 자모 → 대표 자모
+_PHONETIC = str.maketrans({
+    "ㄲ": "ㄱ", "ㅋ": "ㄱ", "ㄸ": "ㄷ", "ㅌ": "ㄷ", "ㅃ": "ㅂ", "ㅍ": "ㅂ",
+    "ㅆ": "ㅅ", "ㅉ": "ㅈ", "ㅊ": "ㅈ", "ㅐ": "ㅔ", "ㅒ": "ㅖ",
+})
+
+
+def normalize(text, phonetic=True):
+    """
+    텍스트를 매칭용 자모 문자열로 바꿉니다.
+
+    Args:
+        phonetic: False면 발음이 비슷한 자모를 묶지 않음 (글자 그대로 일치)
+
+    Returns:
+        (정규화 자모 문자열, 각 자모의 원문 글자 인덱스 목록)
+    """
+    jamo, index = decompose_with_map(text)
+    return (jamo.translate(_PHONETIC) if phonetic else jamo), index
+
+
+class PhraseMatch:
+    """매칭 결과 1건 (원문 기준 구간)."""
+
+    __slots__ = ("group", "phrase", "start", "end", "distance")
+
+    def __init__(self, group, phrase, start, end, distance=0):
+        self.group = group        # 키워드 그룹 이름 ("wake", "terminate" 등)
+        self.phrase = phrase      # 매칭된 키워드 (목록의 원래 표기)
+        self.start = start        # 원문 시작 글자 인덱스
+        self.end = end            # 원문 끝 글자 인덱스 (미포함)
+        self.distance = distance  # 편집 거리 (정확히 일치하면 0)
+
+    def __repr__(self):
+        return (f"PhraseMatch({self.group}, '{self.phrase}', [{self.start}:{self.end}]"
+                f"{f', 거리 {self.distance}' if self.distance else ''})")
+
+
+def _at_boundary(text, pos):
+    """pos가 텍스트 끝이거나 공백·문장부호 앞인지."""
+    return pos >= len(text) or not text[pos].isalnum()
+
+
+def _bigrams(jamo):
+    return [jamo[i:i + 2] for i in range(len(jamo) - 1)]
+
+
+def _fuzzy_substring(pattern, text, max_dist):
+    """
+    text의 부분 문자열 중 pattern과 편집 거리가 가장 작은 구간 (Sellers 알고리즘).
+
+    Returns:
+        (거리, 시작, 끝) — max_dist 이내가 없으면 None
+    """
+    m = len(pattern)
+    # prev[j]: pattern[:i]와 text[?:j]의 최소 거리, start[j]: 그 구간의 시작 위치
+    prev = [0] * (len(text) + 1)
+    prev_start = list(range(len(text) + 1))
+    for i in range(1, m + 1):
+        cur = [i] * (len(text) + 1)
+        cur_start = [0] * (len(text) + 1)
+        pc = pattern[i - 1]
+        for j in range(1, len(text) + 1):
+            best, origin = prev[j - 1] + (pc != text[j - 1]), prev_start[j - 1]
+            if prev[j] + 1 < best:
+                best, origin = prev[j] + 1, prev_start[j]
+            if cur[j - 1] + 1 < best:
+                best, origin = cur[j - 1] + 1, cur_start[j - 1]
+            cur[j], cur_start[j] = best, origin
+        if min(cur) > max_dist:
+            return None
+        prev, prev_start = cur, cur_start
+
+    best = None
+    for j in range(1, len(text) + 1):
+        if prev[j] <= max_dist and (best is None or prev[j] < best[0]):
+            best = (prev[j], prev_start[j], j)
+    return best
+
+
+class PhraseMatcher:
+    """
+    여러 키워드 그룹을 하나의 Aho–Corasick 오토마톤으로 컴파일한 매처.
+
+        matcher = PhraseMatcher({"wake": WAKE_WORDS, "terminate": TERMINATE_WORDS})
+        matcher.find("헤이 짭스 종이컵 확대", "wake")   # → PhraseMatch(wake, '헤이짭스', [0:5])
+        matcher.remove("헤이 짭스, 종이컵 확대", "wake")  # → "종이컵 확대"
+    """
+
+    def __init__(self, groups, fuzzy_min_len=8, fuzzy_ratio=0.2, phonetic=True, word_boundary=()):
+        """
+        Args:
+            groups: {그룹 이름: [키워드, ...]}
+            fuzzy_min_len: 정규화 자모 길이가 이 이상인 키워드만 편집 거리 매칭에 사용
+                           (짧은 키워드는 오탐이 많아 정확 일치만 허용)
+            fuzzy_ratio: 키워드 자모 길이 대비 허용 편집 거리 비율 (최소 1)
+            phonetic: False면 자모 발음 묶기 없이 글자 그대로 일치 (명령 문법 등)
+            word_boundary: 단어 경계에서 끝나야 하는 그룹 이름들 (나머지 그룹은 음절 경계만 필요)
+        """
+        self.fuzzy_min_len = fuzzy_min_len
+        self.fuzzy_ratio = fuzzy_ratio
+        self.phonetic = phonetic
+        self.word_boundary = set(word_boundary)
+        self._goto = [{}]     # 노드 → {자모: 다음 노드}
+        self._fail = [0]
+        self._out = [[]]      # 노드 → [(그룹, 키워드, 자모 길이), ...]
+        self._fuzzy = {}      # 그룹 → [(정규화 자모, 바이그램 목록, 키워드), ...]
+
+        for group, phrases in groups.items():
+            seen = set()
+            for phrase in phrases:
+                pattern, _ = normalize(phrase, phonetic)
+                if not pattern or pattern in seen:
+                    continue
+                seen.add(pattern)
+                self._insert(pattern, (group, phrase, len(pattern)))
+                if len(pattern) >= fuzzy_min_len:
+                    self._fuzzy.setdefault(group, []).append((pattern, _bigrams(pattern), phrase))
+        self._build_fail_links()
+
+    def _insert(self, pattern, output):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(output)
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                # 접미사 노드의 출력도 함께 보고하도록 합침
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _scan(self, jamo):
+        """정규화 자모 문자열의 모든 정확 일치: [(자모 시작, 자모 끝, 그룹, 키워드), ...]."""
+        hits = []
+        node = 0
+        for pos, ch in enumerate(jamo):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for group, phrase, length in self._out[node]:
+                hits.append((pos + 1 - length, pos + 1, group, phrase))
+        return hits
+
+    def find_all(self, text, group=None, overlap=False):
+        """
+        text에서 키워드 구간을 모두 찾습니다 (겹치면 왼쪽·긴 것 우선).
+        group을 주면 그 그룹만 찾고 편집 거리 매칭도 시도합니다
+        (겹치는 정확 일치보다 원문 구간이 길면 편집 거리 일치로 바꿈).
+
+        Args:
+            overlap: True면 겹치는 일치도 모두 반환 ("이것도"와 "이것" 둘 다)
+
+        Returns:
+            원문 위치 순 [PhraseMatch, ...]
+        """
+        jamo, index = normalize(text, self.phonetic)
+        if not jamo:
+            return []
+        hits = self._scan(jamo)
+        if group is not None:
+            hits = [h for h in hits if h[2] == group]
+
+        hits.sort(key=lambda h: (h[0], -(h[1] - h[0])))
+        matches = []
+        covered = 0
+        longest = 0   # 인정된 정확 일치 중 가장 긴 자모 길이
+        last = len(index) - 1
+        for j0, j1, hit_group, phrase in hits:
+            if j0 < covered and not overlap:
+                continue
+            # 음절 경계에서 시작하고 끝나는 일치만 인정
+            if (j0 > 0 and index[j0 - 1] == index[j0]) or (j1 <= last and index[j1] == index[j1 - 1]):
+                continue
+            end = self._word_end(text, index[j1 - 1] + 1, hit_group)
+            if end is None:
+                continue
+            covered = max(covered, j1)
+            longest = max(longest, j1 - j0)
+            matches.append(PhraseMatch(hit_group, phrase, index[j0], end))
+
+        # 긴 키워드("헤이짭스")가 이미 정확히 일치했으면 편집 거리 매칭은 생략
+        if group is not None and longest < self.fuzzy_min_len:
+            fuzzy = self._find_fuzzy(jamo, index, group)
+            if fuzzy is not None:
+                fuzzy.end = self._word_end(text, fuzzy.end, group)
+            if fuzzy is not None and fuzzy.end is not None:
+                overlapped = [m for m in matches if m.start < fuzzy.end and fuzzy.start < m.end]
+                if all(fuzzy.end - fuzzy.start > m.end - m.start for m in overlapped):
+                    matches = [m for m in matches if m not in overlapped] + [fuzzy]
+                    matches.sort(key=lambda m: m.start)
+        return matches
+
+    def _word_end(self, text, end, group):
+        """
+        일치 끝 위치를 단어 경계 기준으로 확인합니다.
+
+        Returns:
+            인정할 끝 위치 (조사 한 글자가 붙으면 그 뒤) 또는 None (단어 중간에서 끝남)
+        """
+        if group not in self.word_boundary or _at_boundary(text, end):
+            return end
+        if text[end] in WORD_SUFFIXES and _at_boundary(text, end + 1):
+            return end + 1
+        return None
+
+    def _find_fuzzy(self, jamo, index, group):
+        patterns = self._fuzzy.get(group)
+        if not patterns:
+            return None
+        text_grams = set(_bigrams(jamo))
+        best = None
+        for pattern, grams, phrase in patterns:
+            max_dist = max(1, int(len(pattern) * self.fuzzy_ratio))
+            if best is not None:
+                max_dist = min(max_dist, best.distance - 1)
+                if max_dist < 1:
+                    break
+            # q-gram 필터: 편집 1회는 바이그램을 최대 2개 깨뜨림
+            shared = sum(1 for g in grams if g in text_grams)
+            if shared < len(grams) - 2 * max_dist:
+                continue
+            found = _fuzzy_substring(pattern, jamo, max_dist)
+            if found is None:
+                continue
+            dist, j0, j1 = found
+            if j1 <= j0:
+                continue
+            best = PhraseMatch(group, phrase, index[j0], index[j1 - 1] + 1, dist)
+        return best
+
+    def find(self, text, group):
+        """그룹의 첫 매칭 (없으면 None)."""
+        matches = self.find_all(text, group)
+        return matches[0] if matches else None
+
+    def remove(self, text, group, strip=" ,.!?"):
+        """그룹의 키워드 구간을 모두 잘라낸 텍스트 (한 번에 처리)."""
+        matches = self.find_all(text, group)
+        if not matches:
+            return text.strip(strip)
+        parts = []
+        pos = 0
+        for match in matches:
+            parts.append(text[pos:match.start])
+            pos = match.end
+        parts.append(text[pos:])
+        return " ".join(p.strip(strip) for p in parts if p.strip(strip))
@@ -0,0 +1,119 @@
+"""
+scene_change.py — 저비용 장면 변화 감지기
+프레임을 블록 평균(기본 16x9 격자)으로 줄여 기준 장면과 비교합니다 (프레임당 1ms 미만).
+
+이벤트:
+    "cut"      — 화면 대부분이 한 번에 바뀜 (씬 전환, 카메라 이동) → 타겟 숨김
+    "settled"  — 변화가 멈췄고 기준 장면과 달라진 블록이 남아 있음 → 재검증/재탐색
+    "scene"    — OBS 씬 이름이 바뀜 → 씬별 타겟 불러오기
+
+손이 잠깐 지나가는 등 변화 후 원래대로 돌아오면 이벤트를 내지 않습니다.
+"""
+import cv2
+import numpy as np
+
+
+def block_means(frame, grid=(16, 9)):
+    """프레임의 블록별 평균 색상 (grid[1], grid[0], 3) float32."""
+    h, w = frame.shape[:2]
+    # 큰 프레임은 먼저 건너뛰며 줄여 INTER_AREA 비용을 낮춤
+    step = max(1, w // (grid[0] * 10))
+    small = frame[::step, ::step]
+    return cv2.resize(small, grid, interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+class SceneChangeDetector:
+    """블록 평균 기반 장면 변화 감지기."""
+
+    def __init__(self, grid=(16, 9), block_delta=20.0, cut_fraction=0.5,
+                 partial_fraction=0.08, settle_frames=3):
+        """
+        Args:
+            grid: 블록 격자 (가로, 세로)
+            block_delta: 블록이 "바뀌었다"고 볼 평균 밝기 차이 (0~255)
+            cut_fraction: 바뀐 블록 비율이 이 이상이면 즉시 "cut"
+            partial_fraction: 안정화 후 바뀐 블록 비율이 이 이상이면 "settled"
+            settle_frames: 연속으로 이 프레임 수만큼 움직임이 없으면 안정화로 판단
+        """
+        self.grid = grid
+        self.block_delta = block_delta
+        self.cut_fraction = cut_fraction
+        self.partial_fraction = partial_fraction
+        self.settle_frames = settle_frames
+
+        self.scene = None
+        self._reference = None
+        self._prev = None
+        self._changing = False
+        self._cut = False
+        self._still = 0
+        self.mask = np.zeros((grid[1], grid[0]), bool)  # 마지막 이벤트의 바뀐 블록
+
+    def _changed(self, a, b):
+        return np.abs(a - b).max(axis=2) > self.block_delta
+
+    def notify_scene(self, scene):
+        """
+        OBS 씬 이름을 전달합니다. 이름이 바뀌면 기준 장면을 초기화하고 "scene" 이벤트를 반환합니다.
+        """
+        if scene == self.scene:
+            return None
+        previous, self.scene = self.scene, scene
+        self._reference = None
+        self._changing = False
+        if previous is None:
+            return None
+        return {"type": "scene", "scene": scene, "previous": previous}
+
+    def update(self, frame):
+        """
+        새 프레임으로 상태를 갱신합니다.
+
+        Returns:
+            이벤트 dict 또는 None
+        """
+        means = block_means(frame, self.grid)
+        if self._reference is None or self._reference.shape != means.shape:
+            self._reference = means
+            self._prev = means
+            return None
+
+        moving = self._changed(means, self._prev).mean() > self.partial_fraction / 2
+        self._prev = means
+
+        if not self._changing:
+            changed = self._changed(means, self._reference)
+            fraction = float(changed.mean())
+            if fraction < self.partial_fraction:
+                return None
+            self._changing = True
+            self._still = 0
+            self._cut = fraction >= self.cut_fraction
+            if self._cut:
+                self.mask = changed
+                return {"type": "cut", "fraction": fraction, "mask": changed}
+            return None
+
+        # 변화 중: 움직임이 멈출 때까지 대기
+        self._still = 0 if moving else self._still + 1
+        if self._still < self.settle_frames:
+            return None
+
+        self._changing = False
+        changed = self._changed(means, self._reference)
+        fraction = float(changed.mean())
+        self._reference = means
+        if fraction < self.partial_fraction and not self._cut:
+            return None  # 원래 장면으로 돌아옴 (손이 지나간 경우 등)
+        self.mask = changed
+        return {"type": "settled", "fraction": fraction, "mask": changed, "after_cut": self._cut}
+
+    def overlaps(self, bbox, frame_w, frame_h, mask=None):
+        """bbox가 바뀐 블록과 겹치는지 여부."""
+        mask = self.mask if mask is None else mask
+        gh, gw = mask.shape
+        x1 = int(np.clip(bbox[0] * gw // frame_w, 0, gw - 1))
+        x2 = int(np.clip((bbox[2] - 1) * gw // frame_w, 0, gw - 1))
+        y1 = int(np.clip(bbox[1] * gh // frame_h, 0, gh - 1))
+        y2 = int(np.clip((bbox[3] - 1) * gh // frame_h, 0, gh - 1))
+        return bool(mask[y1:y2 + 1, x1:x2 + 1].any())
@@ -0,0 +1,118 @@
+"""
+spatial_index.py — 타겟 bbox용 균일 격자(uniform grid) 공간 인덱스
+numpy 배열에 박스를 모아 두고, 격자 셀 → id 집합으로 후보를 좁힌 뒤
+IoU / 겹침 / 점 포함 질의를 벡터화하여 계산합니다.
+
+질의 비용은 전체 타겟 수가 아니라 질의 영역이 걸친 셀의 타겟 수에 비례합니다.
+"""
+import numpy as np
+
+
+def iou_many(bbox, boxes):
+    """bbox 하나와 (N, 4) 박스 배열 사이의 IoU 배열."""
+    if len(boxes) == 0:
+        return np.zeros(0, np.float32)
+    b = np.asarray(bbox, np.float32)
+    ix1 = np.maximum(boxes[:, 0], b[0])
+    iy1 = np.maximum(boxes[:, 1], b[1])
+    ix2 = np.minimum(boxes[:, 2], b[2])
+    iy2 = np.minimum(boxes[:, 3], b[3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    union = areas + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-6), 0.0)
+
+
+class GridIndex:
+    """id → bbox를 관리하는 균일 격자 인덱스."""
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self._boxes = np.zeros((16, 4), np.float32)  # 행 = 타겟 (앞 len(self)행만 사용, 가득 차면 2배)
+        self._ids = []                                # 행 → id
+        self._rows = {}                               # id → 행
+        self._item_cells = {}                         # id → 삽입 시 계산한 셀 목록 (제거에 그대로 사용)
+        self._cells = {}                              # (cx, cy) → {id, ...}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _cells_for(self, bbox):
+        cs = self.cell_size
+        x1, y1 = int(bbox[0] // cs), int(bbox[1] // cs)
+        x2, y2 = int(bbox[2] // cs), int(bbox[3] // cs)
+        return [(cx, cy) for cx in range(x1, x2 + 1) for cy in range(y1, y2 + 1)]
+
+    def insert(self, item_id, bbox):
+        if item_id in self._rows:
+            self.remove(item_id)
+        row = len(self._ids)
+        if row == len(self._boxes):
+            grown = np.zeros((2 * len(self._boxes), 4), np.float32)
+            grown[:row] = self._boxes
+            self._boxes = grown
+        self._rows[item_id] = row
+        self._ids.append(item_id)
+        self._boxes[row] = bbox
+        # float32로 저장된 값으로 다시 계산하면 셀 경계에서 반올림이 달라질 수 있으므로 목록을 보관
+        cells = self._item_cells[item_id] = self._cells_for(bbox)
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(item_id)
+
+    def remove(self, item_id):
+        row = self._rows.pop(item_id, None)
+        if row is None:
+            return
+        for cell in self._item_cells.pop(item_id):
+            members = self._cells.get(cell)
+            if members is not None:
+                members.discard(item_id)
+                if not members:
+                    del self._cells[cell]
+        # 마지막 행을 빈 자리로 옮겨 배열을 조밀하게 유지 (swap-remove)
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._ids[row] = moved
+            self._boxes[row] = self._boxes[last]
+            self._rows[moved] = row
+        self._ids.pop()
+
+    def update(self, item_id, bbox):
+        self.insert(item_id, bbox)
+
+    def _candidates(self, bbox):
+        found = set()
+        for cell in self._cells_for(bbox):
+            found.update(self._cells.get(cell, ()))
+        return found
+
+    def _rows_of(self, ids):
+        return np.fromiter((self._rows[i] for i in ids), np.intp, len(ids))
+
+    def query_point(self, x, y):
+        """점 (x, y)를 포함하는 id 목록."""
+        cs = self.cell_size
+        ids = list(self._cells.get((int(x // cs), int(y // cs)), ()))
+        if not ids:
+            return []
+        boxes = self._boxes[self._rows_of(ids)]
+        inside = (boxes[:, 0] <= x) & (x <= boxes[:, 2]) & (boxes[:, 1] <= y) & (y <= boxes[:, 3])
+        return [ids[i] for i in np.flatnonzero(inside)]
+
+    def query_overlap(self, bbox):
+        """bbox와 겹치는 id와 IoU 배열 (IoU 내림차순)."""
+        ids = list(self._candidates(bbox))
+        if not ids:
+            return [], np.zeros(0, np.float32)
+        ious = iou_many(bbox, self._boxes[self._rows_of(ids)])
+        order = np.argsort(-ious)
+        keep = order[ious[order] > 0]
+        return [ids[i] for i in keep], ious[keep]
+
+    def best_match(self, bbox):
+        """IoU가 가장 큰 (id, IoU). 겹치는 박스가 없으면 (None, 0.0)."""
+        ids, ious = self.query_overlap(bbox)
+        if not ids:
+            return None, 0.0
+        return ids[0], float(ious[0])
@@ -0,0 +1,166 @@
+"""
+stt_protocol.py — STT 프로세스 ↔ 메인 프로세스 Pipe 메시지 형식 (버전 관리 + 바이너리 직렬화)
+
+메시지는 그대로 dict로 다루지만, Pipe에는 pickle 대신 고정 헤더 + marshal 본문으로 보냅니다.
+
+    헤더 (16바이트, little-endian): 매직 b"JS" | 버전 u8 | 타입 코드 u8 | 순번 u32 | 송신 시각 f64
+
+- 타입마다 필수 필드를 검사하므로 빠진 필드는 보내는 쪽에서 바로 ValueError가 납니다.
+- 순번(msg_seq)은 연결마다 1부터 늘어나며, 받는 쪽에서 빠지거나 순서가 바뀐 메시지를 셉니다.
+- 송신 시각(sent_at)은 time.monotonic()입니다. 시스템 전역 시계이므로 프로세스 간 지연 계산에 그대로 씁니다.
+- numpy 배열 필드(재생 참조 신호)는 float32 바이트로 보냅니다.
+
+발화 관련 메시지에는 corr_id(상관 id)가 붙습니다. 호출어 감지 때 만들어져
+같은 발화의 listening_command / partial / command / timeout / not_recognized에 이어지고,
+UI에서 Vision·PTZ·TTS 지연 기록(LatencyTrace)의 키로 쓰입니다.
+
+⚠️ PyQt5를 import하지 않습니다 (STT 프로세스에서 사용).
+"""
+import time
+import struct
+import marshal
+import threading
+
+import numpy as np
+
+PROTOCOL_VERSION = 1
+
+_MAGIC = b"JS"
+_HEADER = struct.Struct("<2sBBId")
+
+# 타입 이름 ↔ 코드 (새 타입은 뒤에만 추가)
+MESSAGE_TYPES = (
+    "heartbeat", "status", "partial", "command", "terminate", "stats",
+    "shutdown", "swap_model", "playback",
+)
+_TYPE_CODES = {name: code for code, name in enumerate(MESSAGE_TYPES, 1)}
+
+# 타입별 필수 필드
+REQUIRED_FIELDS = {
+    "heartbeat": ("phase", "loop"),
+    "status": ("status",),
+    "partial": ("corr_id", "seq", "text", "stable_text", "utterance_start"),
+    "command": ("corr_id", "text", "utterance_start", "utterance_end", "decode_start", "decode_end"),
+    "swap_model": ("model_size",),
+    "playback": ("state", "id", "t"),
+}
+# status 메시지 중 추가 필드가 필요한 것
+STATUS_FIELDS = {
+    "wake_detected": ("corr_id", "utterance_start", "utterance_end", "decode_start", "decode_end"),
+    "listening_command": ("corr_id",),
+    "timeout": ("corr_id",),
+    "not_recognized": ("corr_id",),
+}
+_ARRAY_FIELDS = ("reference",)
+
+
+class ProtocolError(Exception):
+    """해석할 수 없는 메시지 (버전·매직 불일치, 손상된 본문)."""
+
+
+def _plain(value):
+    """marshal이 지원하지 않는 numpy 값을 파이썬 기본 타입으로 바꿉니다."""
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return value
+
+
+def encode(msg, seq, sent_at=None):
+    """
+    dict 메시지를 바이트로 직렬화합니다.
+
+    Raises:
+        ValueError: 알 수 없는 타입이거나 필수 필드가 빠진 경우
+    """
+    msg_type = msg.get("type")
+    code = _TYPE_CODES.get(msg_type)
+    if code is None:
+        raise ValueError(f"알 수 없는 메시지 타입: {msg_type}")
+    required = REQUIRED_FIELDS.get(msg_type, ()) + STATUS_FIELDS.get(msg.get("status"), ())
+    missing = [field for field in required if field not in msg]
+    if missing:
+        raise ValueError(f"'{msg_type}' 메시지에 필드 없음: {', '.join(missing)}")
+
+    body = {k: v for k, v in msg.items() if k != "type"}
+    for field in _ARRAY_FIELDS:
+        if isinstance(body.get(field), np.ndarray):
+            body[field] = np.ascontiguousarray(body[field], np.float32).tobytes()
+    # numpy 스칼라는 marshal이 바이트로 저장해 버리므로 먼저 기본 타입으로 바꿈
+    payload = marshal.dumps(_plain(body))
+    sent_at = time.monotonic() if sent_at is None else sent_at
+    return _HEADER.pack(_MAGIC, PROTOCOL_VERSION, code, seq & 0xFFFFFFFF, sent_at) + payload
+
+
+def decode(data):
+    """
+    바이트를 dict 메시지로 되돌립니다 (헤더의 msg_seq, sent_at 포함).
+
+    Raises:
+        ProtocolError: 매직·버전이 다르거나 본문이 손상된 경우
+    """
+    if len(data) < _HEADER.size:
+        raise ProtocolError(f"메시지가 너무 짧습니다 ({len(data)} bytes)")
+    magic, version, code, seq, sent_at = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ProtocolError(f"매직 불일치: {magic!r}")
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"프로토콜 버전 불일치: {version} (기대 {PROTOCOL_VERSION})")
+    if not 1 <= code <= len(MESSAGE_TYPES):
+        raise ProtocolError(f"알 수 없는 타입 코드: {code}")
+    try:
+        body = marshal.loads(data[_HEADER.size:])
+    except (EOFError, ValueError, TypeError) as e:
+        raise ProtocolError(f"본문 해석 실패: {e}") from e
+
+    for field in _ARRAY_FIELDS:
+        if isinstance(body.get(field), bytes):
+            body[field] = np.frombuffer(body[field], np.float32)
+    return {"type": MESSAGE_TYPES[code - 1], **body, "msg_seq": seq, "sent_at": sent_at}
+
+
+class ProtocolConn:
+    """
+    Pipe Connection을 감싸 dict 메시지를 프로토콜 형식으로 주고받습니다.
+    송신은 잠금으로 직렬화되므로 여러 스레드에서 send()해도 됩니다.
+    수신 순번이 건너뛰거나 되돌아가면 gaps / reordered를 늘리고 경고를 출력합니다.
+    """
+
+    def __init__(self, conn, name="Pipe"):
+        self._conn = conn
+        self.name = name
+        self._send_lock = threading.Lock()
+        self._send_seq = 0
+        self._recv_seq = 0
+        self.gaps = 0
+        self.reordered = 0
+
+    def send(self, msg):
+        with self._send_lock:
+            self._send_seq += 1
+            self._conn.send_bytes(encode(msg, self._send_seq))
+
+    def poll(self, timeout=0.0):
+        return self._conn.poll(timeout)
+
+    def recv(self):
+        msg = decode(self._conn.recv_bytes())
+        seq = msg["msg_seq"]
+        if seq != self._recv_seq + 1:
+            if seq <= self._recv_seq:
+                self.reordered += 1
+                print(f"[{self.name}] 순서가 바뀐 메시지: #{seq} (마지막 #{self._recv_seq})")
+            else:
+                self.gaps += 1
+                print(f"[{self.name}] 메시지 누락: #{self._recv_seq + 1}~#{seq - 1}")
+        self._recv_seq = max(self._recv_seq, seq)
+        return msg
+
+    def close(self):
+        with self._send_lock:
+            self._conn.close()
@@ -0,0 +1,203 @@
+"""
+stt_supervisor.py — STT 워커 프로세스 감독 (하트비트 감시 / 자동 재시작 / 모델 교체)
+메인 프로세스에서 STT 프로세스를 띄우고, 죽거나 멈추면 점점 늘어나는 대기 후 다시 띄웁니다.
+
+UI에는 Pipe와 같은 인터페이스(poll/recv/send/close)를 제공하므로,
+워커가 재시작되어 내부 Pipe가 바뀌어도 UI 쪽 코드는 그대로입니다.
+워커와는 modules.stt_protocol 형식으로 주고받고, UI에는 해석한 dict를 넘깁니다.
+
+감독자가 UI로 보내는 추가 메시지 (dict):
+    {"type": "status", "status": "ready", "startup": {..., "spawn_to_ready_sec": 4.2}, "restarts": 1}
+    {"type": "status", "status": "stt_restarting", "reason": "...", "retry_in": 2.0, "restarts": 1}
+
+⚠️ PyQt5를 import하지 않습니다 (main.py가 UI보다 먼저 import).
+"""
+import time
+import queue
+import threading
+import multiprocessing
+
+from config import (
+    STT_HEARTBEAT_TIMEOUT, STT_LOOP_STALL_TIMEOUT, STT_STARTUP_TIMEOUT,
+    STT_RESTART_BACKOFF, STT_STABLE_SEC,
+)
+from modules.stt_protocol import ProtocolConn, ProtocolError
+
+
+class SttSupervisor:
+    """STT 워커 1개를 띄우고 감시합니다."""
+
+    def __init__(self, target, options=None):
+        """
+        Args:
+            target: 워커 엔트리포인트 target(pipe_conn, source_factory, options) (stt_worker.stt_process)
+            options: 워커 옵션 (모델 교체가 성공하면 갱신되어 재시작에도 유지됨)
+        """
+        self.target = target
+        self.options = dict(options or {})
+        self.restarts = 0
+
+        self._inbox = queue.Queue()
+        self._pending = None
+        self._send_lock = threading.Lock()
+        self._conn = None
+        self._proc = None
+        self._monitor = None
+        self._closing = False
+        self._exit_expected = False   # 워커가 스스로 끝내는 경우 (종료어)
+
+        self._failures = 0            # 연속 실패 횟수 (재시작 대기 계산)
+        self._spawned_at = None
+        self._ready_at = None
+        self._last_beat = None
+        self._last_loop = None
+
+    # ── 프로세스 관리 ──
+    def start(self):
+        self._spawn()
+        self._monitor = threading.Thread(target=self._run, name="SttSupervisor", daemon=True)
+        self._monitor.start()
+
+    def _spawn(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        proc = multiprocessing.Process(
+            target=self.target, args=(child_conn, None, dict(self.options)), daemon=True,
+        )
+        proc.start()
+        child_conn.close()
+        with self._send_lock:
+            self._conn, self._proc = ProtocolConn(parent_conn, "Supervisor"), proc
+        self._spawned_at = time.monotonic()
+        self._ready_at = None
+        self._last_beat = None
+        self._last_loop = None
+        print(f"[Supervisor] STT 프로세스 시작 (PID: {proc.pid})")
+
+    def _kill(self):
+        with self._send_lock:
+            conn, proc = self._conn, self._proc
+            self._conn = None
+        if proc is not None and proc.is_alive():
+            proc.terminate()
+            proc.join(timeout=3)
+        if conn is not None:
+            conn.close()
+
+    def _run(self):
+        while not self._closing:
+            reason = self._check()
+            if reason is None:
+                continue
+            if self._exit_expected or self._closing:
+                return
+            self._restart(reason)
+
+    def _check(self):
+        """메시지를 하나 처리하고 워커 상태를 확인합니다. 재시작이 필요하면 사유를 반환합니다."""
+        conn, proc = self._conn, self._proc
+        try:
+            if conn.poll(0.2):
+                self._handle(conn.recv())
+        except ProtocolError as e:
+            print(f"[Supervisor] 잘못된 메시지 무시: {e}")
+        except (EOFError, OSError):
+            return f"Pipe 끊김 (exit code {proc.exitcode})" if not proc.is_alive() else "Pipe 끊김"
+
+        now = time.monotonic()
+        if not proc.is_alive():
+            return f"프로세스 종료 (exit code {proc.exitcode})"
+        if self._last_beat is None:
+            if now - self._spawned_at > STT_STARTUP_TIMEOUT:
+                return f"시작 시간 초과 ({STT_STARTUP_TIMEOUT:.0f}s)"
+        elif now - self._last_beat > STT_HEARTBEAT_TIMEOUT:
+            return f"하트비트 없음 ({now - self._last_beat:.1f}s)"
+        elif self._ready_at is not None and self._last_loop is not None \
+                and self._last_beat - self._last_loop > STT_LOOP_STALL_TIMEOUT:
+            return f"메인 루프 멈춤 ({self._last_beat - self._last_loop:.0f}s)"
+        return None
+
+    def _handle(self, msg):
+        msg_type = msg.get("type")
+        if msg_type == "heartbeat":
+            self._last_beat = time.monotonic()
+            if msg.get("phase") == "running":
+                self._last_loop = msg.get("loop")
+            return
+
+        if msg_type == "status":
+            status = msg.get("status")
+            if status == "ready":
+                self._ready_at = time.monotonic()
+                startup = dict(msg.get("startup") or {})
+                startup["spawn_to_ready_sec"] = self._ready_at - self._spawned_at
+                msg = dict(msg, startup=startup, restarts=self.restarts)
+                print(f"[Supervisor] STT 준비 완료 ({startup['spawn_to_ready_sec']:.1f}s, "
+                      f"모델 {startup.get('model_load_sec', 0.0):.1f}s, 재시작 {self.restarts}회)")
+            elif status == "model_swapped":
+                self.options["model_size"] = msg["model_size"]
+        elif msg_type == "terminate":
+            self._exit_expected = True
+        self._inbox.put(msg)
+
+    def _restart(self, reason):
+        # 한동안 정상 동작했으면 연속 실패로 보지 않음
+        if self._ready_at is not None and time.monotonic() - self._ready_at > STT_STABLE_SEC:
+            self._failures = 0
+        low, high = STT_RESTART_BACKOFF
+        delay = min(high, low * 2 ** self._failures)
+        self._failures += 1
+        self.restarts += 1
+
+        print(f"[Supervisor] STT 워커 이상: {reason} → {delay:.0f}s 후 재시작 ({self.restarts}회째)")
+        self._kill()
+        self._inbox.put({
+            "type": "status", "status": "stt_restarting",
+            "reason": reason, "retry_in": delay, "restarts": self.restarts,
+        })
+        deadline = time.monotonic() + delay
+        while not self._closing and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if not self._closing:
+            self._spawn()
+
+    # ── Pipe 호환 인터페이스 ──
+    def poll(self, timeout=0.0):
+        if self._pending is not None:
+            return True
+        try:
+            self._pending = self._inbox.get(timeout=timeout) if timeout else self._inbox.get_nowait()
+        except queue.Empty:
+            return False
+        return True
+
+    def recv(self):
+        if self._pending is None:
+            return self._inbox.get()
+        msg, self._pending = self._pending, None
+        return msg
+
+    def send(self, msg):
+        """현재 워커로 메시지를 보냅니다 (재시작 중이면 버림, 여러 스레드에서 호출 가능)."""
+        if msg.get("type") == "shutdown":
+            self._closing = True
+        with self._send_lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.send(msg)
+            except (OSError, EOFError, BrokenPipeError):
+                pass
+
+    def swap_model(self, model_size, compute_type=None):
+        """명령 모델 크기를 바꿉니다. 새 모델이 다 로드될 때까지 기존 모델로 인식이 계속됩니다."""
+        self.send({"type": "swap_model", "model_size": model_size, "compute_type": compute_type})
+
+    def close(self):
+        """워커를 정상 종료시키고 (응답이 없으면 강제 종료) 감시를 멈춥니다."""
+        self.send({"type": "shutdown"})
+        proc = self._proc
+        if proc is not None:
+            proc.join(timeout=3)
+        self._kill()
+        if self._monitor is not None:
+            self._monitor.join(timeout=2)
@@ -7,9 +7,9 @@ multiprocessing.Pipe를 통해 메인 프로세스와 통신합니다.
 """
 import os
 import sys
-import numpy as np
 import time
-import speech_recognition as sr
+import uuid
+import threading
 
 # Windows CUDA DLL 경로 주입
 try:
@@ -23,168 +23,634 @@ except Exception:
 # config.py import (dotenv는 OK, PyQt5만 금지)
 from config import (
     STT_MODEL_SIZE, STT_DEVICE, STT_COMPUTE_TYPE,
+    STT_WAKE_MODEL_SIZE, STT_WAKE_COMPUTE_TYPE, STT_WAKE_MAX_TOKENS,
     WAKE_WORDS, TERMINATE_WORDS,
+    STT_SAMPLE_RATE, STT_RING_SECONDS, VAD_FRAME_MS, VAD_ENERGY_THRESHOLD, VAD_PAUSE_SEC,
+    VAD_PRE_ROLL_SEC, VAD_MIN_SPEECH_SEC, WAKE_PHRASE_LIMIT, COMMAND_PHRASE_LIMIT, COMMAND_TIMEOUT,
+    KWS_ENABLED, KWS_TEMPLATE_PATH, KWS_THRESHOLD,
+    STT_PARTIAL_ENABLED, STT_PARTIAL_INTERVAL, STT_PARTIAL_MIN_SEC,
+    STT_PLAYBACK_MODE, STT_PLAYBACK_LATENCY, STT_PLAYBACK_TAIL, NLMS_TAPS, NLMS_STEP,
+    STT_HEARTBEAT_INTERVAL, MIC_REOPEN_BACKOFF,
 )
+from modules.audio_stream import (
+    AudioRingBuffer, MicCapture, VadSegmenter, PlaybackGate, NlmsCanceller,
+)
+from modules.keyword_spotter import KeywordSpotter
+from modules.phrase_matcher import PhraseMatcher
+from modules.stt_protocol import ProtocolConn
+
+# 호출어/종료어 매처 (프로세스 시작 시 한 번만 컴파일)
+PHRASES = PhraseMatcher({"wake": WAKE_WORDS, "terminate": TERMINATE_WORDS}, word_boundary=("wake",))
+
+
+def default_options():
+    """
+    stt_process 동작 옵션 기본값 (config.py 값). 벤치마크에서 일부만 바꿔 넘길 수 있습니다.
+    """
+    return {
+        "model_size": STT_MODEL_SIZE,
+        "compute_type": STT_COMPUTE_TYPE,
+        "wake_model_size": STT_WAKE_MODEL_SIZE,
+        "wake_compute_type": STT_WAKE_COMPUTE_TYPE,
+        "beam_size": 1,
+        "pause_sec": VAD_PAUSE_SEC,
+        "calibrate_sec": 2.0,
+        "kws": KWS_ENABLED,
+        "partial": STT_PARTIAL_ENABLED,
+    }
+
+
+def _heartbeat_loop(conn, health, stop, interval):
+    """
+    모델 로딩 중에도 살아 있음을 알리도록 별도 스레드에서 주기적으로 하트비트를 보냅니다.
+    메인 루프가 멈추면(교착 등) health["loop"]가 갱신되지 않으므로 감독자가 구분할 수 있습니다.
+    """
+    while not stop.wait(interval):
+        try:
+            conn.send({"type": "heartbeat", "t": time.monotonic(), **health})
+        except (OSError, EOFError, BrokenPipeError):
+            return
+
 
+class _TierStats:
+    """모델 계층별 변환 지연 시간 기록."""
 
-def _load_whisper():
-    """Faster-Whisper 모델을 로드합니다."""
+    def __init__(self, name):
+        self.name = name
+        self._times = []
+
+    def add(self, elapsed_ms):
+        self._times.append(elapsed_ms)
+        if len(self._times) > 500:
+            del self._times[:250]
+
+    def summary(self):
+        if not self._times:
+            return f"{self.name}: 0회"
+        times = sorted(self._times)
+        n = len(times)
+        return (
+            f"{self.name}: {n}회, 평균 {sum(times) / n:.0f}ms, "
+            f"p50 {times[n // 2]:.0f}ms, p95 {times[min(n - 1, int(n * 0.95))]:.0f}ms"
+        )
+
+    def as_dict(self):
+        times = sorted(self._times)
+        n = len(times)
+        return {
+            "count": n,
+            "total_ms": sum(times),
+            "p50_ms": times[n // 2] if n else 0.0,
+            "p95_ms": times[min(n - 1, int(n * 0.95))] if n else 0.0,
+        }
+
+
+def _load_model(size, compute_type):
     from faster_whisper import WhisperModel
-    print(f"[STT] Faster-Whisper '{STT_MODEL_SIZE}' ({STT_DEVICE}) 모델 로딩 중...")
-    model = WhisperModel(STT_MODEL_SIZE, device=STT_DEVICE, compute_type=STT_COMPUTE_TYPE)
-    print(f"[STT] 모델 로드 완료!")
+    start = time.perf_counter()
+    model = WhisperModel(size, device=STT_DEVICE, compute_type=compute_type)
+    print(f"[STT] '{size}' ({STT_DEVICE}, {compute_type}) 로드 완료 ({time.perf_counter() - start:.1f}s)")
     return model
 
 
-def _transcribe(model, audio_data):
-    """AudioData를 텍스트로 변환합니다."""
-    try:
-        raw_bytes = audio_data.get_raw_data(convert_rate=16000, convert_width=2)
-        audio_np = np.frombuffer(raw_bytes, np.int16).flatten().astype(np.float32) / 32768.0
+def _load_whisper(opts):
+    """
+    Faster-Whisper 모델을 로드합니다.
+    호출어 확인용 소형 모델(wake_model_size)과 명령용 모델(model_size)을 병렬로 불러옵니다.
+
+    Returns:
+        (wake_model, command_model) — 소형 모델을 쓰지 않으면 둘은 같은 모델
+    """
+    from concurrent.futures import ThreadPoolExecutor
 
+    size, wake_size = opts["model_size"], opts["wake_model_size"]
+    if not wake_size or wake_size == size:
+        print(f"[STT] Faster-Whisper '{size}' ({STT_DEVICE}) 모델 로딩 중...")
+        model = _load_model(size, opts["compute_type"])
+        return model, model
+
+    print(f"[STT] Faster-Whisper 호출어 '{wake_size}' + 명령 '{size}' 병렬 로딩 중...")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        wake_future = pool.submit(_load_model, wake_size, opts["wake_compute_type"])
+        command_future = pool.submit(_load_model, size, opts["compute_type"])
+        wake_model, command_model = wake_future.result(), command_future.result()
+    print(f"[STT] 모델 로드 완료! ({time.perf_counter() - start:.1f}s)")
+    return wake_model, command_model
+
+
+def _load_spotter(enabled=KWS_ENABLED):
+    """경량 호출어 검출기를 불러옵니다 (템플릿이 없으면 None → 모든 발화를 Whisper로 확인)."""
+    if not enabled:
+        return None
+    if not os.path.exists(KWS_TEMPLATE_PATH):
+        print("[KWS] 호출어 템플릿 없음 → 모든 발화를 Whisper로 확인합니다 (pre_test/10_kws_enroll.py로 등록)")
+        return None
+    spotter = KeywordSpotter.load(KWS_TEMPLATE_PATH, KWS_THRESHOLD)
+    print(f"[KWS] 호출어 템플릿 {len(spotter.templates)}개 로드 (임계값 {spotter.threshold:.2f})")
+    return spotter
+
+
+def _transcribe(model, audio_np, stats=None, beam_size=1, **options):
+    """
+    16kHz float32 오디오를 텍스트로 변환합니다.
+
+    Args:
+        stats: 지연 시간을 기록할 _TierStats (선택)
+        beam_size: 빔 크기 (1 = greedy)
+        options: model.transcribe()에 추가로 넘길 옵션
+    """
+    try:
         hint_prompt = "짭스, 헤이짭스, 타겟, 설정, 확대, 줌인, 구도 복원, 종료, 꺼 줘, 종이컵, 물병. "
 
+        start = time.perf_counter()
         segments, info = model.transcribe(
             audio_np,
-            beam_size=1,
+            beam_size=beam_size,
             language="ko",
             condition_on_previous_text=False,
             vad_filter=True,
             initial_prompt=hint_prompt,
+            **options,
         )
-        return "".join([seg.text + " " for seg in segments]).strip()
+        text = "".join([seg.text + " " for seg in segments]).strip()
+        if stats is not None:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            stats.add(elapsed_ms)
+            print(f"[STT] {stats.name} 변환 {elapsed_ms:.0f}ms ({len(audio_np) / STT_SAMPLE_RATE:.1f}s 음성)")
+        return text
     except Exception as e:
         print(f"[STT] 변환 오류: {e}")
         return ""
 
 
-def _is_detected(text, word_list):
-    """텍스트에서 키워드 목록 중 하나가 포함되어 있는지 확인합니다."""
-    cleaned = text.replace(" ", "").lower()
-    for word in word_list:
-        if word.replace(" ", "").lower() in cleaned:
-            return True, word
-    return False, None
+def _strip_prefix(text, prefix):
+    """결과에 prefix가 포함되어 돌아온 경우(버전에 따라 다름) 띄어쓰기와 무관하게 떼어냅니다."""
+    target = prefix.replace(" ", "")
+    matched = 0
+    for i, ch in enumerate(text):
+        if matched == len(target):
+            return text[i:].strip()
+        if ch == " ":
+            continue
+        if ch != target[matched]:
+            return text
+        matched += 1
+    return "" if matched == len(target) else text
+
+
+class _PartialDecoder:
+    """
+    명령 발화 중 늘어나는 오디오를 주기적으로 다시 변환해 부분 결과를 만듭니다.
+
+    연속한 두 가설의 공통 앞부분(단어 단위, local agreement)을 안정 구간으로 확정하고,
+    다음 변환에는 확정된 텍스트를 prefix로 넘겨 그 부분을 다시 탐색하지 않게 합니다.
+    안정 구간은 줄어들지 않으므로 UI는 안정 텍스트만 보고 먼저 동작할 수 있습니다.
+    """
+
+    def __init__(self, interval_sec, min_sec, rate=STT_SAMPLE_RATE):
+        self.interval = int(interval_sec * rate)
+        self.min_len = int(min_sec * rate)
+        self.seq = 0
+        self.reset()
+
+    def reset(self):
+        """새 발화를 위해 가설을 비웁니다 (seq는 프로세스 전체에서 계속 증가)."""
+        self.start = None
+        self.stable = []
+        self._previous = []
+        self._decoded_len = 0
+        self._text = ""
+
+    def update(self, model, pending, stats=None, **options):
+        """
+        진행 중인 발화 (시작 인덱스, 오디오)로 가설을 갱신합니다.
+        options는 _transcribe()에 그대로 넘깁니다.
+
+        Returns:
+            가설이 바뀌었으면 partial 메시지 dict, 아니면 None
+        """
+        start, audio = pending
+        if start != self.start:
+            self.reset()
+            self.start = start
+        if len(audio) < self.min_len or len(audio) - self._decoded_len < self.interval:
+            return None
+        self._decoded_len = len(audio)
+
+        prefix = " ".join(self.stable)
+        options["without_timestamps"] = True
+        if prefix:
+            options["prefix"] = prefix
+        tail = _transcribe(model, audio, stats, **options)
+        if prefix:
+            tail = _strip_prefix(tail, prefix)
+        words = self.stable + tail.split()
+
+        common = 0
+        for a, b in zip(self._previous, words):
+            if a != b:
+                break
+            common += 1
+        if common > len(self.stable):
+            self.stable = words[:common]
+        self._previous = words
+
+        text = " ".join(words)
+        if not text or text == self._text:
+            return None
+        self._text = text
+        self.seq += 1
+        return {
+            "type": "partial",
+            "seq": self.seq,
+            "text": text,
+            "stable_text": " ".join(self.stable),
+            "stable": len(self.stable) == len(words),
+        }
 
 
-def stt_process(pipe_conn):
+def _suppress_playback(segment, gate, canceller, segmenter, rate=STT_SAMPLE_RATE):
+    """
+    앱 자신의 재생음(TTS/효과음)과 겹친 발화 구간을 처리합니다.
+    gate 모드는 재생 중에 녹음된 샘플을 잘라내고, nlms 모드는 참조 신호를 뺀 잔차를 사용합니다.
+
+    Returns:
+        변환할 오디오 (남은 음성이 min_speech보다 짧아 재생음뿐이면 None)
+    """
+    audio = segment.audio
+    start_time = segment.end_time - len(audio) / rate   # 오디오는 발화 종료 샘플에서 끝남
+    mask = gate.mask(start_time, len(audio), rate)
+    if mask is None:
+        return audio
+
+    if canceller is not None:
+        reference = gate.reference(start_time, len(audio), rate)
+        if reference is not None:
+            audio = canceller.cancel(audio, reference)
+            return audio if segmenter.voiced_samples(audio) >= segmenter.min_speech else None
+
+    kept = audio[~mask]
+    return kept if segmenter.voiced_samples(kept) >= segmenter.min_speech else None
+
+
+def _decode(model, audio_np, stats=None, **options):
+    """
+    _transcribe()와 같지만 변환 시작/종료 시각(time.monotonic)을 함께 반환합니다.
+
+    Returns:
+        (텍스트, {"decode_start": t0, "decode_end": t1})
+    """
+    start = time.monotonic()
+    text = _transcribe(model, audio_np, stats, **options)
+    return text, {"decode_start": start, "decode_end": time.monotonic()}
+
+
+def _new_corr_id():
+    """발화 1건(호출어 → 명령)을 UI의 Vision/PTZ/TTS까지 추적하는 상관 id."""
+    return uuid.uuid4().hex[:12]
+
+
+def _segment_times(segment):
+    """
+    VAD 구간의 발화 시작/종료 시각 (time.monotonic 기준 — 시스템 전역 시계이므로
+    UI 프로세스와 비교 가능). 링 버퍼의 샘플 인덱스로 계산하므로 정확합니다.
+    """
+    return {"utterance_start": segment.start_time, "utterance_end": segment.end_time}
+
+
+def stt_process(pipe_conn, source_factory=None, options=None):
     """
     STT 전용 프로세스 엔트리포인트.
     호출어를 상시 감지하고, 명령을 인식하여 Pipe로 전송합니다.
 
-    Pipe 전송 형식 (dict):
-        {"type": "status", "status": "ready"}
-        {"type": "status", "status": "wake_detected"}
-        {"type": "status", "status": "listening_command"}
-        {"type": "command", "text": "종이컵 1 확대해 줘"}
+    Args:
+        pipe_conn: 메인 프로세스와 연결된 Pipe
+        source_factory: source_factory(ring) → 오디오 입력 (기본: MicCapture).
+                        start()/stop()/error를 제공하고, finished가 True가 되면 남은 발화를 처리한 뒤 종료합니다.
+                        (오프라인 벤치마크의 WavFileSource 등)
+        options: default_options()의 일부를 바꿀 dict (모델 크기, beam_size, pause_sec 등)
+
+    UI가 보내는 재생 알림으로 앱 자신의 TTS/효과음 구간을 기록해 두고,
+    그 구간에 녹음된 음성은 변환하지 않습니다 (STT_PLAYBACK_MODE).
+
+    호출어 대기 중에는 경량 검출기(MFCC+DTW)를 먼저 통과한 발화만 Whisper로 확인합니다.
+    따라서 종료어는 대기 중 단독으로는 인식되지 않고 "짭스, 종료"처럼 호출어 뒤에 말해야 합니다.
+
+    마이크는 캡처 스레드가 계속 읽어 링 버퍼에 쌓고, 이 루프는 VAD가 잘라낸
+    발화 구간만 변환합니다. 변환 중에 들어온 음성도 버퍼에 남아 다음 차례에 처리됩니다.
+
+    Pipe 전송 형식 (dict, modules.stt_protocol로 직렬화 — 받는 쪽에는 msg_seq, sent_at이 추가됨):
+        {"type": "heartbeat", "t": t, "phase": "loading" | "calibrating" | "running", "loop": t_loop}
+        {"type": "status", "status": "ready", "startup": {"model_load_sec": 3.1, "calibrate_sec": 2.0}}
+        {"type": "status", "status": "model_swapped", "model_size": "medium", "load_sec": 5.2}
+        {"type": "status", "status": "model_swap_failed", "model_size": "medium", "error": "..."}
+        {"type": "status", "status": "wake_detected", "corr_id": id, "utterance_start": t0, "utterance_end": t1,
+         "decode_start": t2, "decode_end": t3}
+        {"type": "status", "status": "listening_command" | "timeout" | "not_recognized", "corr_id": id}
+        {"type": "partial", "corr_id": id, "seq": 3, "text": "종이컵 1 확대", "stable_text": "종이컵 1",
+         "stable": False, "utterance_start": t0}
+        {"type": "command", "corr_id": id, "text": "종이컵 1 확대해 줘", "utterance_start": t0, "utterance_end": t1,
+         "decode_start": t2, "decode_end": t3, "partial_seq": 3}
         {"type": "terminate"}
+        {"type": "stats", "wake": {...}, "command": {...}, "partial": {...}, "kws": {...}}  (종료 시)
+
+    Pipe 수신 형식 (dict):
+        {"type": "shutdown"}
+        {"type": "swap_model", "model_size": "medium", "compute_type": "int8"(선택)}
+        {"type": "playback", "state": "start" | "end", "id": 1, "t": t, "reference": float32 배열(선택)}
+
+    시각은 모두 time.monotonic()입니다. utterance_start/end는 발화 구간(녹음 시각),
+    decode_start/end는 Whisper 변환 구간입니다. corr_id는 호출어 감지 때 만들어져 같은 발화의
+    후속 메시지에 이어집니다 (UI 지연 기록의 키).
+    partial은 명령 대기 중 발화가 끝나기 전에 보내는 중간 결과입니다. stable_text는
+    이후 가설에서도 바뀌지 않는 앞부분이며, 최종 command는 prefix 없이 다시 변환하므로
+    부분 결과와 다를 수 있습니다 (partial_seq: 마지막으로 보낸 partial 번호, 없으면 None).
+    swap_model은 새 모델을 백그라운드에서 모두 불러온 뒤 교체하므로 그동안에도 기존 모델로 인식이 계속됩니다.
     """
-    model = _load_whisper()
-    recognizer = sr.Recognizer()
-    mic = sr.Microphone()
+    opts = default_options()
+    opts.update(options or {})
+    source_factory = source_factory or MicCapture
+
+    pipe_conn = ProtocolConn(pipe_conn, "STT")
+    health = {"phase": "loading", "loop": time.monotonic()}
+    heartbeat_stop = threading.Event()
+    threading.Thread(
+        target=_heartbeat_loop, args=(pipe_conn, health, heartbeat_stop, STT_HEARTBEAT_INTERVAL),
+        name="SttHeartbeat", daemon=True,
+    ).start()
+
+    load_start = time.perf_counter()
+    wake_model, command_model = _load_whisper(opts)
+    model_load_sec = time.perf_counter() - load_start
+    two_tier = wake_model is not command_model
+    wake_stats = _TierStats(f"호출어({opts['wake_model_size'] if two_tier else opts['model_size']})")
+    command_stats = _TierStats(f"명령({opts['model_size']})")
+    decode_options = {"beam_size": opts["beam_size"]}
+    # 호출어 확인은 짧은 문구만 필요하므로 디코딩 길이를 제한
+    wake_options = {**decode_options, "without_timestamps": True, "max_new_tokens": STT_WAKE_MAX_TOKENS}
+    partials = _PartialDecoder(STT_PARTIAL_INTERVAL, STT_PARTIAL_MIN_SEC) if opts["partial"] else None
+    partial_stats = _TierStats(f"부분({opts['model_size']})")
+    spotter = _load_spotter(opts["kws"])
+    kws_checked = kws_passed = 0
+    kws_ms = 0.0
+
+    gate = None
+    canceller = None
+    if STT_PLAYBACK_MODE != "off":
+        gate = PlaybackGate(STT_PLAYBACK_LATENCY, STT_PLAYBACK_TAIL)
+        if STT_PLAYBACK_MODE == "nlms":
+            canceller = NlmsCanceller(NLMS_TAPS, NLMS_STEP)
+    playback_dropped = 0
 
-    print("[STT] 주변 소음 측정 중 (2초)...")
-    with mic as source:
-        recognizer.adjust_for_ambient_noise(source, duration=2)
-    # 말 끝나자마자 빠르게 인식하도록
-    recognizer.pause_threshold = 0.6
-    recognizer.non_speaking_duration = 0.4
-    recognizer.energy_threshold = 300  # 기본보다 약간 낮게 (민감하게)
+    ring = AudioRingBuffer(STT_RING_SECONDS, STT_SAMPLE_RATE)
+    capture = source_factory(ring)
+    capture.start()
+    segmenter = VadSegmenter(
+        ring,
+        frame_ms=VAD_FRAME_MS,
+        energy_threshold=VAD_ENERGY_THRESHOLD,
+        pause_sec=opts["pause_sec"],
+        pre_roll_sec=VAD_PRE_ROLL_SEC,
+        min_speech_sec=VAD_MIN_SPEECH_SEC,
+        max_speech_sec=WAKE_PHRASE_LIMIT,
+    )
+
+    print(f"[STT] 주변 소음 측정 중 ({opts['calibrate_sec']:g}초)...")
+    health["phase"] = "calibrating"
+    calibrate_start = time.perf_counter()
+    segmenter.calibrate(opts["calibrate_sec"])
 
     # 준비 완료 알림
-    pipe_conn.send({"type": "status", "status": "ready"})
+    health["phase"] = "running"
+    pipe_conn.send({
+        "type": "status",
+        "status": "ready",
+        "startup": {
+            "model_load_sec": model_load_sec,
+            "calibrate_sec": time.perf_counter() - calibrate_start,
+        },
+    })
     print("[STT] 호출어 대기 모드 시작!")
 
     state = "WAKE_WORD_LISTENING"
+    command_deadline = None
+    corr_id = None   # 현재 발화(호출어 → 명령)의 상관 id
+    swap = None   # (Future, 모델 크기, compute_type, 시작 시각) — 모델 교체 진행 중
+    swap_pool = None
+    mic_backoff = MIC_REOPEN_BACKOFF[0]
+    mic_retry_at = None     # 마이크 재연결 예정 시각
+    mic_opened_total = 0    # 마지막으로 연 시점의 링 버퍼 누적 샘플 수
+
+    def enter_wake_mode():
+        segmenter.max_speech_sec = WAKE_PHRASE_LIMIT
+        if partials is not None:
+            partials.reset()
+        return "WAKE_WORD_LISTENING"
 
     try:
         while True:
-            # 메인 프로세스에서 종료 신호 확인
-            if pipe_conn.poll(0):
+            health["loop"] = time.monotonic()
+            # 메인 프로세스 메시지 처리 (종료 신호, 재생 알림, 모델 교체)
+            shutdown = False
+            while pipe_conn.poll(0):
                 msg = pipe_conn.recv()
-                if msg.get("type") == "shutdown":
-                    print("[STT] 종료 신호 수신")
-                    break
+                msg_type = msg.get("type")
+                if msg_type == "shutdown":
+                    shutdown = True
+                elif msg_type == "swap_model" and swap is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    size = msg["model_size"]
+                    compute_type = msg.get("compute_type") or opts["compute_type"]
+                    print(f"[STT] 명령 모델 교체 시작: '{opts['model_size']}' → '{size}' (기존 모델로 계속 인식)")
+                    swap_pool = swap_pool or ThreadPoolExecutor(max_workers=1)
+                    swap = (swap_pool.submit(_load_model, size, compute_type), size, compute_type,
+                            time.perf_counter())
+                elif msg_type == "playback" and gate is not None:
+                    if msg["state"] == "start":
+                        gate.start(msg["id"], msg["t"], msg.get("reference"))
+                    else:
+                        gate.end(msg["id"], msg["t"])
+            if shutdown:
+                print("[STT] 종료 신호 수신")
+                break
+
+            # 새 모델이 다 로드되었으면 교체 (기존 모델은 참조가 사라지면 해제됨)
+            if swap is not None and swap[0].done():
+                future, size, compute_type, swap_start = swap
+                swap = None
+                try:
+                    new_model = future.result()
+                except Exception as e:
+                    print(f"[STT] 모델 교체 실패: {e}")
+                    pipe_conn.send({"type": "status", "status": "model_swap_failed",
+                                    "model_size": size, "error": str(e)})
+                else:
+                    if not two_tier:
+                        wake_model = new_model
+                    command_model = new_model
+                    opts["model_size"], opts["compute_type"] = size, compute_type
+                    command_stats.name = f"명령({size})"
+                    load_sec = time.perf_counter() - swap_start
+                    print(f"[STT] 명령 모델 교체 완료: '{size}' ({load_sec:.1f}s)")
+                    pipe_conn.send({"type": "status", "status": "model_swapped",
+                                    "model_size": size, "load_sec": load_sec})
+
+            # 마이크 캡처가 죽었으면 대기 시간을 2배씩 늘리며 다시 연다 (그동안 메시지 처리는 계속)
+            if capture.error is not None:
+                now = time.monotonic()
+                if mic_retry_at is None:
+                    mic_retry_at = now + mic_backoff
+                    print(f"[STT] 마이크 캡처 중단 — {mic_backoff:.1f}초 후 다시 엽니다.")
+                if now < mic_retry_at:
+                    time.sleep(0.05)
+                    continue
+                mic_backoff = min(mic_backoff * 2, MIC_REOPEN_BACKOFF[1])
+                mic_retry_at = None
+                mic_opened_total = ring.total
+                capture = source_factory(ring)
+                capture.start()
+                continue
+            if mic_backoff > MIC_REOPEN_BACKOFF[0] and ring.total - mic_opened_total >= ring.rate:
+                # 다시 연 뒤 1초 이상 녹음되면 정상으로 보고 대기 시간 초기화
+                mic_backoff = MIC_REOPEN_BACKOFF[0]
 
             try:
-                with mic as source:
-                    if state == "WAKE_WORD_LISTENING":
-                        try:
-                            # 호출어 감지: 짧게 듣고 바로 처리 (빠른 응답)
-                            audio_data = recognizer.listen(
-                                source, timeout=3, phrase_time_limit=3
-                            )
-                        except sr.WaitTimeoutError:
-                            continue
-
-                        text = _transcribe(model, audio_data)
-                        if not text:
-                            continue
-
-                        print(f"[STT] 인식됨: '{text}'")
+                segment = segmenter.poll()
+                if segment is None:
+                    # 명령 발화 중이면 지금까지의 음성으로 부분 결과를 보냄
+                    if (state == "COMMAND_LISTENING" and partials is not None
+                            and (gate is None or not gate.active())):
+                        pending = segmenter.pending()
+                        if pending is not None:
+                            partial = partials.update(command_model, pending, partial_stats, **decode_options)
+                            if partial is not None:
+                                print(f"[STT] 부분 인식: '{partial['text']}' (안정: '{partial['stable_text']}')")
+                                pipe_conn.send({**partial, "corr_id": corr_id,
+                                                "utterance_start": ring.time_of(pending[0])})
+                                continue
+                    # 파일 입력이 끝났고 남은 발화가 없으면 종료
+                    if getattr(capture, "finished", False) and not segmenter.in_speech:
+                        print("[STT] 입력 종료")
+                        break
+                    if (state == "COMMAND_LISTENING" and not segmenter.in_speech
+                            and time.monotonic() > command_deadline):
+                        print("[STT] 명령 대기 시간 초과")
+                        pipe_conn.send({"type": "status", "status": "timeout", "corr_id": corr_id})
+                        state = enter_wake_mode()
+                    time.sleep(0.02)
+                    continue
+
+                times = _segment_times(segment)
+                audio = segment.audio
+                if gate is not None:
+                    audio = _suppress_playback(segment, gate, canceller, segmenter)
+                    if audio is None:
+                        playback_dropped += 1
+                        print(f"[STT] 재생음 구간 무시 ({segment.duration:.1f}s)")
+                        continue
 
+                # 호출어 대기 중: 경량 검출기에서 걸러진 발화는 Whisper를 실행하지 않음
+                if state == "WAKE_WORD_LISTENING" and spotter is not None:
+                    start = time.perf_counter()
+                    hit, distance = spotter.detect(audio)
+                    kws_ms += (time.perf_counter() - start) * 1000
+                    kws_checked += 1
+                    if not hit:
+                        continue
+                    kws_passed += 1
+                    print(f"[KWS] 호출어 후보 (거리 {distance:.2f}) → Whisper 확인")
+
+                if state == "WAKE_WORD_LISTENING":
+                    text, decoded = _decode(wake_model, audio, wake_stats, **wake_options)
+                    if not text:
+                        continue
+
+                    print(f"[STT] 인식됨: '{text}'")
+
+                    # 종료 명령 체크
+                    if PHRASES.find(text, "terminate") is not None:
+                        pipe_conn.send({"type": "terminate"})
+                        break
+
+                    # 호출어 체크
+                    wake = PHRASES.find_all(text, "wake")
+                    if wake:
+                        corr_id = _new_corr_id()
+                        print(f"[STT] 호출어 감지: {wake[0]} (원문: {text}, #{corr_id})")
+                        pipe_conn.send({"type": "status", "status": "wake_detected", "corr_id": corr_id,
+                                        **times, **decoded})
+
+                        # 호출어와 함께 명령이 포함되어 있는지 확인 (호출어 구간을 잘라낸 나머지)
+                        remaining = PHRASES.remove(text, "wake")
+
+                        if len(remaining) > 3:
+                            # 한 문장에 호출어+명령 포함 → 명령 부분은 명령용 모델로 다시 변환
+                            if two_tier:
+                                full_text, decoded = _decode(command_model, audio, command_stats,
+                                                             **decode_options)
+                                remaining = PHRASES.remove(full_text, "wake")
+                            print(f"[STT] 즉시 명령 인식: {remaining}")
+                            pipe_conn.send({"type": "command", "text": remaining, "corr_id": corr_id,
+                                            **times, **decoded, "partial_seq": None})
+                        else:
+                            # 명령 대기 모드로 전환 (변환 중에 이미 시작된 발화도 버퍼에 남아 있음)
+                            state = "COMMAND_LISTENING"
+                            segmenter.max_speech_sec = COMMAND_PHRASE_LIMIT
+                            command_deadline = time.monotonic() + COMMAND_TIMEOUT
+                            pipe_conn.send({"type": "status", "status": "listening_command",
+                                            "corr_id": corr_id})
+
+                elif state == "COMMAND_LISTENING":
+                    text, decoded = _decode(command_model, audio, command_stats, **decode_options)
+                    if text:
                         # 종료 명령 체크
-                        term_detected, _ = _is_detected(text, TERMINATE_WORDS)
-                        if term_detected:
+                        if PHRASES.find(text, "terminate") is not None:
                             pipe_conn.send({"type": "terminate"})
                             break
 
-                        # 호출어 체크
-                        wake_detected, word = _is_detected(text, WAKE_WORDS)
-                        if wake_detected:
-                            print(f"[STT] 호출어 감지: '{word}' (원문: {text})")
-                            pipe_conn.send({"type": "status", "status": "wake_detected"})
-
-                            # 호출어와 함께 명령이 포함되어 있는지 확인
-                            remaining = text
-                            for w in WAKE_WORDS:
-                                remaining = remaining.replace(w, "").strip()
-                            remaining = remaining.strip(" ,.")
-
-                            if len(remaining) > 3:
-                                # 한 문장에 호출어+명령 포함
-                                print(f"[STT] 즉시 명령 인식: {remaining}")
-                                pipe_conn.send({"type": "command", "text": remaining})
-                            else:
-                                # 명령 대기 모드로 전환
-                                state = "COMMAND_LISTENING"
-                                pipe_conn.send({"type": "status", "status": "listening_command"})
-
-                    elif state == "COMMAND_LISTENING":
-                        try:
-                            # 명령 대기: 더 길게 들으며 명령 수신
-                            audio_data = recognizer.listen(
-                                source, timeout=7, phrase_time_limit=10
-                            )
-                        except sr.WaitTimeoutError:
-                            print("[STT] 명령 대기 시간 초과")
-                            pipe_conn.send({"type": "status", "status": "timeout"})
-                            state = "WAKE_WORD_LISTENING"
-                            continue
-
-                        command_text = _transcribe(model, audio_data)
-                        if command_text:
-                            # 종료 명령 체크
-                            term_detected, _ = _is_detected(command_text, TERMINATE_WORDS)
-                            if term_detected:
-                                pipe_conn.send({"type": "terminate"})
-                                break
-
-                            print(f"[STT] 명령 수신: {command_text}")
-                            pipe_conn.send({"type": "command", "text": command_text})
-                        else:
-                            pipe_conn.send({"type": "status", "status": "not_recognized"})
+                        print(f"[STT] 명령 수신: {text}")
+                        partial_seq = partials.seq if partials is not None and partials.start == segment.start else None
+                        pipe_conn.send({"type": "command", "text": text, "corr_id": corr_id,
+                                        **times, **decoded, "partial_seq": partial_seq})
+                    else:
+                        pipe_conn.send({"type": "status", "status": "not_recognized", "corr_id": corr_id})
 
-                        # 항상 대기 모드로 복귀
-                        state = "WAKE_WORD_LISTENING"
+                    # 항상 대기 모드로 복귀
+                    state = enter_wake_mode()
 
             except Exception as e:
                 # 예외 발생 시 항상 대기 모드로 복귀 (멈추지 않게)
                 print(f"[STT] 루프 오류 (복구됨): {e}")
-                state = "WAKE_WORD_LISTENING"
+                state = enter_wake_mode()
                 time.sleep(0.5)
 
     except KeyboardInterrupt:
         print("[STT] 프로세스 종료")
     finally:
+        if kws_checked:
+            print(
+                f"[KWS] 통계: 검사 {kws_checked}회, Whisper 확인 {kws_passed}회, "
+                f"평균 {kws_ms / kws_checked:.1f}ms"
+            )
+        if playback_dropped:
+            print(f"[STT] 재생음으로 무시한 발화: {playback_dropped}회")
+        print(
+            f"[STT] 변환 지연: {wake_stats.summary()} / {command_stats.summary()} / {partial_stats.summary()}"
+        )
+        try:
+            pipe_conn.send({
+                "type": "stats",
+                "wake": wake_stats.as_dict(),
+                "command": command_stats.as_dict(),
+                "partial": partial_stats.as_dict(),
+                "kws": {"checked": kws_checked, "passed": kws_passed, "total_ms": kws_ms},
+                "playback_dropped": playback_dropped,
+            })
+        except (OSError, EOFError, BrokenPipeError):
+            pass
+        heartbeat_stop.set()
+        if swap_pool is not None:
+            swap_pool.shutdown(wait=False)
+        capture.stop()
         pipe_conn.close()
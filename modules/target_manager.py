@@ -1,17 +1,43 @@
 """
 target_manager.py — 등록된 타겟 객체 관리
 """
-from config import TARGET_COLORS
+import re
+import time
+
+from config import TARGET_COLORS, TARGET_DEDUP_IOU, TARGET_DEDUP_POLICY, TARGET_HISTORY_SIZE
+from modules.spatial_index import GridIndex
+from modules.label_index import LabelIndex, parse_ordinal
+from modules.track_history import TrackHistory
+from modules import appearance
 
 
 class Target:
     """단일 타겟 객체"""
 
+    __slots__ = ("id", "label", "color", "thumbnail", "descriptor", "history", "_bbox")
+
     def __init__(self, target_id, label, bbox, color):
         self.id = target_id
         self.label = label
-        self.bbox = bbox  # [x1, y1, x2, y2] 픽셀 좌표
         self.color = color
+        self.thumbnail = None   # JPEG bytes (등록 시점 외형)
+        self.descriptor = None  # 외형 기술자 (appearance.compute_descriptor)
+        self.history = TrackHistory(TARGET_HISTORY_SIZE)  # bbox 시계열 기록
+        self.bbox = bbox  # [x1, y1, x2, y2] 픽셀 좌표
+
+    @property
+    def bbox(self):
+        return self._bbox
+
+    @bbox.setter
+    def bbox(self, bbox):
+        """bbox를 바꾸면 시계열 기록에도 남깁니다 (신뢰도 1.0)."""
+        self.set_bbox(bbox)
+
+    def set_bbox(self, bbox, conf=1.0, t=None):
+        """신뢰도/시각을 지정해 bbox를 갱신하고 기록합니다."""
+        self._bbox = bbox
+        self.history.append(bbox, conf, t)
 
     @property
     def display_name(self):
@@ -30,27 +56,243 @@ class Target:
 class TargetManager:
     """타겟 목록을 관리합니다."""
 
-    def __init__(self):
+    def __init__(self, store=None, scene="default"):
+        """
+        Args:
+            store: TargetStore (영구 저장, 선택)
+            scene: 현재 씬 이름 (저장소의 구분 키)
+        """
         self.targets = []
         self._next_id = 1
+        self._by_id = {}
+        self._index = GridIndex()
+        self._labels = LabelIndex()
+        self.store = store
+        self.scene = scene
+        self.stale = []  # 재검증에 실패해 숨겨진 타겟 (위치 재확인 필요)
+
+    def _register(self, target):
+        """타겟을 목록과 검색 인덱스에 추가합니다 (목록은 id 순 유지)."""
+        self.targets.append(target)
+        if len(self.targets) > 1 and self.targets[-2].id > target.id:
+            self.targets.sort(key=lambda t: t.id)
+        self._by_id[target.id] = target
+        self._index.insert(target.id, target.bbox)
+        self._labels.add(target.id, target.label)
 
-    def add_target(self, label, bbox):
+    def _unregister(self, target_id):
+        """타겟을 목록과 검색 인덱스에서 뺍니다 (저장소는 그대로)."""
+        target = self._by_id.pop(target_id, None)
+        self.targets = [t for t in self.targets if t.id != target_id]
+        self._index.remove(target_id)
+        self._labels.remove(target_id)
+        return target
+
+    def hide(self, targets):
+        """타겟들을 활성 목록에서 숨기고 stale로 보냅니다 (위치 재확인 대기)."""
+        for target in list(targets):
+            if self._unregister(target.id) is not None:
+                self.stale.append(target)
+
+    def hide_all(self):
+        self.hide(self.targets)
+
+    def revalidate(self, frame, targets, min_similarity=0.5):
+        """
+        타겟의 현재 bbox 영역이 저장된 외형과 아직 비슷한지 확인합니다.
+
+        Returns:
+            외형이 달라진 타겟 목록 (외형 기술자가 없는 타겟은 제외)
+        """
+        failed = []
+        for target in targets:
+            if target.descriptor is None:
+                continue
+            if appearance.similarity(frame, target.bbox, target.descriptor) < min_similarity:
+                failed.append(target)
+        return failed
+
+    def _clear(self):
+        self.targets = []
+        self._by_id = {}
+        self._index = GridIndex()
+        self._labels = LabelIndex()
+        self.stale = []
+
+    def _persist(self, target):
+        if self.store is None:
+            return
+        record = target.to_dict()
+        record["thumbnail"] = target.thumbnail
+        record["descriptor"] = appearance.pack_descriptor(target.descriptor)
+        self.store.save(self.scene, record, self._next_id)
+
+    def load_scene(self, scene, frame=None, min_similarity=0.5):
+        """
+        저장소에서 씬의 타겟을 불러옵니다.
+        frame이 주어지면 각 타겟의 bbox 영역 외형을 저장된 기술자와 비교해
+        min_similarity 미만인 타겟은 활성 목록 대신 self.stale로 보냅니다.
+
+        Returns:
+            (복원된 타겟 수, 재검증 실패 수)
+        """
+        self._clear()
+        self.scene = scene
+        if self.store is None:
+            return 0, 0
+
+        records, self._next_id = self.store.load(scene)
+        for rec in records:
+            target = Target(rec["id"], rec["label"], rec["bbox"], rec["color"])
+            target.thumbnail = rec["thumbnail"]
+            target.descriptor = appearance.unpack_descriptor(rec["descriptor"])
+            if frame is not None:
+                score = appearance.similarity(frame, target.bbox, target.descriptor)
+                if score < min_similarity:
+                    print(f"[Target] 재검증 실패: {target.display_name} (유사도 {score:.2f})")
+                    self.stale.append(target)
+                    continue
+            self._register(target)
+
+        print(f"[Target] 씬 '{scene}' 복원: {len(self.targets)}개 (재검증 실패 {len(self.stale)}개)")
+        return len(self.targets), len(self.stale)
+
+    def find_duplicate(self, bbox, iou_threshold=TARGET_DEDUP_IOU):
+        """
+        bbox와 충분히 겹치는(IoU ≥ iou_threshold) 기존 타겟을 찾습니다.
+
+        Returns:
+            Target 또는 None
+        """
+        target_id, iou = self._index.best_match(bbox)
+        if target_id is None or iou < iou_threshold:
+            return None
+        return self._by_id[target_id]
+
+    def targets_at(self, x, y):
+        """점 (x, y)를 포함하는 타겟 목록."""
+        return [self._by_id[i] for i in self._index.query_point(x, y)]
+
+    def update_bbox(self, target_id, bbox):
+        """타겟의 bbox를 갱신합니다."""
+        target = self._by_id.get(target_id)
+        if target is None:
+            return
+        target.bbox = bbox
+        self._index.update(target_id, bbox)
+        if self.store is not None:
+            self.store.update_bbox(self.scene, target_id, bbox)
+
+    def relocate(self, frame, candidates=None, gray=None):
+        """
+        카메라/물체 이동 후 타겟들을 외형으로 한 번에 다시 찾습니다.
+
+        Args:
+            candidates: 대상 타겟 목록 (None이면 활성 타겟 + 재검증 실패 타겟 전체)
+            gray: 미리 변환된 그레이스케일 프레임 (선택)
+
+        Returns:
+            (다시 찾은 타겟 목록, 찾지 못한 타겟 목록)
+        """
+        if candidates is None:
+            candidates = self.targets + self.stale
+        start = time.perf_counter()
+        found = self.reidentify(frame, candidates, gray)
+        return self.apply_relocation(candidates, found, (time.perf_counter() - start) * 1000)
+
+    def reidentify(self, frame, candidates, gray=None):
+        """
+        후보 타겟들의 새 위치를 외형으로 찾기만 합니다 (타겟 상태는 바꾸지 않으므로 작업 스레드에서 호출 가능).
+
+        Returns:
+            {타겟 id: bbox} — 찾은 타겟만
+        """
+        items = [(t.id, t.descriptor) for t in candidates if t.descriptor is not None]
+        found = appearance.reidentify(frame, items, gray=gray)
+        return {target_id: match[0] for target_id, match in found.items()}
+
+    def apply_relocation(self, candidates, found, elapsed_ms=0.0):
+        """
+        reidentify 결과를 반영합니다 (그 사이 삭제된 타겟은 place_target이 무시).
+
+        Returns:
+            (다시 찾은 타겟 목록, 찾지 못한 타겟 목록)
+        """
+        relocated, missing = [], []
+        for target in candidates:
+            bbox = found.get(target.id)
+            if bbox is None:
+                missing.append(target)
+                continue
+            if self.place_target(target, bbox):
+                relocated.append(target)
+        print(
+            f"[Target] 외형 재탐색: {len(relocated)}/{len(candidates)}개 ({elapsed_ms:.1f}ms), "
+            f"미발견: {[t.display_name for t in missing]}"
+        )
+        return relocated, missing
+
+    def place_target(self, target, bbox, frame=None):
+        """
+        타겟을 새 위치로 옮깁니다. 재검증 실패(stale) 타겟이면 다시 활성화합니다.
+        frame이 주어지면 썸네일/외형 기술자도 새 위치 기준으로 갱신합니다.
+
+        비동기 재탐색 결과가 늦게 도착해 그 사이 삭제되었거나 씬이 바뀐 타겟이면
+        (인덱스·저장소에 다시 넣지 않도록) 무시합니다.
+
+        Returns:
+            bool: 옮겼으면 True, 등록되지 않은 타겟이라 무시했으면 False
+        """
+        if target in self.stale:
+            self.stale.remove(target)
+            target.bbox = bbox
+            self._register(target)
+        elif self._by_id.get(target.id) is target:
+            self._index.update(target.id, bbox)
+            target.bbox = bbox
+        else:
+            print(f"[Target] 등록되지 않은 타겟 위치 갱신 무시: {target.display_name}")
+            return False
+
+        if frame is not None:
+            target.thumbnail = appearance.make_thumbnail(frame, bbox)
+            target.descriptor = appearance.compute_descriptor(frame, bbox)
+            self._persist(target)
+        elif self.store is not None:
+            self.store.update_bbox(self.scene, target.id, bbox)
+        return True
+
+    def add_target(self, label, bbox, frame=None):
         """
         새 타겟을 등록합니다.
+        기존 타겟과 중복(IoU ≥ TARGET_DEDUP_IOU)이면 새로 등록하지 않고
+        기존 타겟을 반환합니다 ("merge" 정책이면 bbox를 새 값으로 갱신).
 
         Args:
             label: 물체 이름 (예: "종이컵")
             bbox: [x1, y1, x2, y2] 픽셀 좌표
+            frame: 감지에 사용한 프레임 (썸네일/외형 기술자 저장용, 선택)
 
         Returns:
             Target 객체
         """
+        duplicate = self.find_duplicate(bbox)
+        if duplicate is not None:
+            if TARGET_DEDUP_POLICY == "merge":
+                self.update_bbox(duplicate.id, bbox)
+            print(f"[Target] 중복 감지: {duplicate.display_name} ({TARGET_DEDUP_POLICY})")
+            return duplicate
+
         color_idx = (self._next_id - 1) % len(TARGET_COLORS)
         color = TARGET_COLORS[color_idx]
 
         target = Target(self._next_id, label, bbox, color)
-        self.targets.append(target)
+        if frame is not None:
+            target.thumbnail = appearance.make_thumbnail(frame, bbox)
+            target.descriptor = appearance.compute_descriptor(frame, bbox)
+        self._register(target)
         self._next_id += 1
+        self._persist(target)
 
         print(f"[Target] 등록: {target.display_name} @ {bbox} (색상: {color})")
         return target
@@ -58,7 +300,8 @@ class TargetManager:
     def get_target(self, query):
         """
         쿼리로 타겟을 검색합니다.
-        "타겟 1", "종이컵 1", "종이컵", 숫자 등을 지원합니다.
+        "타겟 1", "종이컵 1", "두 번째 종이컵", "종이컵", 숫자 등을 지원하며,
+        라벨은 자모 단위 퍼지 매칭으로 STT 오인식("종위컵", "종이 컵")을 허용합니다.
 
         Args:
             query: 검색어 (str)
@@ -77,38 +320,44 @@ class TargetManager:
             return self._find_by_id(target_id)
 
         # 2) "타겟 N" 패턴
-        import re
         match = re.search(r"타겟\s*(\d+)", query_clean)
         if match:
             target_id = int(match.group(1))
             return self._find_by_id(target_id)
 
-        # 3) "라벨 N" 패턴 (예: "종이컵 1")
-        match = re.search(r"(.+?)\s*(\d+)\s*$", query_clean)
-        if match:
-            label_part = match.group(1).strip()
-            number = int(match.group(2))
-            # 해당 라벨의 N번째 타겟 찾기
-            count = 0
-            for t in self.targets:
-                if label_part in t.label:
-                    count += 1
-                    if count == number:
-                        return t
-
-        # 4) 라벨 부분 매칭 (첫 번째 일치)
-        for t in self.targets:
-            if query_clean in t.label or t.label in query_clean:
-                return t
+        # 3) 번호/서수 패턴 (예: "종이컵 1", "두 번째 종이컵", "세번째 타겟")
+        label_part, number = parse_ordinal(query_clean)
+        if number is not None:
+            if number < 1:
+                # "0번째 타겟" — [number - 1]이 마지막 타겟을 가리키지 않도록
+                return None
+            if label_part in ("", "타겟", "물체"):
+                return self.targets[number - 1] if number <= len(self.targets) else None
+            matches = self._match_label(label_part)
+            if len(matches) >= number:
+                return matches[number - 1]
+
+        # 4) 라벨 퍼지 매칭 (가장 높은 점수)
+        results = self._labels.search(query_clean)
+        if results:
+            return self._by_id[results[0][0]]
 
         return None
 
+    def _match_label(self, label_query):
+        """가장 잘 맞는 라벨과 같은 라벨을 가진 타겟들 (등록 순)."""
+        results = self._labels.search(label_query)
+        if not results:
+            return []
+        best_label = self._by_id[results[0][0]].label.replace(" ", "")
+        return sorted(
+            (self._by_id[i] for i, _ in results if self._by_id[i].label.replace(" ", "") == best_label),
+            key=lambda t: t.id,
+        )
+
     def _find_by_id(self, target_id):
         """ID로 타겟을 찾습니다."""
-        for t in self.targets:
-            if t.id == target_id:
-                return t
-        return None
+        return self._by_id.get(target_id)
 
     def get_all(self):
         """모든 타겟 목록을 반환합니다."""
@@ -116,7 +365,10 @@ class TargetManager:
 
     def remove_target(self, target_id):
         """타겟을 삭제합니다."""
-        self.targets = [t for t in self.targets if t.id != target_id]
+        self._unregister(target_id)
+        self.stale = [t for t in self.stale if t.id != target_id]
+        if self.store is not None:
+            self.store.delete(self.scene, target_id)
 
     def count(self):
         return len(self.targets)
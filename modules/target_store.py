@@ -0,0 +1,113 @@
+"""
+target_store.py — 타겟 영구 저장소 (SQLite, WAL 모드)
+재시작/크래시 후에도 Gemini 재등록 없이 타겟을 복원할 수 있도록
+씬(OBS 씬 이름)별로 타겟, 썸네일, 외형 기술자를 저장합니다.
+
+UI 스레드에서만 사용합니다 (sqlite3 연결은 생성 스레드 전용).
+"""
+import json
+import time
+import sqlite3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS targets (
+    scene      TEXT    NOT NULL,
+    id         INTEGER NOT NULL,
+    label      TEXT    NOT NULL,
+    bbox       TEXT    NOT NULL,
+    color      TEXT    NOT NULL,
+    thumbnail  BLOB,
+    descriptor BLOB,
+    created    REAL    NOT NULL,
+    updated    REAL    NOT NULL,
+    PRIMARY KEY (scene, id)
+);
+CREATE TABLE IF NOT EXISTS scenes (
+    scene   TEXT PRIMARY KEY,
+    next_id INTEGER NOT NULL
+);
+"""
+
+
+class TargetStore:
+    """씬별 타겟 레코드를 저장/조회합니다."""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # WAL에서는 커밋 지연 없이 충분히 안전
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+        print(f"[Store] 타겟 저장소 열림: {path}")
+
+    def save(self, scene, target, next_id):
+        """타겟을 저장(upsert)하고 씬의 다음 id를 갱신합니다."""
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO targets (scene, id, label, bbox, color, thumbnail, descriptor, created, updated)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(scene, id) DO UPDATE SET
+                    label=excluded.label, bbox=excluded.bbox, color=excluded.color,
+                    thumbnail=COALESCE(excluded.thumbnail, targets.thumbnail),
+                    descriptor=COALESCE(excluded.descriptor, targets.descriptor),
+                    updated=excluded.updated
+                """,
+                (
+                    scene, target["id"], target["label"], json.dumps(target["bbox"]),
+                    target["color"], target.get("thumbnail"), target.get("descriptor"), now, now,
+                ),
+            )
+            self._set_next_id(scene, next_id)
+
+    def update_bbox(self, scene, target_id, bbox):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE targets SET bbox=?, updated=? WHERE scene=? AND id=?",
+                (json.dumps(bbox), time.time(), scene, target_id),
+            )
+
+    def delete(self, scene, target_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM targets WHERE scene=? AND id=?", (scene, target_id))
+
+    def _set_next_id(self, scene, next_id):
+        self.conn.execute(
+            """
+            INSERT INTO scenes (scene, next_id) VALUES (?, ?)
+            ON CONFLICT(scene) DO UPDATE SET next_id=MAX(scenes.next_id, excluded.next_id)
+            """,
+            (scene, next_id),
+        )
+
+    def load(self, scene):
+        """
+        씬의 타겟 레코드와 다음 id를 불러옵니다.
+
+        Returns:
+            (records, next_id) — records는 id 순 dict 목록
+        """
+        rows = self.conn.execute(
+            "SELECT id, label, bbox, color, thumbnail, descriptor FROM targets WHERE scene=? ORDER BY id",
+            (scene,),
+        ).fetchall()
+        records = [
+            {
+                "id": r[0], "label": r[1], "bbox": json.loads(r[2]), "color": r[3],
+                "thumbnail": r[4], "descriptor": r[5],
+            }
+            for r in rows
+        ]
+        row = self.conn.execute("SELECT next_id FROM scenes WHERE scene=?", (scene,)).fetchone()
+        next_id = row[0] if row else 1
+        if records:
+            next_id = max(next_id, records[-1]["id"] + 1)
+        return records, next_id
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
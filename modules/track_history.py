@@ -0,0 +1,106 @@
+"""
+track_history.py — 타겟별 bbox 시계열 기록 (고정 크기 링 버퍼)
+미리 할당한 numpy 구조화 배열에 (시각, bbox, 신뢰도)를 순환 기록하므로
+몇 시간씩 녹화해도 타겟당 메모리가 capacity × 28 bytes(TRACK_DTYPE.itemsize)로 고정됩니다.
+
+스무딩, 속도 추정, 머문 시간(dwell) 계산 등의 질의는 벡터화되어 있습니다.
+"""
+import time
+
+import numpy as np
+
+TRACK_DTYPE = np.dtype([
+    ("t", np.float64),          # time.monotonic() 기준 시각 (초)
+    ("bbox", np.float32, (4,)),  # [x1, y1, x2, y2] 픽셀 좌표
+    ("conf", np.float32),        # 신뢰도 (0.0 ~ 1.0)
+])
+
+
+class TrackHistory:
+    """bbox 기록 링 버퍼."""
+
+    __slots__ = ("_buf", "_head", "_count")
+
+    def __init__(self, capacity=512):
+        self._buf = np.zeros(capacity, TRACK_DTYPE)
+        self._head = 0   # 다음에 기록할 위치
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def capacity(self):
+        return len(self._buf)
+
+    def append(self, bbox, conf=1.0, t=None):
+        """bbox를 기록합니다 (가득 차면 가장 오래된 기록을 덮어씀)."""
+        row = self._buf[self._head]
+        row["t"] = time.monotonic() if t is None else t
+        row["bbox"] = bbox
+        row["conf"] = conf
+        self._head = (self._head + 1) % len(self._buf)
+        self._count = min(self._count + 1, len(self._buf))
+
+    def last(self, n=None):
+        """
+        최근 n개 기록을 오래된 순으로 반환합니다 (n=None이면 전체).
+
+        Returns:
+            TRACK_DTYPE 구조화 배열 (복사본)
+        """
+        n = self._count if n is None else min(n, self._count)
+        if n <= 0:
+            return np.zeros(0, TRACK_DTYPE)
+        idx = (self._head - n + np.arange(n)) % len(self._buf)
+        return self._buf[idx]
+
+    def since(self, seconds, now=None):
+        """최근 seconds초 동안의 기록 (오래된 순)."""
+        records = self.last()
+        now = time.monotonic() if now is None else now
+        return records[records["t"] >= now - seconds]
+
+    def smoothed_bbox(self, n=5):
+        """최근 n개 bbox의 신뢰도 가중 평균 (기록이 없으면 None)."""
+        records = self.last(n)
+        if len(records) == 0:
+            return None
+        weights = np.maximum(records["conf"], 1e-6)
+        return (records["bbox"] * weights[:, None]).sum(axis=0) / weights.sum()
+
+    def velocity(self, seconds=1.0, now=None):
+        """
+        최근 seconds초 동안 bbox 중심의 이동 속도 (px/s).
+        최소제곱 직선 기울기로 계산하므로 한두 프레임의 떨림에 덜 민감합니다.
+
+        Returns:
+            (vx, vy) — 기록이 2개 미만이거나 시간 간격이 없으면 (0.0, 0.0)
+        """
+        records = self.since(seconds, now)
+        if len(records) < 2:
+            return 0.0, 0.0
+        t = records["t"] - records["t"].mean()
+        denom = float((t * t).sum())
+        if denom <= 0:
+            return 0.0, 0.0
+        boxes = records["bbox"]
+        centers = np.stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2], axis=1)
+        slope = (t[:, None] * (centers - centers.mean(axis=0))).sum(axis=0) / denom
+        return float(slope[0]), float(slope[1])
+
+    def dwell_time(self, radius=20.0):
+        """
+        bbox 중심이 최신 위치에서 radius 픽셀 이내에 머문 시간 (초).
+        최신 기록부터 거슬러 올라가 처음으로 반경을 벗어난 시점까지입니다.
+        """
+        records = self.last()
+        if len(records) == 0:
+            return 0.0
+        boxes = records["bbox"]
+        cx = (boxes[:, 0] + boxes[:, 2]) / 2
+        cy = (boxes[:, 1] + boxes[:, 3]) / 2
+        outside = np.hypot(cx - cx[-1], cy - cy[-1]) > radius
+        left = np.flatnonzero(outside)
+        start = records["t"][left[-1] + 1] if len(left) else records["t"][0]
+        return float(records["t"][-1] - start)
@@ -8,8 +8,9 @@ import asyncio
 import threading
 import edge_tts
 import pygame
+import numpy as np
 
-from config import TTS_VOICE, TTS_RATE
+from config import TTS_VOICE, TTS_RATE, STT_SAMPLE_RATE
 
 # pygame 지원 메시지 숨기기
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
@@ -22,8 +23,18 @@ os.makedirs(AUDIO_DIR, exist_ok=True)
 class TTSEngine:
     """Edge TTS를 사용한 고품질 한국어 음성 합성 엔진"""
 
-    def __init__(self):
+    def __init__(self, on_playback=None, with_reference=False):
+        """
+        Args:
+            on_playback: 재생 시작/종료 알림 콜백 on_playback(state, playback_id, reference)
+                         state는 "start" | "end", 재생 스레드에서 호출됩니다 (STT가 자체 재생음을 거르는 데 사용).
+            with_reference: True면 "start" 알림에 재생 신호(16kHz mono float32)를 함께 넘김
+        """
         self._mixer_initialized = False
+        self.on_playback = on_playback
+        self.with_reference = with_reference
+        self._next_id = 0
+        self._id_lock = threading.Lock()
         self._init_mixer()
 
     def _init_mixer(self):
@@ -35,16 +46,55 @@ class TTSEngine:
             except Exception as e:
                 print(f"[TTS] pygame mixer 초기화 실패: {e}")
 
+    def _reference(self, file_path):
+        """재생할 파일을 STT 샘플레이트의 mono float32로 디코딩합니다 (실패 시 None)."""
+        try:
+            freq, size, _ = pygame.mixer.get_init()
+            samples = pygame.sndarray.array(pygame.mixer.Sound(file_path)).astype(np.float32)
+            samples /= float(2 ** (abs(size) - 1))
+            if samples.ndim > 1:
+                samples = samples.mean(axis=1)
+            if freq != STT_SAMPLE_RATE:
+                n = int(len(samples) * STT_SAMPLE_RATE / freq)
+                samples = np.interp(np.arange(n) * (freq / STT_SAMPLE_RATE),
+                                    np.arange(len(samples)), samples)
+            return samples.astype(np.float32)
+        except Exception as e:
+            print(f"[TTS] 참조 신호 디코딩 실패: {e}")
+            return None
+
+    def _play(self, file_path, on_start=None):
+        """
+        파일을 재생하고 끝날 때까지 기다립니다. 재생 전후로 on_playback을 호출합니다.
+
+        Args:
+            on_start: 재생을 시작한 직후 on_start(time.monotonic())로 호출 (지연 기록용)
+        """
+        pygame.mixer.music.load(file_path)
+        playback_id = None
+        if self.on_playback is not None:
+            with self._id_lock:
+                self._next_id += 1
+                playback_id = self._next_id
+            reference = self._reference(file_path) if self.with_reference else None
+            self.on_playback("start", playback_id, reference)
+        try:
+            pygame.mixer.music.play()
+            if on_start is not None:
+                on_start(time.monotonic())
+            while pygame.mixer.music.get_busy():
+                time.sleep(0.05)
+        finally:
+            if playback_id is not None:
+                self.on_playback("end", playback_id, None)
+
     def play_sound(self, file_path):
         """효과음 파일을 동기적으로 재생합니다."""
         if not os.path.exists(file_path):
             print(f"[TTS] 오디오 파일 없음: {file_path}")
             return
         try:
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.05)
+            self._play(file_path)
         except Exception as e:
             print(f"[TTS] 효과음 재생 실패: {e}")
 
@@ -66,20 +116,17 @@ class TTSEngine:
 
         return temp_file
 
-    def speak(self, text):
-        """텍스트를 음성으로 합성하고 재생합니다 (동기)."""
+    def speak(self, text, on_start=None):
+        """텍스트를 음성으로 합성하고 재생합니다 (동기, on_start는 _play() 참고)."""
         try:
             temp_file = asyncio.run(self._generate_speech(text))
             if os.path.exists(temp_file):
-                pygame.mixer.music.load(temp_file)
-                pygame.mixer.music.play()
-                while pygame.mixer.music.get_busy():
-                    time.sleep(0.05)
+                self._play(temp_file, on_start)
                 pygame.mixer.music.unload()
         except Exception as e:
             print(f"[TTS] 음성 합성 실패: {e}")
 
-    def speak_async(self, text):
+    def speak_async(self, text, on_start=None):
         """텍스트를 별도 스레드에서 음성 합성 + 재생합니다."""
-        t = threading.Thread(target=self.speak, args=(text,), daemon=True)
+        t = threading.Thread(target=self.speak, args=(text, on_start), daemon=True)
         t.start()
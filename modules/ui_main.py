@@ -8,12 +8,14 @@ ui_main.py — 프리미엄 PyQt5 UI 메인 윈도우
 import os
 import sys
 import time
+import functools
+import threading
 import cv2
 import numpy as np
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
-    QHBoxLayout, QLabel, QGraphicsDropShadowEffect, QSizePolicy,
+    QHBoxLayout, QLabel, QGraphicsDropShadowEffect, QSizePolicy, QShortcut,
 )
 from PyQt5.QtCore import (
     Qt, QThread, pyqtSignal, QTimer, QPropertyAnimation,
@@ -21,18 +23,34 @@ from PyQt5.QtCore import (
 )
 from PyQt5.QtGui import (
     QImage, QPixmap, QPainter, QPen, QColor, QFont,
-    QLinearGradient, QBrush, QPainterPath, QFontDatabase,
+    QLinearGradient, QBrush, QPainterPath, QFontDatabase, QKeySequence,
 )
 
 from config import (
-    THEME, SOUND_WAKE, SOUND_START, OBS_MIRROR_FPS,
+    THEME, SOUND_WAKE, SOUND_START, OBS_MIRROR_FPS, VISION_PREFETCH_ENABLED,
+    FRAME_HISTORY_SIZE, SPEECH_FRAME_POSITION, SHARPNESS_CANDIDATES,
+    POINTER_ENABLED, POINTER_ROI_CONFIDENCE, POINTER_RESOLVE_CONFIDENCE, POINTER_RESOLVE_DISTANCE,
+    TARGET_STORE_ENABLED, TARGET_STORE_PATH, TARGET_REVALIDATE_THRESHOLD,
+    SCENE_CHANGE_ENABLED, SCENE_BLOCK_DELTA, SCENE_CUT_FRACTION, SCENE_PARTIAL_FRACTION,
+    SCENE_SETTLE_FRAMES, PIPELINE_CAPTURE_EXECUTOR, PIPELINE_ANALYZE_BUDGET_MS,
+    PARTIAL_DISPATCH_ENABLED, STT_PLAYBACK_MODE, STT_MODEL_SIZE, STT_MODEL_CHOICES,
+    LATENCY_TRACE_SIZE, INTENT_EARLY_MIN_CONFIDENCE,
 )
 from modules.obs_capture import OBSCapture
 from modules.vision_ai import VisionAI
 from modules.target_manager import TargetManager
+from modules.target_store import TargetStore
 from modules.digital_ptz import DigitalPTZ
 from modules.voice_controller import VoiceController
 from modules.tts_engine import TTSEngine
+from modules.vision_prefetch import SpeculativePrefetch
+from modules.frame_history import FrameHistory
+from modules.frame_quality import select_sharpest, frame_sharpness
+from modules.frame_pipeline import FramePipeline, Stage
+from modules.scene_change import SceneChangeDetector
+from modules.hand_pointer import estimate_pointing, ray_roi, first_hit, WORK_WIDTH
+from modules.vision_cache import HASH_WIDTH
+from modules.latency_trace import LatencyTrace
 
 
 # ===================================================================
@@ -69,14 +87,21 @@ class GeminiWorkerThread(QThread):
     """Gemini Vision API를 별도 스레드에서 호출합니다."""
     result_ready = pyqtSignal(object)  # dict 또는 None
 
-    def __init__(self, vision_ai, frame, existing_bboxes=None, parent=None):
+    def __init__(self, vision_ai, frame, existing_bboxes=None, roi=None, preview=None, parent=None):
         super().__init__(parent)
         self.vision_ai = vision_ai
         self.frame = frame
         self.existing_bboxes = existing_bboxes
+        self.roi = roi
+        self.preview = preview
 
     def run(self):
-        result = self.vision_ai.detect_pointed_object(self.frame, self.existing_bboxes)
+        result = self.vision_ai.detect_pointed_object(
+            self.frame, self.existing_bboxes, self.roi, self.preview
+        )
+        if result is not None:
+            # 감지에 사용한 프레임을 함께 전달 (타겟 썸네일/외형 기술자 계산용, 캐시에는 넣지 않음)
+            result = dict(result, frame=self.frame)
         self.result_ready.emit(result)
 
 
@@ -324,6 +349,54 @@ class StatusBarWidget(QWidget):
         painter.end()
 
 
+class RelocateWorkerThread(QThread):
+    """로컬 재탐색에 실패한 타겟들의 위치를 Gemini로 차례대로 찾습니다."""
+    result_ready = pyqtSignal(object)  # [(Target, dict 또는 None), ...]
+
+    def __init__(self, vision_ai, frame, targets, known_bboxes, parent=None):
+        super().__init__(parent)
+        self.vision_ai = vision_ai
+        self.frame = frame
+        self.targets = targets
+        self.known_bboxes = known_bboxes
+
+    def run(self):
+        results = []
+        known = list(self.known_bboxes)
+        for target in self.targets:
+            result = self.vision_ai.locate_object(self.frame, target.label, known)
+            if result is not None:
+                known.append(result["bbox"])
+            results.append((target, result))
+        self.result_ready.emit(results)
+
+
+class RevalidateWorkerThread(QThread):
+    """
+    장면 안정화 후 외형 재검증과 ORB 재탐색을 GUI 스레드 밖에서 계산합니다.
+    타겟 상태는 바꾸지 않고 결과만 보내며, 반영은 GUI 스레드에서 합니다.
+    """
+    result_ready = pyqtSignal(object, object, object, float)  # (외형 변화, 재탐색 후보, {id: bbox}, ms)
+
+    def __init__(self, target_manager, timed_frame, suspects, stale, min_similarity, parent=None):
+        super().__init__(parent)
+        self.target_manager = target_manager
+        self.timed_frame = timed_frame
+        self.suspects = suspects
+        self.stale = stale
+        self.min_similarity = min_similarity
+
+    def run(self):
+        start = time.perf_counter()
+        frame = self.timed_frame.image
+        failed = self.target_manager.revalidate(frame, self.suspects, self.min_similarity)
+        candidates = failed + self.stale
+        found = {}
+        if candidates:
+            found = self.target_manager.reidentify(frame, candidates, self.timed_frame.gray())
+        self.result_ready.emit(failed, candidates, found, (time.perf_counter() - start) * 1000)
+
+
 # ===================================================================
 # CameraDirectorWindow — 메인 윈도우
 # ===================================================================
@@ -337,13 +410,54 @@ class CameraDirectorWindow(QMainWindow):
         # ── 모듈 초기화 ──
         self.obs = OBSCapture()
         self.vision = VisionAI()
-        self.targets = TargetManager()
+        self.store = None
+        if TARGET_STORE_ENABLED:
+            try:
+                self.store = TargetStore(TARGET_STORE_PATH)
+            except Exception as e:
+                print(f"[Store] 타겟 저장소 열기 실패 (저장 없이 진행): {e}")
+        self.targets = TargetManager(store=self.store)
+        self._targets_restored = False
+
+        # 씬 전환/카메라 이동/책상 정리 감지
+        self.scene_detector = None
+        if SCENE_CHANGE_ENABLED:
+            self.scene_detector = SceneChangeDetector(
+                block_delta=SCENE_BLOCK_DELTA,
+                cut_fraction=SCENE_CUT_FRACTION,
+                partial_fraction=SCENE_PARTIAL_FRACTION,
+                settle_frames=SCENE_SETTLE_FRAMES,
+            )
         self.ptz = DigitalPTZ()
         self.voice_ctrl = VoiceController()
-        self.tts = TTSEngine()
+        # Pipe 송신은 GUI 스레드와 TTS 재생 스레드에서 함께 일어나므로 잠금으로 직렬화
+        self._pipe_lock = threading.Lock()
+        self.tts = TTSEngine(
+            on_playback=self._on_playback if STT_PLAYBACK_MODE != "off" else None,
+            with_reference=STT_PLAYBACK_MODE == "nlms",
+        )
 
         self._gemini_thread = None
-        self._current_capture_frame = None  # Gemini 호출 시 사용할 원본 프레임
+        self._relocate_thread = None
+        # 장면 안정화 후 재검증 (작업 중 다시 안정화되면 끝난 뒤 한 번 더 실행)
+        self._revalidate_thread = None
+        self._revalidate_pending = None
+        # 장면 전환/씬 변경마다 증가 (그 전 프레임으로 계산한 재검증 결과는 버림)
+        self._scene_epoch = 0
+        # 최근 원본 프레임 기록 (발화 시점 프레임을 골라 Gemini 호출에 사용)
+        self.frame_history = FrameHistory(FRAME_HISTORY_SIZE)
+        self._set_target_utterance = None
+
+        # 호출어 감지 시점의 추측성 Gemini 호출
+        self.prefetch = SpeculativePrefetch()
+        self._prefetch_threads = []
+        # 부분 인식 결과로 먼저 실행한 동작 (최종 명령에서 확정 또는 되돌림)
+        self._early_action = None
+        # 발화(corr_id)별 호출어 → 명령 → 동작 지연 기록
+        self.latency = LatencyTrace(LATENCY_TRACE_SIZE)
+        self._corr_id = None
+        # 줌/구도 명령마다 증가 ("3초 동안 확대"의 자동 복원이 이후 명령을 덮어쓰지 않도록)
+        self._zoom_token = 0
 
         self._setup_ui()
         self._setup_timers()
@@ -400,6 +514,7 @@ class CameraDirectorWindow(QMainWindow):
 
     def _setup_timers(self):
         """프레임 갱신 타이머 설정"""
+        self.pipeline = self._build_pipeline()
         self.frame_timer = QTimer()
         self.frame_timer.timeout.connect(self._update_frame)
         # OBS_MIRROR_FPS 기준 (기본 10fps → 100ms 간격)
@@ -420,6 +535,23 @@ class CameraDirectorWindow(QMainWindow):
         self.pipe_thread.start()
         self.status_bar.set_state("loading_stt")
 
+        # 명령 인식 모델 교체 (감독자가 있을 때만 — 새 모델을 다 불러온 뒤 교체)
+        self._stt_model = STT_MODEL_SIZE
+        if hasattr(self.pipe_conn, "swap_model"):
+            self._swap_shortcut = QShortcut(QKeySequence("Ctrl+M"), self)
+            self._swap_shortcut.activated.connect(self._cycle_stt_model)
+
+    def _cycle_stt_model(self):
+        """STT_MODEL_CHOICES 순서대로 명령 인식 모델을 바꿉니다."""
+        choices = STT_MODEL_CHOICES
+        index = choices.index(self._stt_model) if self._stt_model in choices else -1
+        size = choices[(index + 1) % len(choices)]
+        if size == self._stt_model:
+            return
+        print(f"[UI] STT 모델 교체 요청: {self._stt_model} → {size}")
+        self.status_bar.set_state("idle", extra_text=f"STT 모델 {size} 로딩 중")
+        self.pipe_conn.swap_model(size)
+
 
     def _connect_obs(self):
         """OBS에 연결합니다."""
@@ -430,15 +562,166 @@ class CameraDirectorWindow(QMainWindow):
             self.connection_label.setText("● OBS 연결 실패")
             self.connection_label.setStyleSheet(f"color: {THEME['accent_magenta']};")
 
+    def _restore_targets(self, frame):
+        """현재 씬의 저장된 타겟을 불러와 첫 프레임으로 재검증합니다."""
+        if self.store is None:
+            return
+        scene = self.obs.current_scene or "default"
+        restored, stale = self.targets.load_scene(scene, frame, TARGET_REVALIDATE_THRESHOLD)
+        self.video_widget.set_targets(self.targets.get_all())
+        self.status_bar.set_target_count(self.targets.count())
+        if restored or stale:
+            self.status_bar.set_state("idle", extra_text=f"타겟 {restored}개 복원")
+
+    def _check_scene_change(self, timed):
+        """OBS 씬 이름과 프레임 블록 평균으로 장면 변화를 감지합니다."""
+        event = self.scene_detector.notify_scene(self.obs.current_scene or "default")
+        if event is None:
+            event = self.scene_detector.update(timed.level(HASH_WIDTH))
+        if event is None:
+            return
+        frame = timed.image
+
+        kind = event["type"]
+        if kind == "scene":
+            print(f"[Scene] OBS 씬 전환: {event['previous']} → {event['scene']}")
+            if self.store is not None:
+                self.targets.load_scene(event["scene"], frame, TARGET_REVALIDATE_THRESHOLD)
+            else:
+                self.targets.hide_all()
+            self._scene_epoch += 1
+            self._reset_zoom_if_needed()
+        elif kind == "cut":
+            # 화면 대부분이 바뀜: 안정될 때까지 타겟 숨김
+            print(f"[Scene] 장면 전환 감지 (바뀐 영역 {event['fraction']:.0%}) → 타겟 숨김")
+            self.targets.hide_all()
+            self._scene_epoch += 1
+            self._reset_zoom_if_needed()
+        elif kind == "settled":
+            self._revalidate_targets(timed, event["after_cut"])
+
+        self.video_widget.set_targets(self.targets.get_all())
+        self.status_bar.set_target_count(self.targets.count())
+
+    def _revalidate_targets(self, timed, after_cut=False):
+        """
+        장면이 안정된 뒤 바뀐 영역에 걸친 타겟을 외형으로 재검증하고,
+        달라진 타겟과 숨겨진 타겟을 로컬 재탐색으로 다시 찾습니다.
+        재검증·재탐색은 분석 단계 예산을 넘으므로 작업 스레드에서 계산합니다.
+        """
+        if self._revalidate_thread is not None and self._revalidate_thread.isRunning():
+            self._revalidate_pending = bool(after_cut or self._revalidate_pending)
+            return
+        frame = timed.image
+        h, w = frame.shape[:2]
+        suspects = [t for t in self.targets.get_all() if self.scene_detector.overlaps(t.bbox, w, h)]
+        stale = list(self.targets.stale)
+        if not suspects and not stale:
+            return
+
+        epoch = self._scene_epoch
+        timed.acquire()
+        self._revalidate_thread = RevalidateWorkerThread(
+            self.targets, timed, suspects, stale, TARGET_REVALIDATE_THRESHOLD
+        )
+        self._revalidate_thread.result_ready.connect(
+            lambda failed, candidates, found, ms: self._on_revalidate_result(
+                failed, candidates, found, ms, len(suspects), epoch, after_cut
+            )
+        )
+        self._revalidate_thread.finished.connect(timed.release)
+        self._revalidate_thread.finished.connect(self._on_revalidate_finished)
+        self._revalidate_thread.start()
+
+    def _on_revalidate_result(self, failed, candidates, found, elapsed_ms, suspect_count, epoch, after_cut):
+        """재검증·재탐색 결과를 GUI 스레드에서 반영합니다."""
+        if epoch != self._scene_epoch:
+            print("[Scene] 재검증 중 장면이 다시 바뀜 → 결과 버림")
+            return
+        stale_count = len(candidates) - len(failed)
+        print(
+            f"[Scene] 장면 안정화: 재검증 {suspect_count}개, 외형 변화 {len(failed)}개, "
+            f"숨김 {stale_count}개 ({elapsed_ms:.1f}ms)"
+        )
+        if not candidates:
+            return
+
+        relocated, missing = self.targets.apply_relocation(candidates, found, elapsed_ms)
+        newly_lost = [t for t in missing if t in failed]
+        self.targets.hide(newly_lost)
+        self.video_widget.set_targets(self.targets.get_all())
+        self.status_bar.set_target_count(self.targets.count())
+        # 이미 숨겨져 있던 타겟은 장면 전환 직후에만 안내 (안정화마다 반복 안내하지 않음)
+        lost = missing if after_cut else newly_lost
+        if lost:
+            self.tts.speak_async(
+                f"타겟 {len(lost)}개의 위치를 찾지 못했습니다. 위치 다시 찾아라고 말씀해 주세요."
+            )
+
+    def _on_revalidate_finished(self):
+        """재검증 중에 장면이 다시 안정되었으면 최신 프레임으로 한 번 더 실행합니다."""
+        pending, self._revalidate_pending = self._revalidate_pending, None
+        if pending is None:
+            return
+        timed = self.frame_history.latest()
+        if timed is not None:
+            self._revalidate_targets(timed, pending)
+
+    def _reset_zoom_if_needed(self):
+        if self.ptz.is_zoomed:
+            self.ptz.reset_view(duration=0.8)
+
     # ── 프레임 갱신 루프 ──
     def _update_frame(self):
-        """OBS에서 프레임을 캡처하고 PTZ를 적용하여 화면에 표시합니다."""
+        """프레임 파이프라인을 한 번 실행합니다 (캡처 → 기록 → 분석 → PTZ → 오버레이 → 출력)."""
+        self.pipeline.tick()
+
+    def _build_pipeline(self):
+        """프레임 처리 단계를 등록합니다."""
+        pipeline = FramePipeline()
+        pipeline.add(Stage(
+            "capture", self._stage_capture, outputs=("frame",),
+            executor=PIPELINE_CAPTURE_EXECUTOR,
+        ))
+        pipeline.add(Stage("record", self._stage_record, inputs=("frame",), outputs=("timed",)))
+        pipeline.add(Stage(
+            "analyze", self._stage_analyze, inputs=("timed",),
+            budget_ms=PIPELINE_ANALYZE_BUDGET_MS, policy="skip",
+        ))
+        pipeline.add(Stage(
+            "quality", self._stage_quality, inputs=("timed",), outputs=("sharpness",),
+            executor="thread",
+        ))
+        pipeline.add(Stage("ptz", self._stage_ptz, inputs=("frame",), outputs=("view",)))
+        pipeline.add(Stage("overlay", self._stage_overlay, inputs=("view",)))
+        pipeline.add(Stage("output", self._stage_output, inputs=("view",)))
+        return pipeline
+
+    def _stage_capture(self, inputs):
+        """OBS에서 프레임을 캡처합니다 (JPEG 디코딩 포함)."""
         frame = self.obs.capture_frame()
-        if frame is None:
-            return
+        return {"frame": frame} if frame is not None else None
+
+    def _stage_record(self, inputs):
+        """원본 프레임 보관 (Gemini 타겟 감지용) — 복사 없이 읽기 전용으로 기록"""
+        return {"timed": self.frame_history.push(inputs["frame"])}
+
+    def _stage_analyze(self, inputs):
+        """저장 타겟 복원(첫 프레임)과 장면 변화 감지."""
+        timed = inputs["timed"]
+        if not self._targets_restored:
+            self._targets_restored = True
+            self._restore_targets(timed.image)
+        if self.scene_detector is not None:
+            self._check_scene_change(timed)
 
-        # 원본 프레임 보관 (Gemini 타겟 감지용)
-        self._current_capture_frame = frame.copy()
+    def _stage_quality(self, inputs):
+        """선명도 점수를 미리 계산해 둡니다 (명령 시 프레임 선택이 즉시 끝나도록)."""
+        return {"sharpness": frame_sharpness(inputs["timed"])}
+
+    def _stage_ptz(self, inputs):
+        """PTZ 애니메이션 업데이트 및 적용."""
+        frame = inputs["frame"]
 
         # 실제 프레임 해상도 저장 (좌표 변환에 사용)
         orig_h, orig_w = frame.shape[:2]
@@ -448,20 +731,56 @@ class CameraDirectorWindow(QMainWindow):
         # PTZ도 실제 프레임 크기로 동기화
         self.ptz.update_frame_size(orig_w, orig_h)
 
-        # PTZ 애니메이션 업데이트 및 적용
         self.ptz.update()
         processed_frame = self.ptz.apply_view(frame)
+        if not processed_frame.flags.writeable:
+            # 기록된 원본이 그대로 반환된 경우 (QImage는 쓰기 가능한 버퍼 필요)
+            processed_frame = processed_frame.copy()
+        return {"view": processed_frame}
 
-        # 줌인 상태에서는 오버레이 숨기기, 풀샷에서는 표시
+    def _stage_overlay(self, inputs):
+        """줌인 상태에서는 오버레이 숨기기, 풀샷에서는 표시"""
         self.video_widget.show_overlay = not self.ptz.is_zoomed
 
-        # OpenCV BGR → QImage RGB
-        h, w, ch = processed_frame.shape
+    def _stage_output(self, inputs):
+        """OpenCV BGR → QImage 변환 후 화면에 표시"""
+        view = inputs["view"]
+        h, w, ch = view.shape
         bytes_per_line = ch * w
-        qimg = QImage(processed_frame.data, w, h, bytes_per_line, QImage.Format_BGR888)
-
+        qimg = QImage(view.data, w, h, bytes_per_line, QImage.Format_BGR888)
         self.video_widget.update_frame(qimg)
 
+    # ── STT Pipe 송신 ──
+    def _send_to_stt(self, msg):
+        """STT 프로세스로 메시지를 보냅니다 (여러 스레드에서 호출 가능)."""
+        if self.pipe_conn is None:
+            return
+        try:
+            with self._pipe_lock:
+                self.pipe_conn.send(msg)
+        except (OSError, EOFError, BrokenPipeError) as e:
+            print(f"[Pipe] 송신 오류: {e}")
+
+    def _on_playback(self, state, playback_id, reference):
+        """TTS/효과음 재생 시작·종료를 STT 프로세스에 알립니다 (재생 스레드에서 호출)."""
+        msg = {"type": "playback", "state": state, "id": playback_id, "t": time.monotonic()}
+        if reference is not None:
+            msg["reference"] = reference
+        self._send_to_stt(msg)
+
+    # ── 지연 기록 ──
+    def _mark(self, stage, corr_id=None):
+        """현재 발화(또는 corr_id)의 단계 시각을 기록합니다."""
+        self.latency.mark(corr_id or self._corr_id, stage, time.monotonic())
+
+    def _speak(self, text, corr_id=None):
+        """음성 안내. 명령 처리 중이면 재생 시작 시각을 지연 기록에 남깁니다."""
+        corr_id = corr_id or self._corr_id
+        on_start = None
+        if corr_id is not None:
+            on_start = functools.partial(self.latency.mark, corr_id, "tts_start")
+        self.tts.speak_async(text, on_start=on_start)
+
     # ── STT Pipe 메시지 처리 ──
     def _on_stt_message(self, msg):
         """STT 프로세스로부터 받은 메시지를 처리합니다."""
@@ -470,128 +789,470 @@ class CameraDirectorWindow(QMainWindow):
         if msg_type == "status":
             status = msg.get("status")
             if status == "ready":
-                self.status_bar.set_state("idle")
+                startup = msg.get("startup") or {}
+                extra = None
+                if "spawn_to_ready_sec" in startup:
+                    extra = f"STT 준비 {startup['spawn_to_ready_sec']:.1f}s"
+                    if msg.get("restarts"):
+                        extra += f" (재시작 {msg['restarts']}회)"
+                self.status_bar.set_state("idle", extra_text=extra)
                 self.tts.play_sound_async(SOUND_START)
+            elif status == "stt_restarting":
+                # 진행 중이던 발화 관련 상태는 워커와 함께 사라짐
+                self._rollback_early_action()
+                self._discard_prefetch()
+                self.status_bar.set_state(
+                    "loading_stt", extra_text=f"STT 재시작 중 ({msg.get('reason')})"
+                )
+            elif status == "model_swapped":
+                self._stt_model = msg.get("model_size")
+                self.status_bar.set_state(
+                    "idle", extra_text=f"STT 모델 {self._stt_model} ({msg.get('load_sec', 0.0):.1f}s)"
+                )
+            elif status == "model_swap_failed":
+                self.status_bar.set_state("error", extra_text=f"STT 모델 교체 실패: {msg.get('model_size')}")
+                QTimer.singleShot(2000, lambda: self.status_bar.set_state("idle"))
             elif status == "wake_detected":
+                self._corr_id = msg.get("corr_id")
+                self.latency.on_wake(msg, time.monotonic())
                 self.status_bar.set_state("wake_detected")
                 self.tts.play_sound_async(SOUND_WAKE)
+                self._start_prefetch(msg)
             elif status == "listening_command":
                 self.status_bar.set_state("listening_command")
             elif status == "timeout":
+                self._rollback_early_action()
+                self._discard_prefetch()
                 self.status_bar.set_state("timeout")
                 QTimer.singleShot(2000, lambda: self.status_bar.set_state("idle"))
             elif status == "not_recognized":
+                self._rollback_early_action()
+                self._discard_prefetch()
                 self.status_bar.set_state("not_recognized")
                 QTimer.singleShot(2000, lambda: self.status_bar.set_state("idle"))
 
+        elif msg_type == "partial":
+            self.status_bar.set_state("listening_command", extra_text=msg.get("text", ""))
+            self._dispatch_partial(msg)
+
         elif msg_type == "command":
+            self._corr_id = msg.get("corr_id")
+            self.latency.on_command(msg, time.monotonic())
             command_text = msg.get("text", "")
             self.status_bar.set_state("processing", extra_text=command_text)
-            self._execute_command(command_text)
+            self._execute_command(command_text, msg)
 
         elif msg_type == "terminate":
             self.close()
 
-    def _execute_command(self, text):
-        """파싱된 명령을 실행합니다."""
+    def _execute_command(self, text, utterance=None):
+        """
+        파싱된 명령을 실행합니다.
+
+        Args:
+            text: 명령 텍스트
+            utterance: 발화 시각 정보 (utterance_start/utterance_end 포함 dict)
+        """
         parsed = self.voice_ctrl.parse_command(text)
         action = parsed["action"]
+        if parsed["alternatives"]:
+            print(f"[Voice] 모호한 명령: '{text}' → {action} (신뢰도 {parsed['confidence']:.2f}, "
+                  f"후보 {parsed['alternatives']})")
+
+        if action != "set_target":
+            self._discard_prefetch()
+
+        # 부분 인식으로 먼저 실행한 화면 동작이 최종 명령과 같으면 애니메이션을 다시 시작하지 않음
+        early = self._early_action
+        self._early_action = None
+        confirmed = early is not None and self._early_matches(early, parsed)
+        if early is not None:
+            if confirmed:
+                print(f"[UI] 선행 실행 확정: {early['action']}")
+            else:
+                self._rollback_early_action(early)
 
         if action == "set_target":
-            self._cmd_set_target()
+            self._cmd_set_target(utterance)
         elif action == "zoom_in":
-            self._cmd_zoom_in(parsed.get("target"))
+            self._cmd_zoom_in(parsed.get("target"), animate=not confirmed,
+                              hold_sec=parsed["slots"].get("duration"))
         elif action == "reset_view":
-            self._cmd_reset_view()
+            self._cmd_reset_view(animate=not confirmed)
         elif action == "remove_target":
             self._cmd_remove_target(parsed.get("target"))
         elif action == "list_targets":
             self._cmd_list_targets()
+        elif action == "relocate_targets":
+            self._cmd_relocate_targets()
         else:
             self.status_bar.set_state("not_recognized", extra_text=text)
-            self.tts.speak_async("명령을 이해하지 못했습니다.")
+            self._speak("명령을 이해하지 못했습니다.")
             QTimer.singleShot(2000, lambda: self.status_bar.set_state("idle"))
 
-    def _cmd_set_target(self):
+    # ── 부분 인식 선행 실행 ──
+    def _dispatch_partial(self, msg):
+        """
+        부분 인식의 안정 텍스트(이후 바뀌지 않는 앞부분)로 명령을 미리 실행합니다.
+        발화당 한 번, 되돌릴 수 있는 동작만 실행합니다:
+        줌인/구도 복원은 화면만 먼저 움직이고, 타겟 설정은 추측성 감지를 시작합니다.
+        음성 안내는 최종 명령에서 합니다.
+        """
+        if not PARTIAL_DISPATCH_ENABLED or self._early_action is not None:
+            return
+        stable_text = msg.get("stable_text", "")
+        if not stable_text:
+            return
+        parsed = self.voice_ctrl.parse_command(stable_text)
+        action = parsed["action"]
+        if parsed["confidence"] < INTENT_EARLY_MIN_CONFIDENCE:
+            return
+        early = {"action": action, "target_id": None, "view": self.ptz.target_view()}
+
+        if action == "zoom_in":
+            target = self._resolve_zoom_target(parsed.get("target"))
+            if target is None:
+                return
+            early["target_id"] = target.id
+            self.ptz.zoom_to(target.bbox, duration=0.8)
+            self._mark("ptz_start", msg.get("corr_id"))
+        elif action == "reset_view":
+            if not self.ptz.is_zoomed:
+                return
+            self.ptz.reset_view(duration=0.8)
+            self._mark("ptz_start", msg.get("corr_id"))
+        elif action == "set_target":
+            early["view"] = None
+            if not self.prefetch.is_active:
+                # 발화가 아직 진행 중이므로 지금까지의 구간으로 프레임을 고름
+                self._start_prefetch({"utterance_start": msg.get("utterance_start"),
+                                      "utterance_end": time.monotonic(),
+                                      "corr_id": msg.get("corr_id")})
+        else:
+            return
+
+        self._early_action = early
+        print(f"[UI] 부분 인식 선행 실행: {action} ('{stable_text}', #{msg.get('seq')})")
+
+    def _early_matches(self, early, parsed):
+        """선행 실행한 동작이 최종 명령과 같은지 확인합니다."""
+        if early["action"] != parsed["action"]:
+            return False
+        if early["action"] != "zoom_in":
+            return True
+        target = self._resolve_zoom_target(parsed.get("target"))
+        return target is not None and target.id == early["target_id"]
+
+    def _rollback_early_action(self, early=None):
+        """선행 실행한 화면 동작을 되돌립니다 (추측성 감지는 기존 폐기 경로를 따름)."""
+        if early is None:
+            early, self._early_action = self._early_action, None
+        if early is None or early["view"] is None:
+            return
+        print(f"[UI] 선행 실행 취소: {early['action']}")
+        self.ptz.restore_view(early["view"])
+
+    def _detection_frame(self, utterance=None):
+        """
+        감지에 사용할 기록 프레임을 고릅니다.
+        발화 시점(없으면 최신 프레임) 주변 SHARPNESS_CANDIDATES개 중 가장 선명한 프레임입니다.
+        """
+        if utterance is None:
+            anchor = self.frame_history.latest()
+        else:
+            anchor = self.frame_history.for_utterance(
+                utterance.get("utterance_start"),
+                utterance.get("utterance_end"),
+                SPEECH_FRAME_POSITION,
+            )
+        if anchor is None or SHARPNESS_CANDIDATES <= 1:
+            return anchor
+
+        candidates = self.frame_history.around(anchor.timestamp, SHARPNESS_CANDIDATES)
+        best, score, elapsed_ms = select_sharpest(candidates)
+        print(
+            f"[Vision] 요청 프레임 선명도: {score:.1f} "
+            f"(후보 {len(candidates)}개, 기준 대비 {best.timestamp - anchor.timestamp:+.2f}s, "
+            f"{elapsed_ms:.1f}ms)"
+        )
+        return best
+
+    def _estimate_pointing(self, timed_frame):
+        """로컬 손가락 포인팅 추정 (신뢰도가 낮으면 None)."""
+        if not POINTER_ENABLED:
+            return None
+        start = time.perf_counter()
+        estimate = estimate_pointing(timed_frame.image, small=timed_frame.level(WORK_WIDTH))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"[Pointer] {estimate} ({elapsed_ms:.1f}ms)")
+        if estimate is None or estimate.confidence < POINTER_ROI_CONFIDENCE:
+            return None
+        return estimate
+
+    def _start_detection(self, timed_frame, existing_bboxes, on_result, pointing=None, on_finished=None):
+        """
+        기록 프레임을 고정(pin)한 채 Gemini 감지 스레드를 시작합니다.
+        포인팅 추정이 있으면 요청 이미지를 ray 주변 영역으로 자릅니다.
+        스레드가 끝나면 고정을 해제하고 on_finished(thread)를 부릅니다
+        (캐시 적중은 바로 끝나므로 start() 전에 연결).
+        """
+        roi = None
+        if pointing is not None:
+            h, w = timed_frame.image.shape[:2]
+            roi = ray_roi(pointing, w, h)
+        timed_frame.acquire()
+        thread = GeminiWorkerThread(
+            self.vision, timed_frame.image, existing_bboxes, roi,
+            preview=timed_frame.level(HASH_WIDTH, gray=True),
+        )
+        thread.result_ready.connect(on_result)
+        thread.finished.connect(timed_frame.release)
+        if on_finished is not None:
+            thread.finished.connect(lambda: on_finished(thread))
+        thread.start()
+        return thread
+
+    def _cmd_set_target(self, utterance=None):
         """타겟 설정 명령: Gemini Vision으로 손가락이 가리키는 객체를 감지"""
-        if self._current_capture_frame is None:
-            self.tts.speak_async("카메라 프레임이 없습니다.")
+        self._set_target_utterance = utterance
+        timed_frame = self._detection_frame(utterance)
+        if timed_frame is None:
+            self._speak("카메라 프레임이 없습니다.")
             return
 
         self.status_bar.set_state("processing")
 
         # 이미 등록된 타겟 bbox 수집 (중복 감지 방지)
+        all_targets = self.targets.get_all()
+        existing_bboxes = [t.bbox for t in all_targets]
+
+        # 손가락 끝이 이미 등록된 타겟 안이나 바로 앞이면 Gemini 없이 바로 안내
+        # (ray가 멀리서 관통하는 경우는 사이에 새 물체가 있을 수 있으므로 Gemini로 판단)
+        pointing = self._estimate_pointing(timed_frame)
+        if pointing is not None and pointing.confidence >= POINTER_RESOLVE_CONFIDENCE:
+            h, w = timed_frame.image.shape[:2]
+            hit = first_hit(pointing, existing_bboxes, POINTER_RESOLVE_DISTANCE * min(w, h))
+            if hit is not None:
+                target = all_targets[hit]
+                self._discard_prefetch()
+                print(f"[Pointer] 로컬 판정: {target.display_name}")
+                self.status_bar.set_state("idle", extra_text=target.display_name)
+                self._speak(f"이미 {target.display_name}로 등록된 물체입니다.",
+                            (utterance or {}).get("corr_id"))
+                return
+
+        # 호출어 시점에 시작한 추측성 감지가 있으면 채택
+        status, result = self.prefetch.claim(existing_bboxes)
+        if status == "ready":
+            print(f"[Prefetch] 추측 결과 즉시 채택 — {self.prefetch.summary()}")
+            self._on_target_detected(result)
+            return
+        if status == "pending":
+            print(f"[Prefetch] 진행 중인 추측 요청 채택 — {self.prefetch.summary()}")
+            return
+
+        # Gemini API를 별도 스레드에서 호출 (발화 시점 프레임 사용)
+        if utterance is not None:
+            lag = time.monotonic() - timed_frame.timestamp
+            print(f"[UI] 발화 시점 프레임 사용 ({lag:.2f}s 전)")
+        self._mark("vision_start")
+        self._gemini_thread = self._start_detection(
+            timed_frame, existing_bboxes, self._on_target_detected, pointing
+        )
+
+    # ── 추측성(speculative) 감지 ──
+    def _start_prefetch(self, utterance=None):
+        """호출어 감지 즉시 호출어 발화 시점 프레임으로 감지를 미리 시작합니다."""
+        if not VISION_PREFETCH_ENABLED:
+            return
+        timed_frame = self._detection_frame(utterance)
+        if timed_frame is None:
+            return
+
         existing_bboxes = [t.bbox for t in self.targets.get_all()]
+        token = self.prefetch.start(existing_bboxes)
+        if token is None:
+            return
 
-        # Gemini API를 별도 스레드에서 호출
-        self._gemini_thread = GeminiWorkerThread(
-            self.vision, self._current_capture_frame, existing_bboxes
+        corr_id = (utterance or {}).get("corr_id")
+        self._mark("vision_start", corr_id)
+        thread = self._start_detection(
+            timed_frame, existing_bboxes,
+            lambda result, tk=token, corr=corr_id: self._on_prefetch_result(tk, result, corr),
+            self._estimate_pointing(timed_frame),
+            on_finished=self._prefetch_threads.remove,
         )
-        self._gemini_thread.result_ready.connect(self._on_target_detected)
-        self._gemini_thread.start()
+        self._prefetch_threads.append(thread)
+        print(f"[Prefetch] 추측성 감지 시작 (#{token})")
+
+    def _on_prefetch_result(self, token, result, corr_id=None):
+        """추측성 감지 결과 수신. 명령이 이미 기다리고 있으면 바로 처리합니다."""
+        if result is not None:
+            self._mark("vision_done", corr_id)
+        if not self.prefetch.on_result(token, result):
+            return
+        if result is None:
+            # 추측 감지가 실패했으면 현재 프레임으로 다시 시도
+            print("[Prefetch] 추측 감지 실패 — 재호출")
+            self._cmd_set_target(self._set_target_utterance)
+            return
+        self._on_target_detected(result)
+
+    def _discard_prefetch(self):
+        if self.prefetch.discard():
+            print(f"[Prefetch] 추측 결과 폐기 — {self.prefetch.summary()}")
 
     def _on_target_detected(self, result):
         """Gemini 감지 결과를 처리합니다."""
+        # 감지는 비동기로 끝나므로 그 사이 다른 발화가 와도 타겟 설정 명령의 corr_id로 기록
+        corr_id = (self._set_target_utterance or {}).get("corr_id")
+        self._mark("vision_done", corr_id)
         if result is None:
             self.status_bar.set_state("error")
-            self.tts.speak_async("물체를 감지하지 못했습니다. 다시 시도해주세요.")
+            self._speak("물체를 감지하지 못했습니다. 다시 시도해주세요.", corr_id)
             QTimer.singleShot(2000, lambda: self.status_bar.set_state("idle"))
             return
 
+        # 이미 등록된 물체와 겹치면 (Gemini가 제외 영역을 무시한 경우) 중복 등록 방지
+        duplicate = self.targets.find_duplicate(result["bbox"])
+        if duplicate is not None:
+            self.targets.add_target(result["label"], result["bbox"], result.get("frame"))  # merge 정책 반영
+            self.video_widget.set_targets(self.targets.get_all())
+            self.status_bar.set_state("idle", extra_text=duplicate.display_name)
+            self._speak(f"이미 {duplicate.display_name}로 등록된 물체입니다.", corr_id)
+            return
+
         # 타겟 등록
-        target = self.targets.add_target(result["label"], result["bbox"])
+        target = self.targets.add_target(result["label"], result["bbox"], result.get("frame"))
         self.video_widget.set_targets(self.targets.get_all())
         self.status_bar.set_target_count(self.targets.count())
         self.status_bar.set_state("target_set")
 
-        self.tts.speak_async(f"{result['label']}을 타겟 {target.id}로 등록했습니다.")
+        self._speak(f"{result['label']}을 타겟 {target.id}로 등록했습니다.", corr_id)
         QTimer.singleShot(3000, lambda: self.status_bar.set_state("idle"))
 
-    def _cmd_zoom_in(self, target_query):
-        """줌인 명령"""
+    def _resolve_zoom_target(self, target_query):
+        """줌인 대상 타겟 (지정이 없으면 첫 번째 타겟, 없으면 None)."""
         if not target_query:
             # 타겟 지정 없이 "확대"만 한 경우 → 첫 번째 타겟
             all_targets = self.targets.get_all()
-            if all_targets:
-                target = all_targets[0]
+            return all_targets[0] if all_targets else None
+        return self.targets.get_target(target_query)
+
+    def _cmd_zoom_in(self, target_query, animate=True, hold_sec=None):
+        """
+        줌인 명령
+
+        Args:
+            animate: False면 화면은 이미 움직인 것으로 보고 안내만 함 (부분 인식 선행 실행 확정)
+            hold_sec: 주면 그 시간 뒤 구도를 복원 ("3초 동안 확대")
+        """
+        target = self._resolve_zoom_target(target_query)
+        if target is None:
+            if not target_query:
+                self._speak("등록된 타겟이 없습니다.")
             else:
-                self.tts.speak_async("등록된 타겟이 없습니다.")
-                return
-        else:
-            target = self.targets.get_target(target_query)
-            if not target:
-                self.tts.speak_async(f"{target_query}을 찾을 수 없습니다.")
-                return
+                self._speak(f"{target_query}을 찾을 수 없습니다.")
+            return
 
         self.status_bar.set_state("zoom_in", extra_text=target.display_name)
-        self.ptz.zoom_to(target.bbox, duration=0.8)
-        self.tts.speak_async(f"{target.display_name}으로 줌인합니다.")
+        self._zoom_token += 1
+        if animate:
+            self.ptz.zoom_to(target.bbox, duration=0.8)
+            self._mark("ptz_start")
+        if hold_sec:
+            QTimer.singleShot(int(hold_sec * 1000), lambda tk=self._zoom_token: self._end_zoom_hold(tk))
+        self._speak(f"{target.display_name}으로 줌인합니다.")
         QTimer.singleShot(2000, lambda: self.status_bar.set_state("idle"))
 
-    def _cmd_reset_view(self):
+    def _cmd_reset_view(self, animate=True):
         """구도 복원 명령"""
         self.status_bar.set_state("zoom_out")
-        self.ptz.reset_view(duration=0.8)
-        self.tts.speak_async("구도를 복원합니다.")
+        self._zoom_token += 1
+        if animate:
+            self.ptz.reset_view(duration=0.8)
+            self._mark("ptz_start")
+        self._speak("구도를 복원합니다.")
         QTimer.singleShot(1000, lambda: self.status_bar.set_state("idle"))
 
+    def _end_zoom_hold(self, token):
+        """시간 지정 줌인이 끝나면 구도를 복원합니다 (그 사이 다른 줌/구도 명령이 있었으면 무시)."""
+        if token == self._zoom_token:
+            self._reset_zoom_if_needed()
+
     def _cmd_list_targets(self):
         """등록된 모든 타겟 목록을 음성으로 안내합니다."""
         all_targets = self.targets.get_all()
         if not all_targets:
-            self.tts.speak_async("등록된 타겟이 없습니다.")
+            self._speak("등록된 타겟이 없습니다.")
             self.status_bar.set_state("idle")
             return
 
         names = [f"타겟 {t.id}, {t.label}" for t in all_targets]
         speech = f"현재 {len(all_targets)}개의 타겟이 등록되어 있습니다. " + ", ".join(names)
         self.status_bar.set_state("idle", extra_text=f"타겟 {len(all_targets)}개")
-        self.tts.speak_async(speech)
+        self._speak(speech)
+
+    def _cmd_relocate_targets(self):
+        """
+        타겟 위치 재탐색 명령: 카메라/물체가 움직인 뒤 외형(ORB 특징점)으로 모든 타겟을
+        한 번에 다시 찾고, 찾지 못한 타겟만 Gemini로 위치를 확인합니다.
+        """
+        if self._relocate_thread is not None and self._relocate_thread.isRunning():
+            self._speak("이미 타겟 위치를 찾는 중입니다.")
+            return
+        timed_frame = self._detection_frame()
+        if timed_frame is None:
+            self._speak("카메라 프레임이 없습니다.")
+            return
+        if not self.targets.get_all() and not self.targets.stale:
+            self._speak("등록된 타겟이 없습니다.")
+            return
+
+        self.status_bar.set_state("processing")
+        frame = timed_frame.image
+        relocated, missing = self.targets.relocate(frame, gray=timed_frame.gray())
+        self.video_widget.set_targets(self.targets.get_all())
+        self.status_bar.set_target_count(self.targets.count())
+
+        if not missing:
+            self.status_bar.set_state("idle", extra_text=f"타겟 {len(relocated)}개 재탐색")
+            self._speak(f"타겟 {len(relocated)}개의 위치를 다시 찾았습니다.")
+            return
+
+        known_bboxes = [t.bbox for t in relocated]
+        timed_frame.acquire()
+        self._relocate_thread = RelocateWorkerThread(self.vision, frame, missing, known_bboxes)
+        self._relocate_thread.result_ready.connect(
+            lambda results: self._on_relocate_result(results, frame, len(relocated))
+        )
+        self._relocate_thread.finished.connect(timed_frame.release)
+        self._relocate_thread.start()
+
+    def _on_relocate_result(self, results, frame, local_count):
+        """Gemini 위치 확인 결과를 반영합니다."""
+        lost = []
+        placed = 0
+        for target, result in results:
+            if result is None:
+                lost.append(target)
+                continue
+            # 요청 후 삭제되었거나 씬이 바뀐 타겟은 place_target이 무시
+            placed += self.targets.place_target(target, result["bbox"], frame)
+
+        self.video_widget.set_targets(self.targets.get_all())
+        self.status_bar.set_target_count(self.targets.count())
+        found = local_count + placed
+        self.status_bar.set_state("idle", extra_text=f"타겟 {found}개 재탐색")
+        speech = f"타겟 {found}개의 위치를 다시 찾았습니다."
+        if lost:
+            speech += " 찾지 못한 타겟: " + ", ".join(t.display_name for t in lost)
+        self._speak(speech)
 
     def _cmd_remove_target(self, target_query):
         """타겟 삭제 명령"""
         if not target_query:
-            self.tts.speak_async("삭제할 타겟을 지정해주세요.")
+            self._speak("삭제할 타겟을 지정해주세요.")
             return
 
         target = self.targets.get_target(target_query)
@@ -599,25 +1260,34 @@ class CameraDirectorWindow(QMainWindow):
             self.targets.remove_target(target.id)
             self.video_widget.set_targets(self.targets.get_all())
             self.status_bar.set_target_count(self.targets.count())
-            self.tts.speak_async(f"{target.display_name}을 삭제했습니다.")
+            self._speak(f"{target.display_name}을 삭제했습니다.")
         else:
-            self.tts.speak_async(f"{target_query}을 찾을 수 없습니다.")
+            self._speak(f"{target_query}을 찾을 수 없습니다.")
 
     def closeEvent(self, event):
         """윈도우 종료 시 리소스 정리"""
         # STT 프로세스에 종료 신호 전송
-        try:
-            if self.pipe_conn:
-                self.pipe_conn.send({"type": "shutdown"})
-        except Exception:
-            pass
+        self._send_to_stt({"type": "shutdown"})
 
         if hasattr(self, 'pipe_thread'):
             self.pipe_thread.stop()
             self.pipe_thread.wait(2000)
+        for thread in list(self._prefetch_threads):
+            thread.wait(2000)
+        if self._relocate_thread is not None:
+            self._relocate_thread.wait(2000)
+        if self._revalidate_thread is not None:
+            self._revalidate_thread.wait(2000)
+        print(f"[Prefetch] 통계: {self.prefetch.summary()}")
         self.frame_timer.stop()
+        self.pipeline.shutdown()
+        print(f"[Pipeline] 통계: {self.pipeline.summary()}")
+        for line in self.latency.report():
+            print(f"[Latency] {line}")
         self.pulse_timer.stop()
         self.obs.disconnect()
+        if self.store is not None:
+            self.store.close()
         event.accept()
 
 
@@ -1,13 +1,21 @@
 """
 vision_ai.py — Gemini Vision API를 통한 손가락 포인팅 감지 + Bounding Box 추출
 """
-import os
 import json
 import re
+import time
 import cv2
-import tempfile
+import numpy as np
 
-from config import GEMINI_API_KEY, GEMINI_MODEL
+from config import (
+    VISION_BACKEND, VISION_ARCHIVE_PATH, VISION_REPLAY_LATENCY,
+    VISION_CACHE_SIZE, VISION_CACHE_THRESHOLD,
+    BBOX_REFINE_ENABLED, BBOX_REFINE_BUDGET_MS, TARGET_DEDUP_IOU,
+)
+from modules.bbox_refiner import refine_bbox
+from modules.spatial_index import iou_many
+from modules.vision_backend import create_backend
+from modules.vision_cache import VisionResultCache
 
 
 class VisionAI:
@@ -27,92 +35,175 @@ class VisionAI:
 {{"label": "물체이름", "bbox": [y_min, x_min, y_max, x_max]}}
 """
 
-    def __init__(self):
-        self.client = None
+    # 카메라/물체가 움직여 로컬 재탐색에 실패한 타겟의 위치를 다시 찾는 프롬프트
+    LOCATE_PROMPT_BASE = """이 이미지에서 "{label}" 물체를 찾아주세요.
 
-    def _ensure_client(self):
-        """Gemini 클라이언트를 초기화합니다 (지연 초기화)."""
-        if self.client is None:
-            from google import genai
-            self.client = genai.Client(api_key=GEMINI_API_KEY)
-            print("[Vision] Gemini 클라이언트 초기화 완료")
+다음 규칙을 반드시 따라주세요:
+1. "{label}"에 해당하는 물체 하나의 bounding box 좌표를 JSON으로만 반환해주세요.
+2. 좌표는 이미지 크기 기준 0~1000 범위의 정규화된 값으로 주세요.
+3. 물체가 보이지 않으면 {{"label": "{label}", "bbox": []}}를 반환하세요.
+4. 설명이나 추가 텍스트 없이 JSON만 출력해주세요.
+{exclude_section}
+응답 형식:
+{{"label": "{label}", "bbox": [y_min, x_min, y_max, x_max]}}
+"""
 
-    def detect_pointed_object(self, frame, existing_bboxes=None):
+    def __init__(self, backend=None, cache_size=None):
+        """
+        Args:
+            backend: 비전 백엔드 (없으면 VISION_BACKEND 설정으로 생성)
+            cache_size: 결과 캐시 크기 (없으면 VISION_CACHE_SIZE, 0이면 캐시 끔 — 벤치마크용)
+        """
+        if backend is None:
+            backend = create_backend(VISION_BACKEND, VISION_ARCHIVE_PATH, VISION_REPLAY_LATENCY)
+        self.backend = backend
+        if cache_size is None:
+            cache_size = VISION_CACHE_SIZE
+        self.cache = VisionResultCache(cache_size, VISION_CACHE_THRESHOLD) if cache_size > 0 else None
+        print(f"[Vision] 백엔드: {self.backend.name}")
+
+    def detect_pointed_object(self, frame, existing_bboxes=None, roi=None, preview=None):
         """
         OpenCV 프레임에서 손가락이 가리키는 객체를 감지합니다.
 
         Args:
             frame: OpenCV numpy 배열 (BGR)
             existing_bboxes: 이미 등록된 타겟들의 bbox 리스트 [[x1,y1,x2,y2], ...] (픽셀 좌표)
+            roi: 요청 이미지를 잘라낼 영역 [x1, y1, x2, y2] (포인팅 방향 주변, 선택)
+            preview: 캐시 해시용으로 미리 축소된 프레임 (TimedFrame.level(), 선택)
 
         Returns:
             dict: {"label": str, "bbox": [x1, y1, x2, y2]} (픽셀 좌표)
                   또는 None (감지 실패 시)
         """
-        self._ensure_client()
+        if roi is not None:
+            return self._detect_in_roi(frame, existing_bboxes, roi)
+        return self._detect(frame, existing_bboxes, preview)
 
+    def _detect(self, frame, existing_bboxes=None, preview=None, roi=None):
+        """캐시를 거쳐 감지합니다 (roi는 크롭 이미지인 경우 원본 기준 영역, 캐시 키용)."""
         try:
             h, w = frame.shape[:2]
 
-            # 이미 등록된 타겟 영역 제외 문구 생성
-            exclude_section = ""
-            if existing_bboxes and len(existing_bboxes) > 0:
-                exclude_lines = []
-                for i, bbox in enumerate(existing_bboxes):
-                    # 픽셀 → 0~1000 정규화
-                    ny1 = int(bbox[1] * 1000 / h)
-                    nx1 = int(bbox[0] * 1000 / w)
-                    ny2 = int(bbox[3] * 1000 / h)
-                    nx2 = int(bbox[2] * 1000 / w)
-                    exclude_lines.append(f"  - 이미 등록됨: [{ny1}, {nx1}, {ny2}, {nx2}]")
-                exclude_section = (
-                    "\n6. 아래 영역에 이미 등록된 물체가 있습니다. "
-                    "이 영역과 겹치는 물체는 절대 선택하지 마세요. 반드시 다른 물체를 찾으세요:\n"
-                    + "\n".join(exclude_lines) + "\n"
-                )
-
+            # 같은 장면 + 같은 제외 영역 + 같은 포인팅 영역이면 캐시된 결과 재사용
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(frame, existing_bboxes, preview, roi)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    stats = self.cache.stats()
+                    print(f"[Vision] 캐시 적중: {cached} (적중률 {stats['hit_rate']:.0%})")
+                    return cached
+
+            exclude_section = self._exclude_section(existing_bboxes, w, h, 6)
             prompt = self.DETECT_PROMPT_BASE.format(exclude_section=exclude_section)
-
-            # 프레임을 임시 JPEG 파일로 저장 후 업로드
-            temp_path = os.path.join(tempfile.gettempdir(), "camera_agent_detect.jpg")
-            cv2.imwrite(temp_path, frame)
-
-            # Gemini에 이미지 업로드
-            uploaded_file = self.client.files.upload(file=temp_path)
-
-            # 이미지 + 프롬프트 전송 (429 레이트리밋 시 자동 재시도)
-            import time as _time
-            for attempt in range(2):
-                try:
-                    response = self.client.models.generate_content(
-                        model=GEMINI_MODEL,
-                        contents=[uploaded_file, prompt],
-                    )
-                    break
-                except Exception as api_err:
-                    if "429" in str(api_err) and attempt == 0:
-                        print("[Vision] API 한도 초과 — 30초 후 재시도...")
-                        _time.sleep(30)
-                    else:
-                        raise api_err
-
-            print(f"[Vision] Gemini 응답: {response.text}")
-
-            # JSON 파싱
-            result = self._parse_response(response.text, w, h)
-
-            # 임시 파일 정리
-            try:
-                os.remove(temp_path)
-            except Exception:
-                pass
-
+            result = self._query(frame, prompt)
+            # 제외 영역과 겹치는 결과(중복)는 캐시하지 않음 — 다시 가리켜도 같은 중복이 반복되지 않도록
+            if cache_key is not None and not self._is_duplicate(result, existing_bboxes):
+                self.cache.put(cache_key, result)
             return result
 
         except Exception as e:
             print(f"[Vision] 감지 실패: {e}")
             return None
 
+    def locate_object(self, frame, label, existing_bboxes=None):
+        """
+        이름으로 물체의 위치를 찾습니다 (로컬 재탐색 실패 타겟용).
+
+        Args:
+            frame: OpenCV numpy 배열 (BGR)
+            label: 찾을 물체 이름 (예: "종이컵")
+            existing_bboxes: 이미 위치가 확인된 다른 타겟들의 bbox (제외 영역)
+
+        Returns:
+            dict: {"label": str, "bbox": [x1, y1, x2, y2]} 또는 None
+        """
+        try:
+            h, w = frame.shape[:2]
+            exclude_section = self._exclude_section(existing_bboxes, w, h, 5)
+            prompt = self.LOCATE_PROMPT_BASE.format(label=label, exclude_section=exclude_section)
+            return self._query(frame, prompt)
+        except Exception as e:
+            print(f"[Vision] 위치 찾기 실패 ({label}): {e}")
+            return None
+
+    @staticmethod
+    def _is_duplicate(result, existing_bboxes):
+        """결과 bbox가 이미 등록된 영역과 겹치는지 (TargetManager.find_duplicate와 같은 IoU 기준)."""
+        if result is None or not existing_bboxes:
+            return False
+        boxes = np.asarray(existing_bboxes, np.float32).reshape(-1, 4)
+        return float(iou_many(result["bbox"], boxes).max()) >= TARGET_DEDUP_IOU
+
+    @staticmethod
+    def _exclude_section(existing_bboxes, w, h, rule_number):
+        """이미 등록된 타겟 영역 제외 문구를 생성합니다."""
+        if not existing_bboxes:
+            return ""
+        exclude_lines = []
+        for bbox in existing_bboxes:
+            # 픽셀 → 0~1000 정규화
+            ny1 = int(bbox[1] * 1000 / h)
+            nx1 = int(bbox[0] * 1000 / w)
+            ny2 = int(bbox[3] * 1000 / h)
+            nx2 = int(bbox[2] * 1000 / w)
+            exclude_lines.append(f"  - 이미 등록됨: [{ny1}, {nx1}, {ny2}, {nx2}]")
+        return (
+            f"\n{rule_number}. 아래 영역에 이미 등록된 물체가 있습니다. "
+            "이 영역과 겹치는 물체는 절대 선택하지 마세요. 반드시 다른 물체를 찾으세요:\n"
+            + "\n".join(exclude_lines) + "\n"
+        )
+
+    def _query(self, frame, prompt):
+        """프레임과 프롬프트를 백엔드에 보내고 응답을 픽셀 좌표 결과로 변환합니다."""
+        h, w = frame.shape[:2]
+
+        # 프레임을 JPEG로 인코딩하여 백엔드에 전송
+        ok, encoded = cv2.imencode(".jpg", frame)
+        if not ok:
+            print("[Vision] JPEG 인코딩 실패")
+            return None
+
+        start = time.perf_counter()
+        text = self.backend.generate(encoded.tobytes(), prompt)
+        elapsed = time.perf_counter() - start
+
+        print(f"[Vision] {self.backend.name} 응답 ({elapsed:.2f}s): {text}")
+
+        # JSON 파싱
+        result = self._parse_response(text, w, h)
+        if result is not None and BBOX_REFINE_ENABLED:
+            result["bbox"] = self._refine(frame, result["bbox"])
+        return result
+
+    def _refine(self, frame, bbox):
+        """bbox를 로컬에서 물체 경계에 맞게 보정합니다 (예산 초과/실패 시 원본)."""
+        refined, method, elapsed_ms = refine_bbox(frame, bbox, BBOX_REFINE_BUDGET_MS)
+        print(f"[Vision] bbox 보정 ({method}, {elapsed_ms:.1f}ms): {bbox} → {refined}")
+        return refined
+
+    def _detect_in_roi(self, frame, existing_bboxes, roi):
+        """ROI로 잘라낸 이미지로 감지한 뒤 결과를 원본 프레임 좌표로 되돌립니다."""
+        rx1, ry1, rx2, ry2 = roi
+        crop = frame[ry1:ry2, rx1:rx2]
+        print(f"[Vision] 포인팅 ROI로 요청: {roi} ({crop.shape[1]}x{crop.shape[0]})")
+
+        # ROI와 겹치는 등록 영역만 크롭 좌표로 변환하여 제외 목록에 전달
+        local_bboxes = []
+        for b in existing_bboxes or []:
+            x1, y1 = max(b[0], rx1) - rx1, max(b[1], ry1) - ry1
+            x2, y2 = min(b[2], rx2) - rx1, min(b[3], ry2) - ry1
+            if x2 > x1 and y2 > y1:
+                local_bboxes.append([x1, y1, x2, y2])
+
+        result = self._detect(crop, local_bboxes, roi=roi)
+        if result is None:
+            return None
+        b = result["bbox"]
+        result["bbox"] = [b[0] + rx1, b[1] + ry1, b[2] + rx1, b[3] + ry1]
+        return result
+
     def _parse_response(self, text, img_width, img_height):
         """
         Gemini 응답에서 JSON을 추출하고 정규화 좌표를 픽셀 좌표로 변환합니다.
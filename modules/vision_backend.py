@@ -0,0 +1,205 @@
+"""
+vision_backend.py — VisionAI용 교체 가능한 비전 백엔드
+실시간 Gemini 호출 / 녹화(Record) / 재생(Replay) 세 가지 구현을 제공합니다.
+
+- GeminiBackend  : 실제 Gemini API 호출 (기본값)
+- RecordingBackend: 내부 백엔드 호출 결과를 압축 아카이브(.jsonl.gz)에 기록
+- ReplayBackend  : 아카이브의 응답을 네트워크 없이 재생 (합성 지연 시간 지원)
+
+아카이브 한 줄 형식 (JSON):
+    {"image": "<sha1>", "prompt": "<sha1>", "response": "...", "latency": 1.23}
+"""
+import os
+import gzip
+import json
+import time
+import random
+import hashlib
+import tempfile
+import threading
+
+from config import GEMINI_API_KEY, GEMINI_MODEL
+
+
+def _sha1(data):
+    """bytes 또는 str의 SHA-1 해시(hex)를 반환합니다."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+class VisionBackend:
+    """비전 백엔드 공통 인터페이스."""
+
+    name = "base"
+
+    def generate(self, image_bytes, prompt):
+        """
+        JPEG 이미지와 프롬프트를 전송하고 응답 텍스트를 반환합니다.
+
+        Args:
+            image_bytes: JPEG 인코딩된 이미지 (bytes)
+            prompt: 텍스트 프롬프트
+
+        Returns:
+            str: 모델 응답 텍스트
+        """
+        raise NotImplementedError
+
+
+class GeminiBackend(VisionBackend):
+    """실제 Gemini API를 호출하는 백엔드."""
+
+    name = "gemini"
+
+    def __init__(self):
+        self.client = None
+
+    def _ensure_client(self):
+        """Gemini 클라이언트를 초기화합니다 (지연 초기화)."""
+        if self.client is None:
+            from google import genai
+            self.client = genai.Client(api_key=GEMINI_API_KEY)
+            print("[Vision] Gemini 클라이언트 초기화 완료")
+
+    def generate(self, image_bytes, prompt):
+        self._ensure_client()
+
+        # 이미지를 임시 JPEG 파일로 저장 후 업로드
+        # (감지·추측성 감지·재탐색 스레드가 동시에 부르므로 호출마다 고유 파일)
+        fd, temp_path = tempfile.mkstemp(prefix="camera_agent_detect_", suffix=".jpg")
+        with os.fdopen(fd, "wb") as f:
+            f.write(image_bytes)
+
+        try:
+            uploaded_file = self.client.files.upload(file=temp_path)
+
+            # 이미지 + 프롬프트 전송 (429 레이트리밋 시 자동 재시도)
+            for attempt in range(2):
+                try:
+                    response = self.client.models.generate_content(
+                        model=GEMINI_MODEL,
+                        contents=[uploaded_file, prompt],
+                    )
+                    return response.text
+                except Exception as api_err:
+                    if "429" in str(api_err) and attempt == 0:
+                        print("[Vision] API 한도 초과 — 30초 후 재시도...")
+                        time.sleep(30)
+                    else:
+                        raise api_err
+        finally:
+            # 임시 파일 정리
+            try:
+                os.remove(temp_path)
+            except Exception:
+                pass
+
+
+class RecordingBackend(VisionBackend):
+    """내부 백엔드를 감싸 요청 해시와 응답을 아카이브에 기록합니다."""
+
+    name = "record"
+
+    def __init__(self, inner, archive_path):
+        self.inner = inner
+        self.archive_path = archive_path
+        self._lock = threading.Lock()
+        archive_dir = os.path.dirname(archive_path)
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
+
+    def generate(self, image_bytes, prompt):
+        start = time.perf_counter()
+        text = self.inner.generate(image_bytes, prompt)
+        latency = time.perf_counter() - start
+
+        record = {
+            "image": _sha1(image_bytes),
+            "prompt": _sha1(prompt),
+            "response": text,
+            "latency": round(latency, 4),
+        }
+        # gzip은 멤버 단위 append를 지원하므로 기록마다 열고 닫아도 안전합니다.
+        with self._lock:
+            with gzip.open(self.archive_path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        print(f"[Vision] 응답 기록됨 ({latency:.2f}s) → {self.archive_path}")
+        return text
+
+
+class ReplayBackend(VisionBackend):
+    """
+    아카이브에 기록된 응답을 재생합니다.
+
+    이미지+프롬프트 해시가 일치하는 기록을 우선 사용하고,
+    strict=False이면 일치 항목이 없을 때 기록 순서대로 순환 재생합니다.
+    """
+
+    name = "replay"
+
+    def __init__(self, archive_path, latency=None, jitter=0.0, strict=False, seed=0):
+        """
+        Args:
+            archive_path: RecordingBackend가 생성한 .jsonl.gz 아카이브
+            latency: 합성 지연 시간(초). None이면 기록된 실제 지연 시간 사용
+            jitter: 지연 시간에 더할 균등 분포 잡음 폭(초)
+            strict: True면 해시 불일치 시 예외 발생
+            seed: 지연 잡음 난수 시드 (결정적 재현용)
+        """
+        self.archive_path = archive_path
+        self.latency = latency
+        self.jitter = jitter
+        self.strict = strict
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cursor = 0
+        self.records = []
+        self._by_key = {}
+        self._load()
+
+    def _load(self):
+        """아카이브를 메모리에 로드하고 해시 인덱스를 구성합니다."""
+        with gzip.open(self.archive_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                self.records.append(record)
+                self._by_key.setdefault((record["image"], record["prompt"]), []).append(record)
+        print(f"[Vision] 재생 아카이브 로드: {len(self.records)}건 ({self.archive_path})")
+
+    def _next_record(self, image_bytes, prompt):
+        key = (_sha1(image_bytes), _sha1(prompt))
+        with self._lock:
+            matches = self._by_key.get(key)
+            if matches:
+                return matches[0]
+            if self.strict or not self.records:
+                raise KeyError(f"재생 아카이브에 일치하는 요청 없음: {key[0][:12]}")
+            record = self.records[self._cursor % len(self.records)]
+            self._cursor += 1
+            return record
+
+    def generate(self, image_bytes, prompt):
+        record = self._next_record(image_bytes, prompt)
+
+        delay = record.get("latency", 0.0) if self.latency is None else self.latency
+        if self.jitter > 0:
+            with self._lock:
+                delay += self._rng.uniform(0.0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        return record["response"]
+
+
+def create_backend(kind="gemini", archive_path=None, latency=None):
+    """설정값으로부터 비전 백엔드를 생성합니다."""
+    if kind == "gemini":
+        return GeminiBackend()
+    if kind == "record":
+        return RecordingBackend(GeminiBackend(), archive_path)
+    if kind == "replay":
+        return ReplayBackend(archive_path, latency=latency)
+    raise ValueError(f"알 수 없는 비전 백엔드: {kind}")
@@ -0,0 +1,130 @@
+"""
+vision_cache.py — 지각 해시(dHash) 기반 비전 감지 결과 캐시
+장면이 바뀌지 않았거나 같은 명령을 반복할 때 Gemini 호출을 생략합니다.
+
+캐시 키 = (프레임 64비트 dHash, 프레임 크기 + 제외 bbox 집합 + 포인팅 ROI)
+해시는 해밍 거리가 threshold 이하이면 같은 장면으로 간주합니다.
+"""
+import time
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+HASH_WIDTH = 160  # 해시 계산 전 축소 너비 (TimedFrame.level()의 미리보기 단계와 공유)
+
+
+def dhash(frame, hash_size=8):
+    """
+    프레임의 64비트 difference hash를 계산합니다.
+
+    (hash_size+1) x hash_size 그레이스케일로 축소한 뒤
+    가로 방향 인접 픽셀의 밝기 비교 결과를 비트로 묶습니다.
+    """
+    # 스트라이드 서브샘플링(복사 없음) 후 축소 → 720p 기준 1ms 미만
+    step = max(1, frame.shape[1] // HASH_WIDTH)
+    small = cv2.resize(frame[::step, ::step], (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class VisionResultCache:
+    """LRU 크기 제한과 적중률 지표를 가진 비전 결과 캐시."""
+
+    def __init__(self, max_size=32, threshold=4):
+        """
+        Args:
+            max_size: 최대 보관 항목 수 (초과 시 가장 오래 사용되지 않은 항목 제거)
+            threshold: 같은 장면으로 볼 최대 해밍 거리 (64비트 중)
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self._entries = OrderedDict()  # (phash, context) → result
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lookup_time = 0.0
+
+    @staticmethod
+    def make_key(frame, existing_bboxes=None, preview=None, roi=None):
+        """
+        프레임과 제외 bbox 목록으로 캐시 키를 만듭니다.
+        preview(미리 축소된 프레임)가 있으면 해시는 그것으로 계산합니다.
+        roi(포인팅 방향 크롭 영역)가 다르면 같은 장면이라도 다른 키입니다.
+        """
+        h, w = frame.shape[:2]
+        excluded = frozenset(tuple(int(v) for v in b) for b in (existing_bboxes or []))
+        roi = tuple(int(v) for v in roi) if roi is not None else None
+        return dhash(frame if preview is None else preview), (w, h, excluded, roi)
+
+    def get(self, key):
+        """
+        유사한 장면의 캐시된 결과를 찾습니다.
+
+        Returns:
+            dict 결과의 복사본 또는 None
+        """
+        start = time.perf_counter()
+        phash, context = key
+        found = None
+        with self._lock:
+            best_dist = self.threshold + 1
+            for entry_key, result in self._entries.items():
+                if entry_key[1] != context:
+                    continue
+                dist = _hamming(entry_key[0], phash)
+                if dist < best_dist:
+                    best_dist = dist
+                    found = entry_key
+                    if dist == 0:
+                        break
+
+            if found is not None:
+                self._entries.move_to_end(found)
+                self.hits += 1
+                result = self._entries[found]
+            else:
+                self.misses += 1
+                result = None
+            self._lookup_time += time.perf_counter() - start
+
+        if result is None:
+            return None
+        return {"label": result["label"], "bbox": list(result["bbox"])}
+
+    def put(self, key, result):
+        """감지 결과를 저장합니다."""
+        if result is None:
+            return
+        with self._lock:
+            self._entries[key] = {"label": result["label"], "bbox": list(result["bbox"])}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """적중/실패 횟수와 평균 조회 시간(ms)을 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "avg_lookup_ms": self._lookup_time * 1000 / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,142 @@
+"""
+vision_prefetch.py — 호출어 감지 시점의 추측성(speculative) 비전 호출 관리
+STT가 명령을 변환하는 동안 Gemini 감지를 미리 시작하고,
+파싱된 명령이 set_target이면 결과를 채택(commit), 아니면 폐기(discard)합니다.
+
+Qt 스레드 생성은 UI가 담당하며, 이 모듈은 상태와 지표만 관리합니다.
+"""
+import time
+import threading
+
+_PENDING = object()
+
+
+class SpeculativePrefetch:
+    """추측성 감지 요청 1건의 상태와 적중률/절약 시간 지표를 관리합니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_token = 1
+        self._active = None  # 현재 유효한 추측 요청 (dict)
+
+        self.started = 0
+        self.committed = 0
+        self.discarded = 0
+        self.saved_total = 0.0
+
+    @staticmethod
+    def _bbox_key(existing_bboxes):
+        return tuple(tuple(int(v) for v in b) for b in (existing_bboxes or []))
+
+    def start(self, existing_bboxes):
+        """
+        새 추측 요청을 등록합니다. 이전 요청은 폐기됩니다.
+
+        Returns:
+            int: 결과 전달 시 사용할 토큰
+                 (이미 채택된 요청이 진행 중이면 None)
+        """
+        with self._lock:
+            if self._active is not None:
+                if self._active["claimed_at"] is not None:
+                    return None
+                self.discarded += 1
+            token = self._next_token
+            self._next_token += 1
+            self._active = {
+                "token": token,
+                "started_at": time.monotonic(),
+                "existing": self._bbox_key(existing_bboxes),
+                "result": _PENDING,
+                "done_at": None,
+                "claimed_at": None,
+            }
+            self.started += 1
+            return token
+
+    @property
+    def is_active(self):
+        with self._lock:
+            return self._active is not None
+
+    def on_result(self, token, result):
+        """
+        추측 요청의 결과를 기록합니다.
+
+        Returns:
+            bool: 명령이 이미 결과를 기다리고 있어 즉시 전달해야 하면 True
+        """
+        with self._lock:
+            active = self._active
+            if active is None or active["token"] != token:
+                return False  # 이미 폐기된 요청
+            active["result"] = result
+            active["done_at"] = time.monotonic()
+            if active["claimed_at"] is not None:
+                self._active = None
+                return True
+            return False
+
+    def claim(self, existing_bboxes):
+        """
+        set_target 명령이 추측 요청을 채택합니다.
+
+        Returns:
+            ("ready", result): 결과가 이미 도착함
+            ("pending", None): 진행 중 — on_result()가 True를 반환할 때 전달
+            (None, None): 사용할 수 있는 추측 요청 없음 (일반 경로로 호출)
+        """
+        with self._lock:
+            active = self._active
+            if active is None:
+                return None, None
+            if active["existing"] != self._bbox_key(existing_bboxes):
+                # 추측 이후 타겟 목록이 바뀌었으면 제외 영역이 달라 재사용 불가
+                self._active = None
+                self.discarded += 1
+                return None, None
+
+            if active["result"] is None:
+                # 추측 감지가 실패했으면(아직 가리키기 전 등) 새로 호출
+                self._active = None
+                self.discarded += 1
+                return None, None
+
+            now = time.monotonic()
+            active["claimed_at"] = now
+            self.committed += 1
+            if active["result"] is not _PENDING:
+                # 감지 전체 시간이 명령 변환과 겹쳐 절약됨
+                self.saved_total += active["done_at"] - active["started_at"]
+                self._active = None
+                return "ready", active["result"]
+            # 명령 도착 시점까지 진행된 만큼 절약됨
+            self.saved_total += now - active["started_at"]
+            return "pending", None
+
+    def discard(self):
+        """set_target이 아닌 명령/시간 초과 시 추측 요청을 폐기합니다."""
+        with self._lock:
+            if self._active is None or self._active["claimed_at"] is not None:
+                return False
+            self._active = None
+            self.discarded += 1
+            return True
+
+    def stats(self):
+        with self._lock:
+            finished = self.committed + self.discarded
+            return {
+                "started": self.started,
+                "committed": self.committed,
+                "discarded": self.discarded,
+                "hit_rate": self.committed / finished if finished else 0.0,
+                "avg_saved_s": self.saved_total / self.committed if self.committed else 0.0,
+            }
+
+    def summary(self):
+        s = self.stats()
+        return (
+            f"적중 {s['committed']}/{s['committed'] + s['discarded']} "
+            f"({s['hit_rate']:.0%}), 평균 절약 {s['avg_saved_s']:.2f}s"
+        )
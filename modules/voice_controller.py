@@ -1,15 +1,21 @@
 """
 voice_controller.py — 음성 명령 파싱
 STT 워커로부터 전달받은 텍스트를 구조화된 명령으로 변환합니다.
+패턴은 IntentGrammar가 불러올 때 하나의 오토마톤으로 컴파일합니다 (modules/intent_grammar.py).
 """
-import re
+from modules.intent_grammar import IntentGrammar
 
 
 class VoiceController:
     """음성 명령 텍스트를 구조화된 액션으로 파싱합니다."""
 
-    # 키워드 → 액션 매핑
+    # 키워드 → 액션 매핑 (리터럴을 ".*"로 이은 패턴만 가능, 여러 액션이 맞으면 더 구체적인 쪽 → 선언 순)
     ACTION_PATTERNS = {
+        # "타겟 위치 다시 찾아" 등이 set_target("타겟.*해")으로 잡히지 않도록 먼저 검사
+        "relocate_targets": [
+            r"위치.*다시", r"다시.*찾", r"위치.*갱신", r"위치.*업데이트",
+            r"재인식", r"재탐색",
+        ],
         "set_target": [
             r"타겟.*설정", r"타겟.*등록", r"이거.*설정", r"이것.*설정",
             r"이거.*타겟", r"이것.*타겟", r"타겟.*해",
@@ -32,53 +38,17 @@ class VoiceController:
         ],
     }
 
+    def __init__(self):
+        # 패턴 전체를 한 번만 컴파일 (파싱은 텍스트를 한 번 훑음)
+        self.grammar = IntentGrammar(self.ACTION_PATTERNS)
+
     def parse_command(self, text):
         """
         음성 인식 텍스트를 구조화된 명령으로 변환합니다.
 
         Returns:
-            dict: {"action": str, "target": str|None, "raw_text": str}
+            dict: {"action": str, "target": str|None, "raw_text": str,
+                   "slots": {"target", "label", "number", "duration"} 중 찾은 것,
+                   "confidence": 0.0~1.0, "alternatives": [(액션, 점수), ...]}
         """
-        if not text:
-            return {"action": "unknown", "target": None, "raw_text": ""}
-
-        cleaned = text.strip()
-        result = {"action": "unknown", "target": None, "raw_text": cleaned}
-
-        # 액션 판별
-        for action, patterns in self.ACTION_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, cleaned):
-                    result["action"] = action
-                    break
-            if result["action"] != "unknown":
-                break
-
-        # 타겟 이름/번호 추출 (줌인, 삭제 등에서 사용)
-        if result["action"] in ("zoom_in", "remove_target"):
-            result["target"] = self._extract_target(cleaned)
-
-        return result
-
-    def _extract_target(self, text):
-        """
-        텍스트에서 타겟 식별자를 추출합니다.
-        예: "종이컵 1 확대해 줘" → "종이컵 1"
-            "타겟 2 확대" → "타겟 2"
-        """
-        # "타겟 N" 패턴
-        match = re.search(r"타겟\s*(\d+)", text)
-        if match:
-            return f"타겟 {match.group(1)}"
-
-        # "물체이름 N" 패턴 (예: "종이컵 1")
-        # 확대/줌인/삭제 등의 동사 키워드 이전 부분에서 추출
-        action_keywords = ["확대", "줌", "크게", "삭제", "제거", "클로즈"]
-        for kw in action_keywords:
-            idx = text.find(kw)
-            if idx > 0:
-                before = text[:idx].strip()
-                if before:
-                    return before
-
-        return None
+        return self.grammar.parse(text)
@@ -0,0 +1,70 @@
+"""
+09_vision_replay_bench.py — 네트워크 없이 VisionAI 파이프라인 부하/회귀 테스트
+
+RecordingBackend로 기록한 아카이브(VISION_BACKEND=record 로 실행 시 생성)를
+ReplayBackend로 재생하여 응답 파싱과 처리 시간을 측정합니다.
+
+사용법:
+    python pre_test/09_vision_replay_bench.py [아카이브 경로] [요청 수] [동시 요청 수] [합성 지연(초)]
+"""
+import os
+import sys
+import glob
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import VISION_ARCHIVE_PATH
+from modules.vision_ai import VisionAI
+from modules.vision_backend import ReplayBackend
+
+archive_path = sys.argv[1] if len(sys.argv) > 1 else VISION_ARCHIVE_PATH
+num_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+latency = float(sys.argv[4]) if len(sys.argv) > 4 else None
+
+if not os.path.exists(archive_path):
+    print(f"[ERROR] 아카이브가 없습니다: {archive_path}")
+    print("        먼저 VISION_BACKEND=record 로 main.py를 실행해 응답을 기록해주세요.")
+    exit(1)
+
+# 입력 프레임: captures 폴더의 최근 이미지, 없으면 합성 프레임
+capture_dir = os.path.join(os.path.dirname(__file__), "captures")
+image_files = glob.glob(os.path.join(capture_dir, "obs_*.jpg"))
+if image_files:
+    frame = cv2.imread(max(image_files, key=os.path.getmtime))
+else:
+    frame = np.full((720, 1280, 3), 64, np.uint8)
+
+backend = ReplayBackend(archive_path, latency=latency)
+# 같은 프레임을 반복해 보내므로 결과 캐시를 끄고 매 요청이 백엔드를 거치게 함
+vision = VisionAI(backend=backend, cache_size=0)
+
+
+def run_once(_):
+    start = time.perf_counter()
+    result = vision.detect_pointed_object(frame)
+    return time.perf_counter() - start, result is not None
+
+
+print(f"[INFO] 요청 {num_requests}건, 동시성 {concurrency}")
+wall_start = time.perf_counter()
+with ThreadPoolExecutor(max_workers=concurrency) as pool:
+    outcomes = list(pool.map(run_once, range(num_requests)))
+wall = time.perf_counter() - wall_start
+
+latencies = np.array([o[0] for o in outcomes]) * 1000
+parsed = sum(1 for o in outcomes if o[1])
+
+print("\n--- 재생 벤치마크 결과 ---")
+print(f"파싱 성공: {parsed}/{num_requests}")
+print(f"지연 p50: {np.percentile(latencies, 50):.1f} ms")
+print(f"지연 p95: {np.percentile(latencies, 95):.1f} ms")
+print(f"지연 max: {latencies.max():.1f} ms")
+print(f"처리량: {num_requests / wall:.1f} req/s")
+print("--------------------------")
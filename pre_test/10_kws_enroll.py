@@ -0,0 +1,89 @@
+"""
+10_kws_enroll.py — 경량 호출어 검출기 템플릿 등록
+
+마이크로 호출어("헤이 짭스")를 여러 번 녹음하거나 WAV 폴더를 읽어
+MFCC 템플릿과 임계값을 config.KWS_TEMPLATE_PATH에 저장합니다.
+마이크 녹음은 pre_test/kws_data/positive/에 WAV로도 저장되어 11_kws_eval.py에서 쓸 수 있습니다.
+
+사용법:
+    python pre_test/10_kws_enroll.py                 # 마이크로 5회 녹음
+    python pre_test/10_kws_enroll.py 8               # 마이크로 8회 녹음
+    python pre_test/10_kws_enroll.py --wav <폴더>    # 폴더의 WAV 파일로 등록
+"""
+import os
+import sys
+import glob
+import time
+import wave
+
+import numpy as np
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import KWS_TEMPLATE_PATH, STT_SAMPLE_RATE
+from modules.audio_stream import AudioRingBuffer, MicCapture, VadSegmenter, read_wav
+from modules.keyword_spotter import KeywordSpotter
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "kws_data", "positive")
+
+
+def save_wav(path, audio, rate=STT_SAMPLE_RATE):
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(pcm.tobytes())
+
+
+def record_from_mic(count):
+    ring = AudioRingBuffer(30.0, STT_SAMPLE_RATE)
+    capture = MicCapture(ring)
+    capture.start()
+    segmenter = VadSegmenter(ring, max_speech_sec=3.0)
+    print("[등록] 주변 소음 측정 중 (2초)... 조용히 해주세요.")
+    segmenter.calibrate(2.0)
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    recordings = []
+    while len(recordings) < count:
+        print(f"[등록] ({len(recordings) + 1}/{count}) 호출어를 말해주세요...")
+        segment = None
+        while segment is None:
+            time.sleep(0.02)
+            segment = segmenter.poll()
+        print(f"       → {segment.duration:.2f}s 녹음됨")
+        path = os.path.join(DATA_DIR, f"wake_{int(time.time() * 1000)}.wav")
+        save_wav(path, segment.audio)
+        recordings.append(segment.audio)
+    capture.stop()
+    return recordings
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == "--wav":
+        files = sorted(glob.glob(os.path.join(args[1], "*.wav")))
+        if not files:
+            print(f"[ERROR] WAV 파일이 없습니다: {args[1]}")
+            sys.exit(1)
+        recordings = [read_wav(f, STT_SAMPLE_RATE) for f in files]
+        print(f"[등록] WAV {len(files)}개 사용")
+    else:
+        count = int(args[0]) if args else 5
+        recordings = record_from_mic(count)
+
+    start = time.perf_counter()
+    spotter = KeywordSpotter.enroll(recordings)
+    elapsed = time.perf_counter() - start
+    spotter.save(KWS_TEMPLATE_PATH)
+
+    lengths = [len(t) / 100 for t in spotter.templates]
+    print(f"\n[등록 완료] 템플릿 {len(spotter.templates)}개 "
+          f"(길이 {min(lengths):.2f}~{max(lengths):.2f}s), 임계값 {spotter.threshold:.2f}, {elapsed:.2f}s")
+    print(f"            저장: {KWS_TEMPLATE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
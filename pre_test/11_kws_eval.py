@@ -0,0 +1,123 @@
+"""
+11_kws_eval.py — 경량 호출어 검출기 정확도 / CPU 사용량 평가
+
+WAV 테스트 세트로 오수락(false accept)·오거부(false reject)율과
+발화당 처리 시간, CPU 시간, 실시간 배율(RTF)을 측정합니다.
+--whisper를 주면 같은 세트를 호출어 확인용 Whisper(STT_WAKE_MODEL_SIZE)로 판정할 때의 CPU 시간과 비교합니다.
+
+테스트 세트 구성:
+    <폴더>/positive/*.wav   호출어가 포함된 발화
+    <폴더>/negative/*.wav   호출어가 없는 발화 (잡담, 명령, 배경 소음 등)
+
+사용법:
+    python pre_test/11_kws_eval.py [폴더=pre_test/kws_data] [--whisper]
+"""
+import os
+import sys
+import glob
+import time
+
+import numpy as np
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    KWS_TEMPLATE_PATH, STT_SAMPLE_RATE, STT_MODEL_SIZE, STT_DEVICE, STT_COMPUTE_TYPE,
+    STT_WAKE_MODEL_SIZE, STT_WAKE_COMPUTE_TYPE,
+)
+from modules.audio_stream import read_wav
+from modules.keyword_spotter import KeywordSpotter
+
+args = [a for a in sys.argv[1:] if not a.startswith("--")]
+use_whisper = "--whisper" in sys.argv
+data_dir = args[0] if args else os.path.join(os.path.dirname(__file__), "kws_data")
+
+if not os.path.exists(KWS_TEMPLATE_PATH):
+    print(f"[ERROR] 템플릿이 없습니다: {KWS_TEMPLATE_PATH}")
+    print("        먼저 pre_test/10_kws_enroll.py로 호출어를 등록해주세요.")
+    sys.exit(1)
+
+
+def load_set(name):
+    files = sorted(glob.glob(os.path.join(data_dir, name, "*.wav")))
+    return [(os.path.basename(f), read_wav(f, STT_SAMPLE_RATE)) for f in files]
+
+
+positives = load_set("positive")
+negatives = load_set("negative")
+if not positives or not negatives:
+    print(f"[ERROR] {data_dir}/positive, {data_dir}/negative 에 WAV 파일이 필요합니다.")
+    sys.exit(1)
+
+spotter = KeywordSpotter.load(KWS_TEMPLATE_PATH)
+audio_sec = sum(len(a) for _, a in positives + negatives) / STT_SAMPLE_RATE
+print(f"[평가] 템플릿 {len(spotter.templates)}개, 임계값 {spotter.threshold:.2f}")
+print(f"[평가] positive {len(positives)}개, negative {len(negatives)}개, 총 {audio_sec:.1f}s\n")
+
+
+def run_kws(samples):
+    scores, wall, cpu = [], 0.0, 0.0
+    for _, audio in samples:
+        w0, c0 = time.perf_counter(), time.process_time()
+        scores.append(spotter.score(audio))
+        wall += time.perf_counter() - w0
+        cpu += time.process_time() - c0
+    return np.array(scores), wall, cpu
+
+
+pos_scores, pos_wall, pos_cpu = run_kws(positives)
+neg_scores, neg_wall, neg_cpu = run_kws(negatives)
+wall, cpu = pos_wall + neg_wall, pos_cpu + neg_cpu
+n = len(positives) + len(negatives)
+
+rejected = int((pos_scores > spotter.threshold).sum())
+accepted = int((neg_scores <= spotter.threshold).sum())
+frr = rejected / len(positives)
+far = accepted / len(negatives)
+print("=" * 60)
+print(" 경량 호출어 검출기 (MFCC + DTW)")
+print("=" * 60)
+print(f"  오거부율 (FRR) : {frr:.1%} ({rejected}/{len(positives)})")
+print(f"  오수락율 (FAR) : {far:.1%} ({accepted}/{len(negatives)})")
+print(f"  발화당 처리    : {wall / n * 1000:.1f}ms (CPU {cpu / n * 1000:.1f}ms)")
+print(f"  실시간 배율    : {wall / audio_sec:.4f} (CPU 점유 약 {cpu / audio_sec:.1%} — 연속 발화 기준)")
+
+for name, _ in [(f, s) for (f, _), s in zip(positives, pos_scores) if s > spotter.threshold]:
+    print(f"  ✗ 거부된 호출어: {name}")
+for name, _ in [(f, s) for (f, _), s in zip(negatives, neg_scores) if s <= spotter.threshold]:
+    print(f"  ✗ 수락된 비호출어: {name}")
+
+# 임계값 스윕 (EER 근처 확인용)
+print("\n  임계값   FRR     FAR")
+all_scores = np.concatenate([pos_scores, neg_scores])
+finite = all_scores[np.isfinite(all_scores)]
+for thr in np.linspace(finite.min(), finite.max(), 9):
+    print(f"  {thr:6.2f}  {np.mean(pos_scores > thr):5.1%}  {np.mean(neg_scores <= thr):5.1%}")
+
+if use_whisper:
+    from faster_whisper import WhisperModel
+    from modules.stt_worker import _transcribe, PHRASES
+
+    size = STT_WAKE_MODEL_SIZE or STT_MODEL_SIZE
+    compute_type = STT_WAKE_COMPUTE_TYPE if STT_WAKE_MODEL_SIZE else STT_COMPUTE_TYPE
+    print(f"\n[비교] Whisper '{size}' 로딩 중...")
+    model = WhisperModel(size, device=STT_DEVICE, compute_type=compute_type)
+    hits_pos = hits_neg = 0
+    w_wall = w_cpu = 0.0
+    for label, samples in (("pos", positives), ("neg", negatives)):
+        for _, audio in samples:
+            w0, c0 = time.perf_counter(), time.process_time()
+            detected = PHRASES.find(_transcribe(model, audio), "wake") is not None
+            w_wall += time.perf_counter() - w0
+            w_cpu += time.process_time() - c0
+            if detected:
+                hits_pos += label == "pos"
+                hits_neg += label == "neg"
+    print("=" * 60)
+    print(f" Whisper '{size}' 호출어 판정")
+    print("=" * 60)
+    print(f"  오거부율 (FRR) : {1 - hits_pos / len(positives):.1%}")
+    print(f"  오수락율 (FAR) : {hits_neg / len(negatives):.1%}")
+    print(f"  발화당 처리    : {w_wall / n * 1000:.1f}ms (CPU {w_cpu / n * 1000:.1f}ms)")
+    print(f"  CPU 시간 비율  : 경량 검출기는 Whisper의 {cpu / max(w_cpu, 1e-9):.2%}")
@@ -0,0 +1,282 @@
+"""
+12_stt_bench.py — 마이크 없이 WAV 코퍼스로 STT 워커 전체를 돌려 설정별 성능 비교
+
+stt_process의 상태 기계(VAD → KWS → 호출어 → 명령)를 WavFileSource 입력으로 그대로 실행하고,
+설정(모델 크기, compute_type, beam_size, pause_sec 등)마다 다음을 측정합니다 (CPU만 사용).
+
+    RTF          전체 디코딩 시간 / 코퍼스 길이
+    호출어 지연   호출어 클립 끝 → wake_detected 수신
+    명령 지연     명령 클립 끝 → command 수신
+    WER / CER    기대 명령 텍스트 대비 단어/글자 오류율
+    오호출       호출어가 없는 클립에서 나온 wake_detected 수
+
+코퍼스 구성:
+    <폴더>/labels.csv   file,kind,text
+        kind: wake(호출어만) | command(호출어 클립 뒤에 오는 명령) |
+              wake_command(호출어+명령 한 문장) | noise(호출어 없는 잡담/소음)
+        text: 기대 명령 텍스트 (command, wake_command만)
+    <폴더>/*.wav
+    클립은 labels.csv 순서대로 --gap 초 무음을 사이에 두고 이어 붙여 실제 시간 속도로 재생합니다.
+    종료어가 들어 있는 클립은 워커를 끝내므로 넣지 마세요.
+
+사용법:
+    python pre_test/12_stt_bench.py [폴더=pre_test/stt_corpus] [--gap 1.5]
+        [--config model_size=small,beam_size=1] [--config model_size=base,pause_sec=0.5] ...
+    (--config를 주지 않으면 config.py 기본값 1개로 실행)
+"""
+import os
+import re
+import sys
+import csv
+import time
+import threading
+from multiprocessing import Pipe
+
+import numpy as np
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import STT_SAMPLE_RATE
+from modules.audio_stream import WavFileSource, read_wav
+from modules.hangul import bounded_edit_distance
+from modules.stt_worker import stt_process, default_options
+from modules.stt_protocol import ProtocolConn
+
+KINDS = ("wake", "command", "wake_command", "noise")
+
+
+def parse_args(argv):
+    data_dir = os.path.join(os.path.dirname(__file__), "stt_corpus")
+    gap = 1.5
+    configs = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--gap":
+            gap = float(argv[i + 1])
+            i += 2
+        elif arg == "--config":
+            configs.append(parse_config(argv[i + 1]))
+            i += 2
+        else:
+            data_dir = arg
+            i += 1
+    return data_dir, gap, configs or [{}]
+
+
+def parse_config(text):
+    """'model_size=small,beam_size=2' → {"model_size": "small", "beam_size": 2} (기본값의 타입을 따름)."""
+    defaults = default_options()
+    config = {}
+    for item in text.split(","):
+        key, _, value = item.partition("=")
+        key = key.strip()
+        if key not in defaults:
+            raise SystemExit(f"[ERROR] 알 수 없는 옵션: {key} (가능: {', '.join(defaults)})")
+        default = defaults[key]
+        if value.lower() == "none":
+            config[key] = None
+        elif isinstance(default, bool):
+            config[key] = value.lower() in ("1", "true", "yes", "on")
+        elif isinstance(default, int):
+            config[key] = int(value)
+        elif isinstance(default, float):
+            config[key] = float(value)
+        else:
+            config[key] = value
+    return config
+
+
+def load_corpus(data_dir, gap):
+    """
+    Returns:
+        (이어 붙인 오디오, [클립 dict, ...]) — 클립에는 재생 오디오 기준 start/end(초)가 들어 있음
+    """
+    labels = os.path.join(data_dir, "labels.csv")
+    if not os.path.exists(labels):
+        print(f"[ERROR] {labels} 가 없습니다 (file,kind,text 형식).")
+        sys.exit(1)
+
+    clips, parts = [], []
+    gap_audio = np.zeros(int(gap * STT_SAMPLE_RATE), np.float32)
+    offset = 0
+    with open(labels, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            kind = row["kind"].strip()
+            if kind not in KINDS:
+                raise SystemExit(f"[ERROR] {row['file']}: 알 수 없는 kind '{kind}'")
+            audio = read_wav(os.path.join(data_dir, row["file"]), STT_SAMPLE_RATE)
+            parts += [gap_audio, audio]
+            offset += len(gap_audio)
+            clips.append({
+                "file": row["file"],
+                "kind": kind,
+                "text": (row.get("text") or "").strip(),
+                "start": offset / STT_SAMPLE_RATE,
+                "end": (offset + len(audio)) / STT_SAMPLE_RATE,
+            })
+            offset += len(audio)
+    if not clips:
+        print(f"[ERROR] {labels} 에 클립이 없습니다.")
+        sys.exit(1)
+    return np.concatenate(parts + [gap_audio]), clips
+
+
+def run_config(stream, options):
+    """
+    워커를 스레드로 실행하고 (수신 시각, 메시지) 목록과 입력 소스를 반환합니다.
+    """
+    parent_conn, child_conn = Pipe()
+    parent_conn = ProtocolConn(parent_conn, "벤치")
+    holder = {}
+
+    def source_factory(ring):
+        holder["source"] = WavFileSource(ring, stream)
+        return holder["source"]
+
+    worker = threading.Thread(
+        target=stt_process, args=(child_conn, source_factory, options), daemon=True
+    )
+    worker.start()
+
+    events = []
+    while True:
+        if parent_conn.poll(0.1):
+            try:
+                msg = parent_conn.recv()
+            except EOFError:
+                break
+            events.append((time.monotonic(), msg))
+            if msg.get("type") == "status" and msg.get("status") == "ready":
+                holder["source"].play()
+            if msg.get("type") == "stats":
+                break
+        elif not worker.is_alive():
+            break
+    worker.join(timeout=5)
+    return events, holder.get("source")
+
+
+def match_clip(clips, source, msg):
+    """메시지의 발화 구간과 가장 많이 겹치는 클립 (없으면 None)."""
+    u0, u1 = msg.get("utterance_start"), msg.get("utterance_end")
+    if u0 is None or u1 is None:
+        return None
+    best, best_overlap = None, 0.0
+    for clip in clips:
+        overlap = min(u1, source.time_of(clip["end"])) - max(u0, source.time_of(clip["start"]))
+        if overlap > best_overlap:
+            best, best_overlap = clip, overlap
+    return best
+
+
+def _words(text):
+    return re.sub(r"[^\w\s]", " ", text.lower()).split()
+
+
+def error_counts(ref, hyp):
+    """(단어 오류 수, 기준 단어 수, 글자 오류 수, 기준 글자 수) — 글자는 공백 제외."""
+    ref_words, hyp_words = _words(ref), _words(hyp)
+    ref_chars, hyp_chars = "".join(ref_words), "".join(hyp_words)
+    word_err = bounded_edit_distance(ref_words, hyp_words, max(len(ref_words), len(hyp_words)))
+    char_err = bounded_edit_distance(ref_chars, hyp_chars, max(len(ref_chars), len(hyp_chars)))
+    return word_err, len(ref_words), char_err, len(ref_chars)
+
+
+def evaluate(clips, events, source, duration):
+    results = {clip["file"]: {"wake": None, "command": None, "hyp": None} for clip in clips}
+    false_wakes = stray_commands = 0
+    stats = {}
+    for t, msg in events:
+        msg_type = msg.get("type")
+        if msg_type == "stats":
+            stats = msg
+            continue
+        is_wake = msg_type == "status" and msg.get("status") == "wake_detected"
+        if not (is_wake or msg_type == "command"):
+            continue
+        clip = match_clip(clips, source, msg)
+        latency = t - source.time_of(clip["end"]) if clip is not None else None
+        if is_wake:
+            if clip is None or clip["kind"] not in ("wake", "wake_command"):
+                false_wakes += 1
+            elif results[clip["file"]]["wake"] is None:
+                results[clip["file"]]["wake"] = latency
+        else:
+            if clip is None or clip["kind"] not in ("command", "wake_command"):
+                stray_commands += 1
+            elif results[clip["file"]]["command"] is None:
+                results[clip["file"]]["command"] = latency
+                results[clip["file"]]["hyp"] = msg.get("text", "")
+
+    wake_clips = [c for c in clips if c["kind"] in ("wake", "wake_command")]
+    command_clips = [c for c in clips if c["kind"] in ("command", "wake_command")]
+    wake_lat = [results[c["file"]]["wake"] for c in wake_clips if results[c["file"]]["wake"] is not None]
+    cmd_lat = [results[c["file"]]["command"] for c in command_clips if results[c["file"]]["command"] is not None]
+
+    totals = np.zeros(4)
+    for clip in command_clips:
+        totals += error_counts(clip["text"], results[clip["file"]]["hyp"] or "")
+
+    decode_ms = sum(stats.get(tier, {}).get("total_ms", 0.0) for tier in ("wake", "command", "partial"))
+    decode_ms += stats.get("kws", {}).get("total_ms", 0.0)
+    return {
+        "rtf": decode_ms / 1000 / duration if stats else float("nan"),
+        "wake_hit": (len(wake_lat), len(wake_clips)),
+        "wake_p50": float(np.median(wake_lat)) if wake_lat else float("nan"),
+        "wake_p95": float(np.percentile(wake_lat, 95)) if wake_lat else float("nan"),
+        "cmd_hit": (len(cmd_lat), len(command_clips)),
+        "cmd_p50": float(np.median(cmd_lat)) if cmd_lat else float("nan"),
+        "cmd_p95": float(np.percentile(cmd_lat, 95)) if cmd_lat else float("nan"),
+        "wer": totals[0] / totals[1] if totals[1] else float("nan"),
+        "cer": totals[2] / totals[3] if totals[3] else float("nan"),
+        "false_wakes": false_wakes,
+        "stray_commands": stray_commands,
+        "misses": [c["file"] for c in wake_clips if results[c["file"]]["wake"] is None],
+        "hyps": [(c["file"], c["text"], results[c["file"]]["hyp"]) for c in command_clips],
+    }
+
+
+def main():
+    data_dir, gap, configs = parse_args(sys.argv[1:])
+    stream, clips = load_corpus(data_dir, gap)
+    duration = len(stream) / STT_SAMPLE_RATE
+    counts = {kind: sum(c["kind"] == kind for c in clips) for kind in KINDS}
+    print(f"[벤치] 클립 {len(clips)}개 {counts}, 재생 길이 {duration:.1f}s, 설정 {len(configs)}개\n")
+
+    reports = []
+    for i, config in enumerate(configs, 1):
+        options = {**default_options(), **config}
+        label = ", ".join(f"{k}={v}" for k, v in config.items()) or "기본값"
+        print("=" * 60)
+        print(f" [{i}/{len(configs)}] {label}")
+        print("=" * 60)
+        events, source = run_config(stream, options)
+        if source is None or source.play_time is None:
+            print("[ERROR] 워커가 준비 상태에 도달하지 못했습니다.")
+            continue
+        report = evaluate(clips, events, source, duration)
+        reports.append((label, report))
+
+        for name, ref, hyp in report["hyps"]:
+            mark = "✓" if hyp is not None and _words(hyp) == _words(ref) else "✗"
+            print(f"  {mark} {name}: '{ref}' → '{hyp if hyp is not None else '(없음)'}'")
+        for name in report["misses"]:
+            print(f"  ✗ 호출어 놓침: {name}")
+        print()
+
+    print("=" * 60)
+    print(" 설정별 비교 (지연은 클립 끝 기준 p50/p95 초)")
+    print("=" * 60)
+    for label, r in reports:
+        print(f"  {label}")
+        print(f"    RTF {r['rtf']:.3f} | 호출어 {r['wake_hit'][0]}/{r['wake_hit'][1]} "
+              f"{r['wake_p50']:.2f}/{r['wake_p95']:.2f}s | 명령 {r['cmd_hit'][0]}/{r['cmd_hit'][1]} "
+              f"{r['cmd_p50']:.2f}/{r['cmd_p95']:.2f}s")
+        print(f"    WER {r['wer']:.1%} CER {r['cer']:.1%} | 오호출 {r['false_wakes']} "
+              f"엉뚱한 명령 {r['stray_commands']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+13_audio_convert_bench.py — 마이크 입력 변환 경로 마이크로벤치마크 (마이크 불필요)
+
+3~10초 발화를 캡처 청크(512샘플) 단위 int16 바이트로 만들어 각 변환 경로로 링 버퍼에 쓰고,
+발화당 처리 시간과 변환 중 새로 잡는 메모리(tracemalloc 최대치)를 비교합니다.
+
+    발화 단위 변환   (예전 방식) 44.1kHz 발화 전체를 리샘플 → astype → /32768 (배열 복사 3회)
+    청크 astype     (직전 MicCapture) 16kHz 청크마다 astype → /32768 → ring.write
+    16kHz 직접       ring.write_pcm16 — 링 버퍼 구간에 바로 스케일링 (중간 배열 없음)
+    44.1k/48k 변환  StreamResampler → ring.write (16kHz를 지원하지 않는 장치)
+
+사용법:
+    python pre_test/13_audio_convert_bench.py [반복 횟수=20]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import STT_SAMPLE_RATE
+from modules.audio_stream import AudioRingBuffer, StreamResampler
+
+CHUNK = 512
+DURATIONS = (3.0, 5.0, 10.0)
+
+
+def make_chunks(seconds, rate, seed=0):
+    """음성 대역 비슷한 합성 신호 → int16 바이트 청크 목록 (PyAudio stream.read와 같은 형태)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    signal += rng.normal(0, 0.02, len(t))
+    pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+    return [pcm[i:i + CHUNK].tobytes() for i in range(0, len(pcm), CHUNK)]
+
+
+def path_utterance(chunks, ring, src_rate):
+    # 예전 방식: 발화가 끝난 뒤 전체를 한 번에 16kHz로 변환
+    raw = b"".join(chunks)
+    pcm = np.frombuffer(raw, np.int16)
+    n = int(round(len(pcm) * STT_SAMPLE_RATE / src_rate))
+    resampled = np.interp(np.arange(n) * (src_rate / STT_SAMPLE_RATE), np.arange(len(pcm)), pcm)
+    audio = resampled.astype(np.int16).flatten().astype(np.float32) / 32768.0
+    ring.write(audio)
+
+
+def path_chunk_astype(chunks, ring, _):
+    for data in chunks:
+        ring.write(np.frombuffer(data, np.int16).astype(np.float32) / 32768.0)
+
+
+def path_direct(chunks, ring, _):
+    for data in chunks:
+        ring.write_pcm16(data)
+
+
+def path_resampler(chunks, ring, src_rate):
+    resampler = StreamResampler(src_rate, STT_SAMPLE_RATE, CHUNK)
+    for data in chunks:
+        ring.write(resampler.process(data))
+
+
+CASES = [
+    ("발화 단위 변환 (44.1k)", path_utterance, 44100),
+    ("청크 astype (16k)", path_chunk_astype, STT_SAMPLE_RATE),
+    ("16kHz 직접", path_direct, STT_SAMPLE_RATE),
+    ("StreamResampler (44.1k)", path_resampler, 44100),
+    ("StreamResampler (48k)", path_resampler, 48000),
+]
+
+
+def measure(func, chunks, src_rate, repeat):
+    ring = AudioRingBuffer(30.0, STT_SAMPLE_RATE)
+    func(chunks, ring, src_rate)   # 워밍업
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(chunks, ring, src_rate)
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    func(chunks, ring, src_rate)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(np.median(times)), peak
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"[벤치] 청크 {CHUNK}샘플, 반복 {repeat}회 중앙값\n")
+    for seconds in DURATIONS:
+        print("=" * 66)
+        print(f" {seconds:.0f}초 발화")
+        print("=" * 66)
+        print(f"  {'경로':<26}{'발화당':>10}{'청크당':>10}{'메모리 최대':>14}")
+        base = None
+        for name, func, rate in CASES:
+            chunks = make_chunks(seconds, rate)
+            elapsed, peak = measure(func, chunks, rate, repeat)
+            base = base or elapsed
+            print(f"  {name:<26}{elapsed * 1000:>8.2f}ms{elapsed / len(chunks) * 1e6:>8.1f}µs"
+                  f"{peak / 1024:>11.1f}KiB   (×{base / elapsed:.1f})")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+14_intent_bench.py — 명령 문법 파서 벤치마크 (정규식 순차 검사 vs 컴파일된 IntentGrammar)
+
+1) 예시 명령 문장의 해석 결과를 예전 방식(ACTION_PATTERNS를 순서대로 re.search, 첫 일치 채택)과 비교하고
+   (지속 시간은 예전 방식에 없으므로 컴파일 문법만 검사),
+2) 문법에 임의 문구를 수백~수천 개 추가하면서 문장당 파싱 시간과 컴파일 시간을 측정합니다.
+   예전 방식은 패턴 수에 비례해 느려지고, 컴파일된 문법은 거의 그대로여야 합니다.
+
+사용법:
+    python pre_test/14_intent_bench.py [반복 횟수=200]
+"""
+import os
+import re
+import sys
+import time
+import random
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.voice_controller import VoiceController
+from modules.intent_grammar import IntentGrammar
+
+# (문장, 기대 액션, 기대 대상, 기대 지속 시간)
+SAMPLES = [
+    ("종이컵 1 확대해 줘", "zoom_in", "종이컵 1", None),
+    ("타겟 2 줌인", "zoom_in", "타겟 2", None),
+    ("타겟 1 확대해 줘", "zoom_in", "타겟 1", None),
+    ("두 번째 종이컵 3초 동안 확대해 줘", "zoom_in", "두 번째 종이컵", 3.0),
+    ("종이컵 2초간 확대", "zoom_in", "종이컵", 2.0),
+    ("타겟 1 초록색 컵 확대", "zoom_in", "타겟 1", None),
+    ("물병 하나 클로즈업", "zoom_in", "물병 하나", None),
+    ("물병 크게 보여줘", "zoom_in", "물병", None),
+    ("이거 타겟으로 설정해 줘", "set_target", None, None),
+    ("이것도 타겟으로 등록", "set_target", None, None),
+    ("타겟 위치 다시 찾아", "relocate_targets", None, None),
+    ("구도 복원", "reset_view", None, None),
+    ("원래대로 해줘", "reset_view", None, None),
+    ("줌 아웃", "reset_view", None, None),
+    ("타겟 1 삭제해 줘", "remove_target", "타겟 1", None),
+    ("컵 2 분홍색 삭제", "remove_target", "컵 2 분홍색", None),
+    ("세 번째 타겟 제거", "remove_target", "세 번째 타겟", None),
+    ("모든 타겟 알려줘", "list_targets", None, None),
+    ("지금 뭐 있어", "list_targets", None, None),
+    ("오늘 날씨 어때", "unknown", None, None),
+]
+
+
+def legacy_parse(patterns, text):
+    """예전 VoiceController.parse_command (패턴 순차 re.search + text.find로 대상 추출)."""
+    cleaned = text.strip()
+    action = "unknown"
+    for name, action_patterns in patterns.items():
+        if any(re.search(p, cleaned) for p in action_patterns):
+            action = name
+            break
+    target = None
+    if action in ("zoom_in", "remove_target"):
+        match = re.search(r"타겟\s*(\d+)", cleaned)
+        if match:
+            target = f"타겟 {match.group(1)}"
+        else:
+            for kw in ["확대", "줌", "크게", "삭제", "제거", "클로즈"]:
+                idx = cleaned.find(kw)
+                if idx > 0 and cleaned[:idx].strip():
+                    target = cleaned[:idx].strip()
+                    break
+    return action, target
+
+
+def synthetic_patterns(count, seed=0):
+    """기본 문법 + 임의 한글 2~3음절 조각으로 만든 문구 count개 (절반은 '조각.*조각')."""
+    rng = random.Random(seed)
+    patterns = {action: list(p) for action, p in VoiceController.ACTION_PATTERNS.items()}
+
+    def word():
+        return "".join(chr(rng.randint(0xAC00, 0xD7A3)) for _ in range(rng.randint(2, 3)))
+
+    for i in range(count):
+        phrase = word() if i % 2 else f"{word()}.*{word()}"
+        patterns.setdefault(f"custom_{i % 50}", []).append(phrase)
+    return patterns
+
+
+def time_per_call(func, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    base = VoiceController.ACTION_PATTERNS
+    grammar = IntentGrammar(base)
+
+    print("=" * 72)
+    print(" 해석 비교 (✓ 기대와 일치)")
+    print("=" * 72)
+    new_ok = old_ok = 0
+    for text, action, target, duration in SAMPLES:
+        old_action, old_target = legacy_parse(base, text)
+        parsed = grammar.parse(text)
+        new_hit = (parsed["action"] == action and parsed["target"] == target
+                   and parsed["slots"].get("duration") == duration)
+        old_hit = old_action == action and old_target == target
+        new_ok += new_hit
+        old_ok += old_hit
+        slots = {k: v for k, v in parsed["slots"].items() if k != "target"}
+        print(f"  {'✓' if new_hit else '✗'} {text}")
+        print(f"      컴파일: {parsed['action']} / {parsed['target']} "
+              f"(신뢰도 {parsed['confidence']:.2f}{f', {slots}' if slots else ''})")
+        if not old_hit:
+            print(f"      예전 ✗: {old_action} / {old_target}")
+    print(f"\n  정답: 컴파일 {new_ok}/{len(SAMPLES)}, 예전 {old_ok}/{len(SAMPLES)}\n")
+
+    texts = [text for text, *_ in SAMPLES]
+    print("=" * 72)
+    print(f" 문법 크기별 문장당 파싱 시간 (문장 {len(texts)}개 × {repeat}회)")
+    print("=" * 72)
+    print(f"  {'추가 문구':>8} {'패턴 수':>8} {'컴파일':>10} {'컴파일 파싱':>12} {'정규식 순차':>12}")
+    for extra in (0, 100, 300, 1000, 3000):
+        patterns = synthetic_patterns(extra)
+        n_patterns = sum(len(p) for p in patterns.values())
+        start = time.perf_counter()
+        compiled = IntentGrammar(patterns)
+        compile_ms = (time.perf_counter() - start) * 1000
+        new_us = time_per_call(compiled.parse, texts, repeat) * 1e6
+        old_us = time_per_call(lambda t: legacy_parse(patterns, t), texts, max(1, repeat // 10)) * 1e6
+        print(f"  {extra:>8} {n_patterns:>8} {compile_ms:>8.1f}ms {new_us:>10.1f}µs {old_us:>10.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
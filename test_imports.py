@@ -45,6 +45,12 @@ try:
 except Exception as e:
     print(f"[FAIL] vision_ai: {e}")
 
+try:
+    from modules.vision_backend import create_backend
+    print(f"[OK] vision_backend: {create_backend('gemini').name}")
+except Exception as e:
+    print(f"[FAIL] vision_backend: {e}")
+
 try:
     from modules.tts_engine import TTSEngine
     print("[OK] tts_engine (import only)")